@@ -25,9 +25,40 @@ def create_app():
 
     app.config.from_object('config.Config')
 
+    # 🔹 Plantillas compiladas reutilizables entre workers y reinicios
+    if app.config["JINJA_CACHE_DIR"]:
+        from jinja2 import FileSystemBytecodeCache
+        os.makedirs(app.config["JINJA_CACHE_DIR"], exist_ok=True)
+        app.jinja_options = {
+            **app.jinja_options,
+            "bytecode_cache": FileSystemBytecodeCache(app.config["JINJA_CACHE_DIR"])
+        }
+
     # 🔥 FIX DEFINITIVO PARA RENDER (HTTPS + Proxy)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
+    # 🔹 Telemetría de rendimiento (señales de Flask + eventos de SQLAlchemy)
+    from .services.telemetria_service import telemetria
+    telemetria.init_app(app)
+
+    # 🔹 Compresión gzip de HTML/JSON/CSV (incluye respuestas en streaming)
+    if app.config["COMPRESION_ACTIVA"]:
+        from .middleware.compresion import CompresionGzip
+        app.wsgi_app = CompresionGzip(
+            app.wsgi_app,
+            nivel=app.config["COMPRESION_NIVEL"],
+            tamano_minimo=app.config["COMPRESION_TAMANO_MINIMO"],
+            metricas=telemetria
+        )
+
+    # 🔹 Estáticos con huella y gzip (si existe static/dist/manifest.json)
+    from .services.estaticos_service import estaticos
+    estaticos.init_app(app)
+
+    # 🔹 Etiqueta {% cache %} de fragmentos versionados por colegio
+    from .services.fragmentos_service import FragmentoCache
+    app.jinja_env.add_extension(FragmentoCache)
+
     # 🔹 Inicializar extensiones
     db.init_app(app)
     login_manager.init_app(app)
@@ -35,12 +66,13 @@ def create_app():
     mail.init_app(app)
     CSRFProtect(app)
 
-    # 🔹 Rate limiter
+    # 🔹 Rate limiter (el import registra el esquema mmap:// en limits)
+    from .utils import ratelimit_storage  # noqa: F401
     limiter = Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=["200 per day", "50 per hour"],
-        storage_uri="memory://"
+        storage_uri=app.config["RATELIMIT_STORAGE_URI"]
     )
 
     # 🔹 Importar modelos
@@ -48,15 +80,19 @@ def create_app():
     from .models.colegio import Colegio
     from .models.docente import Docente
     from .models.permiso import Permiso
+    from .models.correo import CorreoSaliente
+
+    # 🔹 Crear tablas (sólo desarrollo; en producción lo hacen las migraciones)
+    if app.config["CREAR_TABLAS_AL_INICIAR"]:
+        with app.app_context():
+            db.create_all()
 
-    # 🔹 Crear tablas
-    with app.app_context():
-        db.create_all()
+    # 🔹 User loader (snapshot cacheado; sin consulta en el caso común)
+    from .services.principal_service import cargar_principal
 
-    # 🔹 User loader
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(Usuario, int(user_id))
+        return cargar_principal(int(user_id))
 
     # 🔹 Blueprints
     from .routes.auth_routes import auth_bp
@@ -64,12 +100,43 @@ def create_app():
     from .routes.docente_routes import docente_bp
     from .routes.admin_routes import admin_bp
     from .routes.colegio_routes import colegio_bp
+    from .routes.api_routes import api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(permiso_bp)
     app.register_blueprint(docente_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(colegio_bp)
+    app.register_blueprint(api_bp)
+
+    # 🔹 Despachador de correos: arranca con la primera petición de cada worker
+    if app.config["EMAIL_OUTBOX_ACTIVO"]:
+        from .services.outbox_service import despachador
+
+        @app.before_request
+        def iniciar_despachador_correos():
+            despachador.iniciar(app)
+
+    # 🔹 Barrido de vencimientos de prueba: un hilo por worker
+    if app.config["ACCESO_BARRIDO_INTERVALO"] > 0:
+        from .services.acceso_service import barrido
+
+        @app.before_request
+        def iniciar_barrido_acceso():
+            barrido.iniciar(app)
+
+    # 🔹 Comandos de consola (flask correos enviar, ...)
+    from .commands import registrar_comandos
+    registrar_comandos(app)
+
+    # Prometheus consulta cada pocos segundos: sin límite de peticiones
+    limiter.exempt(app.view_functions["admin.metricas_prometheus"])
+    # Las integraciones descargan por páginas: límite propio de la API
+    limiter.limit(app.config["API_RATELIMIT"])(api_bp)
+    # El autocompletar hace una petición por cada pausa al escribir
+    app.view_functions["docente.buscar"] = limiter.limit(
+        app.config["DOCENTES_BUSQUEDA_RATELIMIT"]
+    )(app.view_functions["docente.buscar"])
 
     app.limiter = limiter
 
@@ -0,0 +1,159 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.group("correos")
+def correos_cli():
+    """Bandeja de salida de correos"""
+
+
+@correos_cli.command("enviar")
+@with_appcontext
+def enviar_correos():
+    """Envía ahora todos los correos pendientes (útil desde un cron)"""
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+    from app.services.email_service import obtener_transporte
+    from app.services.outbox_service import drenar_bandeja
+
+    app = current_app._get_current_object()
+    with ThreadPoolExecutor(max_workers=app.config.get("EMAIL_OUTBOX_HILOS", 4)) as pool:
+        procesados = drenar_bandeja(app, pool, obtener_transporte(app.config))
+    click.echo(f"✅ {procesados} correo(s) procesados")
+
+
+@click.group("docentes")
+def docentes_cli():
+    """Gestión de docentes"""
+
+
+@docentes_cli.command("importar")
+@click.argument("archivo", type=click.Path(exists=True, dir_okay=False))
+@click.option("--colegio-id", type=int, required=True, help="Colegio destino")
+@click.option("--lote", type=int, default=1000, show_default=True, help="Filas por INSERT")
+@with_appcontext
+def importar_docentes_cmd(archivo, colegio_id, lote):
+    """Importa docentes desde un CSV (nombre,documento,telefono,email)"""
+    from app.extensions import db
+    from app.models.colegio import Colegio
+    from app.services.importacion_service import importar_docentes
+
+    if db.session.get(Colegio, colegio_id) is None:
+        raise click.BadParameter(f"No existe el colegio {colegio_id}", param_hint="--colegio-id")
+
+    with open(archivo, encoding="utf-8-sig", newline="") as f:
+        try:
+            resultado = importar_docentes(f, colegio_id, tamano_lote=lote)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    for fila, mensaje in resultado.errores:
+        click.echo(f"  fila {fila}: {mensaje}", err=True)
+    if resultado.errores_omitidos:
+        click.echo(f"  ... y {resultado.errores_omitidos} observación(es) más", err=True)
+
+    click.echo(
+        f"✅ {resultado.insertados} docente(s) importados de {resultado.filas} fila(s) "
+        f"({resultado.duplicados} duplicados, {resultado.total_errores} con observaciones)"
+    )
+
+
+@click.group("plantillas")
+def plantillas_cli():
+    """Plantillas Jinja"""
+
+
+@plantillas_cli.command("compilar")
+@with_appcontext
+def compilar_plantillas():
+    """Precompila todas las plantillas en JINJA_CACHE_DIR (paso de build)"""
+    from flask import current_app
+
+    if not current_app.config.get("JINJA_CACHE_DIR"):
+        raise click.ClickException("JINJA_CACHE_DIR no está configurado")
+
+    entorno = current_app.jinja_env
+    nombres = entorno.list_templates(extensions=["html"])
+    for nombre in nombres:
+        entorno.get_template(nombre)
+    click.echo(f"✅ {len(nombres)} plantilla(s) compiladas en {current_app.config['JINJA_CACHE_DIR']}")
+
+
+@click.group("estaticos")
+def estaticos_cli():
+    """Archivos estáticos"""
+
+
+@estaticos_cli.command("compilar")
+@with_appcontext
+def compilar_estaticos_cmd():
+    """Copia los estáticos con huella de contenido y variantes .gz a static/dist (paso de build)"""
+    from flask import current_app
+    from app.services.estaticos_service import compilar_estaticos
+
+    manifiesto = compilar_estaticos(current_app.static_folder)
+    click.echo(
+        f"✅ {len(manifiesto['archivos'])} archivo(s) con huella, "
+        f"{len(manifiesto['comprimidos'])} con variante gzip"
+    )
+
+
+@click.command("seed")
+@click.option("--colegios", type=int, default=1000, show_default=True)
+@click.option("--docentes", type=int, default=25, show_default=True, help="Promedio por colegio")
+@click.option("--permisos", type=int, default=40, show_default=True, help="Promedio por docente")
+@click.option("--anios", type=int, default=3, show_default=True, help="Años de historia")
+@click.option("--semilla", type=int, default=42, show_default=True)
+@click.option("--fecha", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Fin de la historia sembrada (por defecto FECHA_REFERENCIA, 2026-01-01)")
+@click.option("--password", default="Semilla#2026", show_default=True,
+              help="Clave de todos los usuarios sembrados")
+@with_appcontext
+def seed_cmd(colegios, docentes, permisos, anios, semilla, fecha, password):
+    """Carga un conjunto sintético y determinista (COPY en PostgreSQL)"""
+    import time
+    from app.services.hash_service import generar_hash
+    from app.services.semilla_service import FECHA_REFERENCIA, correo_admin, correo_colegio, sembrar
+
+    inicio = time.perf_counter()
+    try:
+        resumen = sembrar(
+            colegios, docentes, permisos,
+            password_hash=generar_hash(password),
+            semilla=semilla,
+            anios=anios,
+            fecha=fecha.date() if fecha else FECHA_REFERENCIA
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"✅ {resumen.colegios} colegios, {resumen.docentes} docentes, "
+        f"{resumen.permisos} permisos y {resumen.usuarios} usuarios "
+        f"en {time.perf_counter() - inicio:.1f}s"
+    )
+    click.echo(f"   Usuarios: {correo_admin()}, {correo_colegio(0)} ... {correo_colegio(resumen.colegios - 1)}")
+
+
+@click.group("usuarios")
+def usuarios_cli():
+    """Cuentas de usuario"""
+
+
+@usuarios_cli.command("barrer")
+@with_appcontext
+def barrer_usuarios():
+    """Recalcula estado_acceso de las pruebas vencidas o por vencer (útil desde un cron)"""
+    from app.services.acceso_service import barrer_estados_acceso
+
+    ids = barrer_estados_acceso()
+    click.echo(f"✅ {len(ids)} usuario(s) actualizados")
+
+
+def registrar_comandos(app):
+    app.cli.add_command(correos_cli)
+    app.cli.add_command(docentes_cli)
+    app.cli.add_command(plantillas_cli)
+    app.cli.add_command(estaticos_cli)
+    app.cli.add_command(seed_cmd)
+    app.cli.add_command(usuarios_cli)
@@ -1,7 +1,6 @@
 from functools import wraps
 from flask import flash, redirect, url_for
 from flask_login import current_user
-from datetime import datetime
 
 
 def acceso_permitido(f):
@@ -18,14 +17,11 @@ def acceso_permitido(f):
                 flash(f'Acceso restringido: {razon}. Contacta al administrador.', 'danger')
                 return redirect(url_for('auth.estado_cuenta'))
 
-        # Si está en prueba, mostrar advertencia
-        if not getattr(current_user, 'is_approved', False) and not getattr(current_user, 'is_superadmin', False):
-            fecha_registro = getattr(current_user, 'fecha_registro', datetime.utcnow())
-            dias_transcurridos = (datetime.utcnow() - fecha_registro).days
-            dias_prueba = getattr(current_user, 'dias_prueba', 15)
-            dias_restantes = dias_prueba - dias_transcurridos
-
-            if dias_restantes <= 3 and dias_restantes > 0:
+        # Si está por vencer, mostrar advertencia (estado precalculado)
+        estado_vigente = getattr(current_user, 'estado_vigente', None)
+        if estado_vigente and estado_vigente() == current_user.ACCESO_POR_VENCER:
+            dias_restantes = current_user.dias_restantes()
+            if dias_restantes > 0:
                 flash(f'⚠️ Tu período de prueba termina en {dias_restantes} día(s). '
                       f'Solicita aprobación al administrador.', 'warning')
 
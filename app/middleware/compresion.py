@@ -0,0 +1,142 @@
+"""
+Compresión gzip de las respuestas a nivel WSGI.
+
+Se comprime sólo si el cliente acepta gzip, el tipo es de texto (HTML,
+JSON, CSV, CSS, JS...) y la respuesta no viene ya codificada. Las
+respuestas con Content-Length menor a `tamano_minimo` se envían tal cual;
+las que no lo declaran (generadores, stream_with_context) se comprimen
+bloque a bloque con Z_SYNC_FLUSH, sin esperar al cuerpo completo.
+"""
+import zlib
+
+TIPOS_COMPRIMIBLES = frozenset({
+    "text/html", "text/plain", "text/css", "text/csv", "text/javascript", "text/xml",
+    "application/javascript", "application/json", "application/xml", "image/svg+xml",
+})
+
+# Respuestas sin cuerpo o parciales: no se tocan
+ESTADOS_SIN_COMPRIMIR = ("204", "206", "304")
+
+
+def acepta_gzip(environ):
+    for parte in environ.get("HTTP_ACCEPT_ENCODING", "").lower().split(","):
+        codificacion, _, parametros = parte.strip().partition(";")
+        if codificacion.strip() in ("gzip", "*"):
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class CompresionGzip:
+    def __init__(self, app, nivel=6, tamano_minimo=1024, metricas=None):
+        self.app = app
+        self.nivel = nivel
+        self.tamano_minimo = tamano_minimo
+        self.metricas = metricas
+        if metricas is not None:
+            metricas.configurar_compresion(nivel)
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "HEAD" or not acepta_gzip(environ):
+            return self.app(environ, start_response)
+
+        decision = {"comprimir": False}
+
+        def iniciar(status, headers, exc_info=None):
+            if self._debe_comprimir(status, headers):
+                decision["comprimir"] = True
+                headers = self._cabeceras_comprimidas(headers)
+            elif self.metricas is not None:
+                self.metricas.registrar_sin_compresion()
+            return start_response(status, headers, exc_info)
+
+        cuerpo = self.app(environ, iniciar)
+        if not decision["comprimir"]:
+            return cuerpo
+        return self._comprimir(cuerpo)
+
+    def _debe_comprimir(self, status, headers):
+        if status[:3] in ESTADOS_SIN_COMPRIMIR:
+            return False
+
+        tipo = longitud = None
+        for nombre, valor in headers:
+            nombre = nombre.lower()
+            if nombre == "content-encoding":
+                return False
+            if nombre == "cache-control" and "no-transform" in valor.lower():
+                return False
+            if nombre == "content-type":
+                tipo = valor.split(";", 1)[0].strip().lower()
+            elif nombre == "content-length":
+                longitud = valor
+
+        if tipo not in TIPOS_COMPRIMIBLES:
+            return False
+        # Sin Content-Length (streaming) no se conoce el tamaño: se comprime
+        if longitud is not None:
+            try:
+                return int(longitud) >= self.tamano_minimo
+            except ValueError:
+                return False
+        return True
+
+    @staticmethod
+    def _cabeceras_comprimidas(headers):
+        nuevas = []
+        vary = None
+        for nombre, valor in headers:
+            minuscula = nombre.lower()
+            if minuscula == "content-length":
+                continue
+            if minuscula == "etag" and not valor.startswith("W/"):
+                # Otra representación del mismo recurso: ETag débil
+                valor = "W/" + valor
+            if minuscula == "vary":
+                vary = valor
+                continue
+            nuevas.append((nombre, valor))
+
+        if vary is None:
+            vary = "Accept-Encoding"
+        elif vary.strip() != "*" and "accept-encoding" not in vary.lower():
+            vary = f"{vary}, Accept-Encoding"
+        nuevas.append(("Vary", vary))
+        nuevas.append(("Content-Encoding", "gzip"))
+        return nuevas
+
+    def _comprimir(self, cuerpo):
+        return _CuerpoComprimido(cuerpo, self.nivel, self.metricas)
+
+
+class _CuerpoComprimido:
+    """
+    Iterable WSGI que comprime el cuerpo original bloque a bloque.
+    close() siempre cierra el original (teardown de Flask), aunque el
+    servidor no haya llegado a iterar.
+    """
+
+    def __init__(self, cuerpo, nivel, metricas):
+        self.cuerpo = cuerpo
+        self.compresor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.metricas = metricas
+        self.entrada = 0
+        self.salida = 0
+
+    def __iter__(self):
+        for bloque in self.cuerpo:
+            if not bloque:
+                continue
+            self.entrada += len(bloque)
+            # SYNC_FLUSH: el cliente recibe cada bloque en cuanto se genera
+            comprimido = self.compresor.compress(bloque) + self.compresor.flush(zlib.Z_SYNC_FLUSH)
+            self.salida += len(comprimido)
+            yield comprimido
+        final = self.compresor.flush()
+        self.salida += len(final)
+        yield final
+
+    def close(self):
+        if hasattr(self.cuerpo, "close"):
+            self.cuerpo.close()
+        if self.metricas is not None:
+            self.metricas.registrar_compresion(self.entrada, self.salida)
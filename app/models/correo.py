@@ -0,0 +1,40 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class CorreoSaliente(db.Model):
+    """
+    Bandeja de salida: cada correo se guarda aquí en la misma transacción de
+    la petición y un despachador en segundo plano lo envía después.
+    """
+    __tablename__ = "correos_salientes"
+    __table_args__ = (
+        # El despachador busca los pendientes cuyo próximo intento ya venció
+        db.Index("ix_correos_salientes_estado_proximo", "estado", "proximo_intento"),
+        {'extend_existing': True}
+    )
+
+    PENDIENTE = "pendiente"
+    ENVIANDO = "enviando"
+    ENVIADO = "enviado"
+    FALLIDO = "fallido"
+    DESCARTADO = "descartado"
+
+    id = db.Column(db.Integer, primary_key=True)
+    destinatario = db.Column(db.String(120), nullable=False)
+    asunto = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+
+    # Evita encolar (y enviar) dos veces el mismo correo
+    clave_dedup = db.Column(db.String(64), unique=True, nullable=False)
+
+    estado = db.Column(db.String(20), nullable=False, default=PENDIENTE)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    proximo_intento = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    reclamado_en = db.Column(db.DateTime, nullable=True)
+    enviado_en = db.Column(db.DateTime, nullable=True)
+    ultimo_error = db.Column(db.Text, nullable=True)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CorreoSaliente {self.destinatario} {self.estado}>'
@@ -3,7 +3,13 @@ from app.extensions import db
 
 class Docente(db.Model):
     __tablename__ = "docentes"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado ordenado por nombre y verificación de duplicados
+        db.Index("ix_docentes_colegio_nombre", "colegio_id", "nombre"),
+        # Docentes activos del colegio (formularios y dashboard)
+        db.Index("ix_docentes_colegio_activo", "colegio_id", "activo"),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(150), nullable=False)
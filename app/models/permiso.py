@@ -3,7 +3,13 @@ from app.extensions import db
 
 class Permiso(db.Model):
     __tablename__ = "permisos"
-    __table_args__ = {'extend_existing': True}  # 👈 AGREGA ESTA LÍNEA
+    __table_args__ = (
+        # Listados y dashboard del colegio: WHERE colegio_id = ? ORDER BY fecha_inicio
+        db.Index("ix_permisos_colegio_fecha_inicio", "colegio_id", "fecha_inicio"),
+        # Historial de un docente
+        db.Index("ix_permisos_docente_fecha_inicio", "docente_id", "fecha_inicio"),
+        {'extend_existing': True}  # 👈 AGREGA ESTA LÍNEA
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     docente_id = db.Column(db.Integer, db.ForeignKey("docentes.id"), nullable=False)
@@ -1,10 +1,25 @@
 from app.extensions import db
 from flask_login import UserMixin
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import event
 
 
 class Usuario(db.Model, UserMixin):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # Usuarios en prueba por fecha de vencimiento (panel de administración)
+        db.Index("ix_usuarios_is_approved_fecha_expiracion", "is_approved", "fecha_expiracion"),
+        # Pantallas de administración y barrido de vencimientos
+        db.Index("ix_usuarios_estado_acceso_fecha_expiracion", "estado_acceso", "fecha_expiracion"),
+    )
+
+    # Estados de acceso materializados en estado_acceso
+    ACCESO_PRUEBA = "trial"
+    ACCESO_POR_VENCER = "expiring"
+    ACCESO_VENCIDO = "expired"
+    ACCESO_APROBADO = "approved"
+    ACCESO_BLOQUEADO = "blocked"
+    DIAS_AVISO_VENCIMIENTO = 3
 
     # --------------------
     # Datos básicos
@@ -40,6 +55,9 @@ class Usuario(db.Model, UserMixin):
     # Fecha explícita de expiración (se queda)
     fecha_expiracion = db.Column(db.DateTime, nullable=True)
 
+    # Estado precalculado (se actualiza al guardar y con el barrido periódico)
+    estado_acceso = db.Column(db.String(10), nullable=False, default=ACCESO_PRUEBA)
+
     # --------------------
     # Representación
     # --------------------
@@ -49,14 +67,49 @@ class Usuario(db.Model, UserMixin):
     # --------------------
     # Lógica de acceso (FUENTE ÚNICA DE VERDAD)
     # --------------------
+    def vencimiento(self):
+        """Fin del periodo de prueba (fecha explícita o registro + días de prueba)"""
+        if self.fecha_expiracion:
+            return self.fecha_expiracion
+        return (self.fecha_registro or datetime.utcnow()) + timedelta(days=self.dias_prueba or 0)
+
+    def calcular_estado_acceso(self, ahora=None):
+        """Mismo criterio que la expresión SQL del barrido (acceso_service)"""
+        ahora = ahora or datetime.utcnow()
+        # is_active vale None antes del primer INSERT si no se pasó (default=True)
+        if self.is_active is False:
+            return self.ACCESO_BLOQUEADO
+        if self.is_superadmin or self.is_approved:
+            return self.ACCESO_APROBADO
+        vence = self.vencimiento()
+        if vence < ahora:
+            return self.ACCESO_VENCIDO
+        if vence < ahora + timedelta(days=self.DIAS_AVISO_VENCIMIENTO + 1):
+            return self.ACCESO_POR_VENCER
+        return self.ACCESO_PRUEBA
+
+    def estado_vigente(self, ahora=None):
+        """
+        Estado guardado; sólo si dice que la prueba sigue abierta se mira la
+        fecha, por si venció después del último barrido.
+        """
+        estado = self.estado_acceso
+        if estado in (self.ACCESO_PRUEBA, self.ACCESO_POR_VENCER, None):
+            return self.calcular_estado_acceso(ahora)
+        return estado
+
+    def dias_restantes(self, ahora=None):
+        return (self.vencimiento() - (ahora or datetime.utcnow())).days
+
     def puede_acceder(self):
         """
         Verifica si el usuario puede acceder al sistema
         Retorna: (bool, mensaje)
         """
+        estado = self.estado_vigente()
 
         # Bloqueo manual
-        if not self.is_active:
+        if estado == self.ACCESO_BLOQUEADO:
             return False, "Usuario desactivado por el administrador"
 
         # Superadmin siempre accede
@@ -64,49 +117,43 @@ class Usuario(db.Model, UserMixin):
             return True, "Superadmin"
 
         # Usuario aprobado
-        if self.is_approved:
+        if estado == self.ACCESO_APROBADO:
             return True, "Aprobado"
 
-        # Control por fecha explícita de expiración
-        if self.fecha_expiracion:
-            if datetime.utcnow() <= self.fecha_expiracion:
-                dias = (self.fecha_expiracion - datetime.utcnow()).days
-                return True, f"Prueba ({dias} días restantes)"
+        if estado == self.ACCESO_VENCIDO:
             return False, "Prueba vencida"
 
-        # Fallback por días de prueba (compatibilidad)
-        dias_transcurridos = (datetime.utcnow() - self.fecha_registro).days
-        dias_restantes = self.dias_prueba - dias_transcurridos
-
-        if dias_restantes >= 0:
-            return True, f"Prueba ({dias_restantes} días restantes)"
-
-        return False, "Bloqueado - Prueba terminada sin aprobación"
+        return True, f"Prueba ({self.dias_restantes()} días restantes)"
 
     # --------------------
     # Estado legible para UI
     # --------------------
     def estado_detallado(self):
-        if not self.is_active:
+        estado = self.estado_vigente()
+
+        if estado == self.ACCESO_BLOQUEADO:
             return "🚫 Usuario desactivado"
 
         if self.is_superadmin:
             return "👑 Superadministrador"
 
-        if self.is_approved:
-            dias = (datetime.utcnow() - self.fecha_aprobacion).days
+        if estado == self.ACCESO_APROBADO:
+            dias = (datetime.utcnow() - (self.fecha_aprobacion or self.fecha_registro)).days
             return f"✅ Aprobado (hace {dias} días)"
 
-        if self.fecha_expiracion:
-            dias = (self.fecha_expiracion - datetime.utcnow()).days
-            if dias >= 0:
-                return f"⏳ En prueba ({dias} días restantes)"
+        if estado == self.ACCESO_VENCIDO:
             return "❌ Prueba vencida"
 
-        dias_transcurridos = (datetime.utcnow() - self.fecha_registro).days
-        dias_restantes = self.dias_prueba - dias_transcurridos
+        return f"⏳ En prueba ({self.dias_restantes()} días restantes)"
+
 
-        if dias_restantes >= 0:
-            return f"⏳ En prueba ({dias_restantes} días restantes)"
+@event.listens_for(Usuario, "before_insert")
+@event.listens_for(Usuario, "before_update")
+def _actualizar_estado_acceso(mapper, connection, usuario):
+    # Los filtros por fecha (pruebas que vencen esta semana, estadísticas)
+    # sólo miran fecha_expiracion: se fija para los usuarios sin aprobar
+    if usuario.fecha_expiracion is None and not (usuario.is_approved or usuario.is_superadmin):
+        usuario.fecha_expiracion = usuario.vencimiento()
 
-        return "❌ Bloqueado - Prueba vencida"
+    # Aprobar, bloquear, activar o cambiar los días recalcula el estado al guardar
+    usuario.estado_acceso = usuario.calcular_estado_acceso()
@@ -1,11 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from flask_login import login_required, current_user
+import hmac
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, Response, jsonify
+from flask_login import login_required
 from app.extensions import db
 from app.models.usuario import Usuario
-from app.models.colegio import Colegio
-from app.models.docente import Docente
-from app.models.permiso import Permiso
 from app.middleware.superuser_middleware import superuser_required
+from app.services.estadisticas_service import obtener_estadisticas_admin, obtener_estadisticas_sistema
+from app.services.usuarios_lote_service import aplicar_lote, FILTROS
+from app.services.telemetria_service import telemetria, resumen_por_ruta, formato_prometheus
 from datetime import datetime, timedelta
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
@@ -21,46 +23,10 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 def dashboard():
     """Panel principal de administración con estadísticas"""
 
-    # Estadísticas generales
-    total_usuarios = Usuario.query.count()
-    superadmins = Usuario.query.filter_by(is_superadmin=True).count()
-    usuarios_aprobados = Usuario.query.filter_by(is_approved=True).count()
-    usuarios_pendientes = Usuario.query.filter_by(is_approved=False, is_superadmin=False).count()
-    usuarios_activos = Usuario.query.filter_by(is_active=True).count()
-
-    # Estadísticas de colegios y docentes
-    total_colegios = Colegio.query.count()
-    total_docentes = Docente.query.count()
-    total_permisos = Permiso.query.count()
-
-    # Usuarios en prueba (últimos 7 días)
-    hace_7_dias = datetime.utcnow() - timedelta(days=7)
-    nuevos_usuarios = Usuario.query.filter(Usuario.fecha_registro >= hace_7_dias).count()
-
-    # Usuarios próximos a vencer (3 días o menos)
-    proximos_vencer = []
-    todos_usuarios = Usuario.query.filter_by(is_superadmin=False, is_approved=False).all()
-    for usuario in todos_usuarios:
-        if usuario.fecha_expiracion:
-            dias_restantes = (usuario.fecha_expiracion - datetime.utcnow()).days
-            if 0 <= dias_restantes <= 3:
-                proximos_vencer.append({
-                    'usuario': usuario,
-                    'dias': dias_restantes
-                })
-
+    # Se consulta sólo si el fragmento cacheado de la plantilla no está vigente
     return render_template(
         "admin/dashboard.html",
-        total_usuarios=total_usuarios,
-        superadmins=superadmins,
-        usuarios_aprobados=usuarios_aprobados,
-        usuarios_pendientes=usuarios_pendientes,
-        usuarios_activos=usuarios_activos,
-        total_colegios=total_colegios,
-        total_docentes=total_docentes,
-        total_permisos=total_permisos,
-        nuevos_usuarios=nuevos_usuarios,
-        proximos_vencer=proximos_vencer
+        estadisticas=obtener_estadisticas_admin
     )
 
 
@@ -85,7 +51,8 @@ def lista_usuarios():
         "admin/usuarios.html",
         usuarios_aprobados=usuarios_aprobados,
         usuarios_prueba=usuarios_prueba,
-        superadmins=superadmins
+        superadmins=superadmins,
+        filtros_lote=FILTROS
     )
 
 
@@ -206,6 +173,58 @@ def modificar_dias_prueba(usuario_id):
     return redirect(url_for("admin.detalle_usuario", usuario_id=usuario_id))
 
 
+# ════════════════════════════════════════════════════════════════
+# OPERACIONES MASIVAS
+# ════════════════════════════════════════════════════════════════
+
+MENSAJES_LOTE = {
+    "aprobar": "✅ {n} usuario(s) aprobados",
+    "bloquear": "🚫 {n} usuario(s) bloqueados",
+    "activar": "✅ {n} usuario(s) activados",
+    "extender": "✅ Prueba extendida a {n} usuario(s)",
+}
+
+
+def _datos_lote():
+    """ids, filtro y días desde JSON ({"ids": [...], ...}) o desde el formulario"""
+    if request.is_json:
+        datos = request.get_json(silent=True) or {}
+        ids, filtro, dias = datos.get("ids") or [], datos.get("filtro"), datos.get("dias")
+    else:
+        ids = request.form.getlist("usuario_ids")
+        filtro, dias = request.form.get("filtro"), request.form.get("dias")
+
+    try:
+        ids = [int(i) for i in ids]
+        dias = int(dias) if dias not in (None, "") else None
+    except (TypeError, ValueError):
+        raise ValueError("Ids y días deben ser números enteros")
+    return ids, filtro or None, dias
+
+
+@admin_bp.route("/usuarios/lote/<accion>", methods=["POST"])
+@login_required
+@superuser_required
+def operacion_lote(accion):
+    """Aprueba, bloquea, activa o extiende la prueba de varios usuarios a la vez"""
+    try:
+        ids, filtro, dias = _datos_lote()
+        resultado = aplicar_lote(accion, ids=ids, filtro=filtro, dias=dias)
+    except ValueError as e:
+        if request.is_json:
+            return jsonify({"success": False, "error": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("admin.lista_usuarios"))
+
+    if request.is_json:
+        return jsonify({"success": True, **resultado.como_dict()})
+
+    flash(MENSAJES_LOTE[accion].format(n=resultado.aplicados), "success")
+    if resultado.omitidos:
+        flash(f"{resultado.omitidos} usuario(s) omitidos (no existen, superadministradores o ya aprobados)", "warning")
+    return redirect(url_for("admin.lista_usuarios"))
+
+
 # ════════════════════════════════════════════════════════════════
 # ESTADÍSTICAS
 # ════════════════════════════════════════════════════════════════
@@ -215,31 +234,61 @@ def modificar_dias_prueba(usuario_id):
 @superuser_required
 def estadisticas():
     """Página de estadísticas detalladas"""
-    # Usuarios por estado
-    usuarios_activos = Usuario.query.filter_by(is_active=True).count()
-    usuarios_bloqueados = Usuario.query.filter_by(is_active=False).count()
-    usuarios_aprobados = Usuario.query.filter_by(is_approved=True).count()
-    usuarios_pendientes = Usuario.query.filter_by(is_approved=False, is_superadmin=False).count()
-
-    # Colegios con más docentes
-    colegios = Colegio.query.all()
-    colegios_data = []
-    for colegio in colegios:
-        docentes_count = len(colegio.docentes)
-        usuarios_count = len(colegio.usuarios)
-        colegios_data.append({
-            "nombre": colegio.nombre,
-            "docentes": docentes_count,
-            "usuarios": usuarios_count
-        })
-
-    colegios_data.sort(key=lambda x: x["docentes"], reverse=True)
+    pagina = max(1, request.args.get("pagina", 1, type=int) or 1)
 
     return render_template(
         "admin/estadisticas.html",
-        usuarios_activos=usuarios_activos,
-        usuarios_bloqueados=usuarios_bloqueados,
-        usuarios_aprobados=usuarios_aprobados,
-        usuarios_pendientes=usuarios_pendientes,
-        colegios_data=colegios_data
-    )
\ No newline at end of file
+        pagina=pagina,
+        estadisticas=lambda: obtener_estadisticas_sistema(pagina=pagina)
+    )
+
+
+# ════════════════════════════════════════════════════════════════
+# RENDIMIENTO (TELEMETRÍA)
+# ════════════════════════════════════════════════════════════════
+
+@admin_bp.route("/perf")
+@login_required
+@superuser_required
+def perf():
+    """Latencia, consultas SQL y render de plantillas por ruta (todos los workers)"""
+    agregado = telemetria.agregado()
+    return render_template(
+        "admin/perf.html",
+        filas=resumen_por_ruta(agregado.rutas),
+        compresion=agregado.compresion,
+        muestreo=telemetria.muestreo
+    )
+
+
+def _token_prometheus_valido():
+    token = current_app.config.get("TELEMETRIA_TOKEN")
+    if not token:
+        return False
+    # En bytes: compare_digest no acepta str con caracteres no ASCII
+    return hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode()
+    )
+
+
+def _respuesta_prometheus():
+    agregado = telemetria.agregado()
+    return Response(
+        formato_prometheus(agregado.rutas, agregado.compresion),
+        mimetype="text/plain; version=0.0.4"
+    )
+
+
+@login_required
+@superuser_required
+def _metricas_con_sesion():
+    return _respuesta_prometheus()
+
+
+@admin_bp.route("/perf/metrics")
+def metricas_prometheus():
+    """Formato de texto de Prometheus; acepta el token Bearer o una sesión de superusuario"""
+    if _token_prometheus_valido():
+        return _respuesta_prometheus()
+    return _metricas_con_sesion()
@@ -0,0 +1,102 @@
+import hmac
+from functools import wraps
+
+from flask import Blueprint, Response, current_app, request, url_for
+from flask_login import current_user
+
+from app.services.api_service import ErrorApi, json_compacto, listar
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+def _respuesta(datos, status=200):
+    return Response(json_compacto(datos), status=status, mimetype="application/json")
+
+
+def _token_api_valido():
+    token = current_app.config.get("API_TOKEN")
+    if not token:
+        return False
+    # En bytes: compare_digest no acepta str con caracteres no ASCII
+    return hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode()
+    )
+
+
+def api_autenticada(f):
+    """
+    Token Bearer API_TOKEN (integraciones, todos los colegios) o sesión:
+    un superadmin ve todos los colegios y un usuario de colegio sólo el suyo.
+    Un usuario sin colegio recibe 403, nunca el alcance de todos los colegios.
+    Responde 401/403 en JSON en lugar de redirigir al login.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if _token_api_valido():
+            return f(None, *args, **kwargs)
+
+        if not current_user.is_authenticated:
+            return _respuesta({"error": "No autenticado"}, 401)
+
+        puede_acceder, razon = current_user.puede_acceder()
+        if not puede_acceder:
+            return _respuesta({"error": f"Acceso restringido: {razon}"}, 403)
+
+        if current_user.is_superadmin:
+            return f(None, *args, **kwargs)
+
+        if current_user.colegio_id is None:
+            return _respuesta({"error": "El usuario no tiene un colegio asignado"}, 403)
+
+        return f(current_user.colegio_id, *args, **kwargs)
+
+    return decorated_function
+
+
+def _pagina(nombre, colegio_id):
+    try:
+        pagina = listar(nombre, request.args, colegio_id=colegio_id)
+    except ErrorApi as e:
+        return _respuesta({"error": str(e)}, 400)
+
+    siguiente = None
+    if pagina.siguiente_cursor:
+        siguiente = url_for(
+            request.endpoint,
+            **{**request.args.to_dict(), "cursor": pagina.siguiente_cursor}
+        )
+
+    respuesta = _respuesta({
+        "data": pagina.filas,
+        "next_cursor": pagina.siguiente_cursor,
+    })
+    if siguiente:
+        respuesta.headers["Link"] = f'<{siguiente}>; rel="next"'
+    respuesta.headers["Cache-Control"] = "private, no-cache"
+    return respuesta
+
+
+# ════════════════════════════════════════════════════════════════
+# RECURSOS
+# ════════════════════════════════════════════════════════════════
+
+@api_bp.route("/colegios")
+@api_autenticada
+def colegios(colegio_id):
+    """?fields=id,nombre&limit=&cursor="""
+    return _pagina("colegios", colegio_id)
+
+
+@api_bp.route("/docentes")
+@api_autenticada
+def docentes(colegio_id):
+    """?fields=&activo=true|false&limit=&cursor="""
+    return _pagina("docentes", colegio_id)
+
+
+@api_bp.route("/permisos")
+@api_autenticada
+def permisos(colegio_id):
+    """?fields=&desde=AAAA-MM-DD&hasta=AAAA-MM-DD&tipo=&docente_id=&limit=&cursor="""
+    return _pagina("permisos", colegio_id)
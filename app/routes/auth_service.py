@@ -1,4 +1,4 @@
-from werkzeug.security import check_password_hash
+from app.services.hash_service import generar_hash, verificar_hash, necesita_rehash
 from datetime import datetime, timedelta
 from app.models.usuario import Usuario
 from app.extensions import db
@@ -23,7 +23,7 @@ def login_usuario(email, password):
         return False, f"Usuario bloqueado. Intenta en {segundos} segundos"
 
     # 🔐 Contraseña incorrecta
-    if not check_password_hash(usuario.password_hash, password):
+    if not verificar_hash(usuario.password_hash, password):
         usuario.failed_attempts = (usuario.failed_attempts or 0) + 1
 
         # 🚨 LLEGÓ AL LÍMITE
@@ -49,6 +49,11 @@ def login_usuario(email, password):
     # ✅ LOGIN EXITOSO → limpiar seguridad
     usuario.failed_attempts = 0
     usuario.locked_until = None
+
+    # 🔄 Hash con parámetros viejos: regenerarlo con los actuales
+    if necesita_rehash(usuario.password_hash):
+        usuario.password_hash = generar_hash(password)
+
     db.session.commit()
 
     return True, usuario
\ No newline at end of file
@@ -1,9 +1,16 @@
+import csv
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import login_required, current_user
 from app.models.docente import Docente
 from app.models.permiso import Permiso
 from app.extensions import db
+from app.services.permiso_service import FiltrosPermiso, paginar_permisos, contar_permisos, parse_fecha
+from app.services.solapamiento_service import validar_permiso
+from app.services.estadisticas_service import obtener_estadisticas_colegio
+from app.services.importacion_service import abrir_csv, importar_docentes
+from app.services.docente_service import docentes_para_select, paginar_docentes
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 
 colegio_bp = Blueprint("colegio", __name__, url_prefix="/dashboard")
 
@@ -17,47 +24,21 @@ def dashboard():
     if current_user.is_superadmin:
         return redirect(url_for('admin.dashboard'))
 
-    # Estadísticas específicas del colegio
-    total_docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).count()
-
-    total_permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).count()
-
-    # Permisos activos (hoy está entre fecha_inicio y fecha_fin)
+    # Las consultas se pasan como funciones: sólo se ejecutan si el
+    # fragmento cacheado de la plantilla no está vigente
     hoy = datetime.utcnow().date()
-    permisos_activos = Permiso.query.filter(
-        Permiso.colegio_id == current_user.colegio_id,
-        Permiso.fecha_inicio <= hoy,
-        Permiso.fecha_fin >= hoy
-    ).count()
-
-    # Permisos pendientes (fecha_inicio > hoy)
-    permisos_pendientes = Permiso.query.filter(
-        Permiso.colegio_id == current_user.colegio_id,
-        Permiso.fecha_inicio > hoy
-    ).count()
-
-    # Docentes activos
-    docentes_activos = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).count()
-
-    # Últimos 5 permisos
-    ultimos_permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).limit(5).all()
+    colegio_id = current_user.colegio_id
+
+    def ultimos_permisos():
+        return Permiso.query.options(
+            joinedload(Permiso.docente)
+        ).filter_by(
+            colegio_id=colegio_id
+        ).order_by(Permiso.fecha_inicio.desc()).limit(5).all()
 
     return render_template(
         "colegio/dashboard.html",
-        total_docentes=total_docentes,
-        total_permisos=total_permisos,
-        permisos_activos=permisos_activos,
-        permisos_pendientes=permisos_pendientes,
-        docentes_activos=docentes_activos,
+        estadisticas=lambda: obtener_estadisticas_colegio(colegio_id, hoy),
         ultimos_permisos=ultimos_permisos,
         hoy=hoy
     )
@@ -70,12 +51,18 @@ def dashboard():
 @colegio_bp.route("/docentes")
 @login_required
 def lista_docentes():
-    """Lista de docentes del colegio actual (dentro del dashboard)"""
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Docente.nombre).all()
+    """Lista de docentes del colegio actual (dentro del dashboard), paginada"""
+    pagina = paginar_docentes(current_user.colegio_id, cursor=request.args.get("cursor"))
+
+    url_siguiente = None
+    if pagina.hay_mas:
+        url_siguiente = url_for("colegio.lista_docentes", cursor=pagina.siguiente_cursor)
 
-    return render_template("colegio/docentes.html", docentes=docentes)
+    return render_template(
+        "colegio/docentes.html",
+        docentes=pagina.docentes,
+        url_siguiente=url_siguiente
+    )
 
 
 # ════════════════════════════════════════════════════════════════
@@ -125,6 +112,40 @@ def nuevo_docente():
     return render_template("colegio/formulario_docente.html", docente=None, titulo="Nuevo Docente")
 
 
+# ════════════════════════════════════════════════════════════════
+# IMPORTAR DOCENTES DESDE CSV
+# ════════════════════════════════════════════════════════════════
+
+@colegio_bp.route("/docentes/importar", methods=["GET", "POST"])
+@login_required
+def importar_docentes_csv():
+    """Carga masiva de docentes desde un archivo CSV"""
+    resultado = None
+
+    if request.method == "POST":
+        archivo = request.files.get("archivo")
+        if not archivo or not archivo.filename:
+            flash("Selecciona un archivo CSV", "danger")
+            return redirect(url_for("colegio.importar_docentes_csv"))
+
+        try:
+            resultado = importar_docentes(abrir_csv(archivo.stream), current_user.colegio_id)
+        except UnicodeDecodeError:
+            flash("El archivo debe estar codificado en UTF-8", "danger")
+            return redirect(url_for("colegio.importar_docentes_csv"))
+        except (ValueError, csv.Error) as e:
+            flash(f"No se pudo leer el archivo: {e}", "danger")
+            return redirect(url_for("colegio.importar_docentes_csv"))
+
+        flash(
+            f"{resultado.insertados} docente(s) importados, "
+            f"{resultado.total_errores} fila(s) con observaciones",
+            "success" if resultado.insertados else "warning"
+        )
+
+    return render_template("colegio/importar_docentes.html", resultado=resultado)
+
+
 # ════════════════════════════════════════════════════════════════
 # EDITAR DOCENTE DENTRO DEL DASHBOARD
 # ════════════════════════════════════════════════════════════════
@@ -215,13 +236,37 @@ def eliminar_docente(id):
 @login_required
 def lista_permisos():
     """Lista de permisos del colegio actual (dentro del dashboard)"""
-    permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).all()
+    filtros = FiltrosPermiso.desde_request(request.args)
+    pagina = paginar_permisos(
+        current_user.colegio_id,
+        filtros,
+        cursor=request.args.get("cursor")
+    )
+
+    docentes, buscador = docentes_para_select(
+        current_user.colegio_id,
+        seleccionado_id=filtros.docente_id
+    )
+
+    url_siguiente = None
+    if pagina.hay_mas:
+        url_siguiente = url_for(
+            "colegio.lista_permisos",
+            cursor=pagina.siguiente_cursor,
+            **filtros.como_args()
+        )
 
     hoy = datetime.utcnow().date()
 
-    return render_template("colegio/permisos.html", permisos=permisos, hoy=hoy)
+    return render_template(
+        "colegio/permisos.html",
+        permisos=pagina.permisos,
+        docentes=docentes,
+        buscador=buscador,
+        filtros=filtros,
+        url_siguiente=url_siguiente,
+        hoy=hoy
+    )
 
 # ════════════════════════════════════════════════════════════════
 # PERMISOS DE UN DOCENTE ESPECÍFICO
@@ -236,17 +281,35 @@ def permisos_docente(docente_id):
         colegio_id=current_user.colegio_id
     ).first_or_404()
 
-    permisos = Permiso.query.filter_by(
-        docente_id=docente_id,
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).all()
+    filtros = FiltrosPermiso.desde_request(request.args)
+    filtros.docente_id = docente.id
+    pagina = paginar_permisos(
+        current_user.colegio_id,
+        filtros,
+        cursor=request.args.get("cursor")
+    )
 
     hoy = datetime.utcnow().date()
+    total_permisos, _ = contar_permisos(current_user.colegio_id, filtros, hoy)
+
+    url_siguiente = None
+    if pagina.hay_mas:
+        args = filtros.como_args()
+        args.pop("docente_id", None)
+        url_siguiente = url_for(
+            "colegio.permisos_docente",
+            docente_id=docente.id,
+            cursor=pagina.siguiente_cursor,
+            **args
+        )
 
     return render_template(
         "colegio/permisos_docente.html",
         docente=docente,
-        permisos=permisos,
+        permisos=pagina.permisos,
+        total_permisos=total_permisos,
+        filtros=filtros,
+        url_siguiente=url_siguiente,
         hoy=hoy
     )
 # ════════════════════════════════════════════════════════════════
@@ -257,36 +320,21 @@ def permisos_docente(docente_id):
 @login_required
 def nuevo_permiso():
     """Registrar nuevo permiso (dentro del dashboard)"""
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).all()
-
-    # Obtener todos los permisos del colegio para mostrar historial
-    # Convertir a formato serializable para JSON
-    permisos_query = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).all()
-
-    # Serializar permisos manualmente
-    todos_permisos = []
-    for permiso in permisos_query:
-        todos_permisos.append({
-            'id': permiso.id,
-            'docente_id': permiso.docente_id,
-            'tipo': permiso.tipo,
-            'fecha_inicio': permiso.fecha_inicio.isoformat() if permiso.fecha_inicio else None,
-            'fecha_fin': permiso.fecha_fin.isoformat() if permiso.fecha_fin else None,
-            'observacion': permiso.observacion
-        })
+    if request.method == "POST":
+        docente_id = request.form.get("docente_id", type=int)
+        fecha_inicio = parse_fecha(request.form.get("fecha_inicio"))
+        fecha_fin = parse_fecha(request.form.get("fecha_fin"))
 
-    hoy = datetime.utcnow().date()
+        # Validar cruces con permisos existentes del docente
+        ok, mensaje = validar_permiso(docente_id, fecha_inicio, fecha_fin)
+        if not ok:
+            flash(mensaje, "danger")
+            return redirect(url_for("colegio.nuevo_permiso"))
 
-    if request.method == "POST":
         permiso = Permiso(
-            docente_id=request.form.get("docente_id"),
-            fecha_inicio=request.form.get("fecha_inicio"),
-            fecha_fin=request.form.get("fecha_fin"),
+            docente_id=docente_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
             tipo=request.form.get("tipo"),
             observacion=request.form.get("observacion"),
             colegio_id=current_user.colegio_id
@@ -298,10 +346,21 @@ def nuevo_permiso():
         flash("Permiso registrado correctamente", "success")
         return redirect(url_for("colegio.lista_permisos"))
 
+    # Con muchos docentes el <select> se reemplaza por el buscador
+    docentes, buscador = docentes_para_select(
+        current_user.colegio_id,
+        seleccionado_id=request.args.get("docente_id", type=int),
+        solo_activos=True
+    )
+
+    # El historial de cada docente se pide bajo demanda a
+    # permiso.permisos_por_docente (con ETag), no se incrusta en la página
+    hoy = datetime.utcnow().date()
+
     return render_template(
         "colegio/formulario_permiso.html",
         docentes=docentes,
-        todos_permisos=todos_permisos,
+        buscador=buscador,
         hoy=hoy
     )
 
@@ -3,6 +3,8 @@ from flask_login import login_required, current_user
 from app.extensions import db
 from app.models.docente import Docente
 from app.models.permiso import Permiso
+from app.services.busqueda_docentes_service import RESULTADOS_POR_DEFECTO, buscar_docentes
+from app.services.docente_service import paginar_docentes
 
 docente_bp = Blueprint("docente", __name__, url_prefix="/docentes")
 
@@ -11,11 +13,17 @@ docente_bp = Blueprint("docente", __name__, url_prefix="/docentes")
 @docente_bp.route("/")
 @login_required
 def listar():
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Docente.nombre).all()
+    pagina = paginar_docentes(current_user.colegio_id, cursor=request.args.get("cursor"))
+
+    url_siguiente = None
+    if pagina.hay_mas:
+        url_siguiente = url_for("docente.listar", cursor=pagina.siguiente_cursor)
 
-    return render_template("docentes/listado.html", docentes=docentes)
+    return render_template(
+        "docentes/listado.html",
+        docentes=pagina.docentes,
+        url_siguiente=url_siguiente
+    )
 
 
 # ========== NUEVO DOCENTE ==========
@@ -169,4 +177,22 @@ def cambiar_estado(id):
         "success": True,
         "message": f"Docente {estado} correctamente",
         "activo": docente.activo
+    })
+
+
+# ========== API: BUSCAR (AUTOCOMPLETAR) ==========
+@docente_bp.route("/api/buscar")
+@login_required
+def buscar():
+    """?q=texto&limit=10&activos=0 (por defecto sólo docentes activos)"""
+    docentes = buscar_docentes(
+        current_user.colegio_id,
+        request.args.get("q", ""),
+        limite=request.args.get("limit", RESULTADOS_POR_DEFECTO, type=int),
+        solo_activos=request.args.get("activos", "1") != "0"
+    )
+
+    return jsonify({
+        "success": True,
+        "docentes": docentes
     })
\ No newline at end of file
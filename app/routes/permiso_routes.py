@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 # Al inicio del archivo, DESPUÉS de los imports existentes
 from datetime import datetime
@@ -6,6 +6,10 @@ from app.middleware.auth_middleware import acceso_permitido  # NUEVO IMPORT
 from app.extensions import db
 from app.models.permiso import Permiso
 from app.models.docente import Docente
+from app.services.permiso_service import FiltrosPermiso, paginar_permisos, contar_permisos, parse_fecha, exportar_permisos_csv
+from app.services.solapamiento_service import validar_permiso
+from app.services.calendario_service import obtener_ocupacion
+from app.services.docente_service import docentes_para_select
 from datetime import datetime
 
 permiso_bp = Blueprint("permiso", __name__, url_prefix="/dashboard/permisos")
@@ -13,30 +17,80 @@ permiso_bp = Blueprint("permiso", __name__, url_prefix="/dashboard/permisos")
 @permiso_bp.route("/")
 @login_required
 def listado():
-    permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).all()
+    filtros = FiltrosPermiso.desde_request(request.args)
+    pagina = paginar_permisos(
+        current_user.colegio_id,
+        filtros,
+        cursor=request.args.get("cursor")
+    )
 
     # Pasar la fecha actual para calcular permisos activos
     hoy = datetime.now().date()
+    total_permisos, permisos_activos = contar_permisos(
+        current_user.colegio_id, filtros, hoy
+    )
+
+    docentes, buscador = docentes_para_select(
+        current_user.colegio_id,
+        seleccionado_id=filtros.docente_id
+    )
+
+    url_siguiente = None
+    if pagina.hay_mas:
+        url_siguiente = url_for(
+            "permiso.listado",
+            cursor=pagina.siguiente_cursor,
+            **filtros.como_args()
+        )
 
     return render_template("permisos/listado.html",
-                           permisos=permisos,
+                           permisos=pagina.permisos,
+                           total_permisos=total_permisos,
+                           permisos_activos=permisos_activos,
+                           docentes=docentes,
+                           buscador=buscador,
+                           filtros=filtros,
+                           url_siguiente=url_siguiente,
                            hoy=hoy)  # ← Agregar hoy
 
 
+@permiso_bp.route("/exportar")
+@login_required
+def exportar():
+    """CSV con los permisos del colegio (mismos filtros del listado), en streaming"""
+    filtros = FiltrosPermiso.desde_request(request.args)
+    nombre = f"permisos_{datetime.now():%Y%m%d}.csv"
+
+    return Response(
+        stream_with_context(exportar_permisos_csv(current_user.colegio_id, filtros)),
+        mimetype="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{nombre}"',
+            "Cache-Control": "no-store",
+            # Evita que un proxy (nginx) acumule la respuesta completa
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @permiso_bp.route("/nuevo", methods=["GET", "POST"])
 @login_required
 def nuevo():
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).all()
-
     if request.method == "POST":
+        docente_id = request.form.get("docente_id", type=int)
+        fecha_inicio = parse_fecha(request.form.get("fecha_inicio"))
+        fecha_fin = parse_fecha(request.form.get("fecha_fin"))
+
+        # Validar cruces con permisos existentes del docente
+        ok, mensaje = validar_permiso(docente_id, fecha_inicio, fecha_fin)
+        if not ok:
+            flash(mensaje, "danger")
+            return redirect(url_for("permiso.nuevo"))
+
         permiso = Permiso(
-            docente_id=request.form.get("docente_id"),
-            fecha_inicio=request.form.get("fecha_inicio"),
-            fecha_fin=request.form.get("fecha_fin"),
+            docente_id=docente_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
             tipo=request.form.get("tipo"),
             observacion=request.form.get("observacion"),
             colegio_id=current_user.colegio_id
@@ -48,7 +102,14 @@ def nuevo():
         flash("Permiso registrado correctamente", "success")
         return redirect(url_for("permiso.listado"))
 
-    return render_template("permisos/formulario.html", docentes=docentes)
+    # Con muchos docentes la lista se reemplaza por el buscador (docente.buscar);
+    # sólo se envía el docente preseleccionado con ?docente_id=
+    docentes, buscador = docentes_para_select(
+        current_user.colegio_id,
+        seleccionado_id=request.args.get("docente_id", type=int)
+    )
+
+    return render_template("permisos/formulario.html", docentes=docentes, buscador=buscador)
 
 
 @permiso_bp.route("/eliminar/<int:id>", methods=["POST"])
@@ -71,7 +132,12 @@ def eliminar(id):
 @permiso_bp.route("/api/permisos-docente/<int:docente_id>")
 @login_required
 def permisos_por_docente(docente_id):
-    """API para obtener permisos de un docente específico"""
+    """
+    API para obtener permisos de un docente específico.
+
+    La respuesta lleva un ETag calculado sobre el contenido; si el navegador
+    envía If-None-Match con el mismo valor se responde 304 sin cuerpo.
+    """
     # Verificar que el docente pertenece al colegio del usuario
     docente = Docente.query.filter_by(
         id=docente_id,
@@ -91,17 +157,42 @@ def permisos_por_docente(docente_id):
             'tipo': permiso.tipo,
             'fecha_inicio': permiso.fecha_inicio.strftime('%d/%m/%Y'),
             'fecha_fin': permiso.fecha_fin.strftime('%d/%m/%Y'),
+            'fecha_inicio_iso': permiso.fecha_inicio.isoformat(),
+            'fecha_fin_iso': permiso.fecha_fin.isoformat(),
             'observacion': permiso.observacion or '',
             'dias': (permiso.fecha_fin - permiso.fecha_inicio).days + 1
         })
 
-    return jsonify({
+    response = jsonify({
         'success': True,
         'docente': docente.nombre,
         'permisos': permisos_json,
         'total': len(permisos_json)
     })
 
+    # ✅ Revalidación barata: el navegador guarda la respuesta y pregunta con ETag
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+@permiso_bp.route("/api/calendario/<int:anio>/<int:mes>")
+@login_required
+def calendario_mensual(anio, mes):
+    """
+    Docentes ausentes en cada día del mes (conteo y nombres).
+    Responde con ETag igual que permisos_por_docente.
+    """
+    if not 1 <= mes <= 12 or not 1900 <= anio <= 9999:
+        return jsonify({'success': False, 'error': 'Mes inválido'}), 400
+
+    ocupacion = obtener_ocupacion(current_user.colegio_id, anio, mes)
+
+    response = jsonify({'success': True, **ocupacion.como_dict()})
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
 
 @permiso_bp.route("/editar/<int:id>", methods=["GET", "POST"])
 @login_required
@@ -109,10 +200,21 @@ def editar(id):
     permiso = Permiso.query.get_or_404(id)
 
     if request.method == "POST":
+        fecha_inicio = parse_fecha(request.form.get("fecha_inicio"))
+        fecha_fin = parse_fecha(request.form.get("fecha_fin"))
+
+        # Validar cruces (excluyendo este mismo permiso)
+        ok, mensaje = validar_permiso(
+            permiso.docente_id, fecha_inicio, fecha_fin, permiso_id=permiso.id
+        )
+        if not ok:
+            flash(mensaje, "danger")
+            return redirect(url_for("permiso.editar", id=id))
+
         # Actualizar los campos
         permiso.tipo = request.form.get("tipo")
-        permiso.fecha_inicio = request.form.get("fecha_inicio")
-        permiso.fecha_fin = request.form.get("fecha_fin")
+        permiso.fecha_inicio = fecha_inicio
+        permiso.fecha_fin = fecha_fin
         permiso.observacion = request.form.get("observacion")
 
         # Guardar cambios
@@ -0,0 +1,120 @@
+"""
+Barrido de vencimientos de prueba.
+
+Usuario.estado_acceso guarda el estado de acceso ya calculado. Al guardar un
+usuario por el ORM se recalcula solo; lo que cambia con el paso del tiempo
+(prueba que entra en aviso o vence) lo corrige este barrido con un único
+UPDATE sobre las filas cuyo estado ya no coincide.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, case, func, or_, update
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.services.cache_service import notificar_usuarios_modificados
+
+logger = logging.getLogger(__name__)
+
+
+def expresion_vencimiento_prueba(ahora):
+    """
+    fecha_registro + dias_prueba en SQL: el vencimiento que usa
+    Usuario.vencimiento() cuando no hay fecha_expiracion.
+    """
+    registro = func.coalesce(Usuario.fecha_registro, ahora)
+    dias = func.coalesce(Usuario.dias_prueba, 0)
+    if db.engine.dialect.name == "postgresql":
+        return registro + func.make_interval(0, 0, 0, dias)
+    # SQLite guarda las fechas como texto ISO: datetime() suma los días
+    return func.datetime(registro, func.printf("+%d days", dias), type_=DateTime)
+
+
+def expresion_estado_acceso(ahora, activo=None, aprobado=None, vence=None):
+    """
+    CASE equivalente a Usuario.calcular_estado_acceso: sin fecha_expiracion
+    la prueba vence en fecha_registro + dias_prueba.
+    activo, aprobado y vence reemplazan la columna correspondiente por otra
+    expresión, para calcular el estado con los valores nuevos de un UPDATE.
+    """
+    activo = Usuario.is_active if activo is None else activo
+    aprobado = Usuario.is_approved if aprobado is None else aprobado
+    vence = func.coalesce(
+        Usuario.fecha_expiracion if vence is None else vence,
+        expresion_vencimiento_prueba(ahora),
+        type_=DateTime
+    )
+    aviso = ahora + timedelta(days=Usuario.DIAS_AVISO_VENCIMIENTO + 1)
+    return case(
+        (activo.is_(False), Usuario.ACCESO_BLOQUEADO),
+        (or_(Usuario.is_superadmin.is_(True), aprobado.is_(True)), Usuario.ACCESO_APROBADO),
+        (vence < ahora, Usuario.ACCESO_VENCIDO),
+        (vence < aviso, Usuario.ACCESO_POR_VENCER),
+        else_=Usuario.ACCESO_PRUEBA
+    )
+
+
+def barrer_estados_acceso(ahora=None):
+    """
+    Actualiza estado_acceso de todos los usuarios cuyo estado cambió.
+    Retorna la lista de ids modificados (y los invalida en la caché).
+    """
+    ahora = ahora or datetime.utcnow()
+    nuevo = expresion_estado_acceso(ahora)
+
+    ids = db.session.scalars(
+        update(Usuario)
+        .where(Usuario.estado_acceso != nuevo)
+        .values(estado_acceso=nuevo)
+        .returning(Usuario.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+
+    # El UPDATE masivo no pasa por los eventos del ORM
+    notificar_usuarios_modificados(ids)
+    return ids
+
+
+# ════════════════════════════════════════════════════════════════
+# BARRIDO PERIÓDICO EN SEGUNDO PLANO
+# ════════════════════════════════════════════════════════════════
+
+class BarridoAcceso:
+    """
+    Hilo por worker que ejecuta el barrido cada ACCESO_BARRIDO_INTERVALO
+    segundos. Varios workers pueden barrer a la vez sin problema: el UPDATE
+    sólo toca las filas desactualizadas.
+    """
+
+    def __init__(self):
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def iniciar(self, app):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(
+                target=self._bucle, args=(app,), name="barrido-acceso", daemon=True
+            )
+            self._hilo.start()
+
+    def _bucle(self, app):
+        intervalo = app.config.get("ACCESO_BARRIDO_INTERVALO", 300)
+        detener = threading.Event()
+        while not detener.wait(intervalo):
+            try:
+                with app.app_context():
+                    ids = barrer_estados_acceso()
+                if ids:
+                    logger.info("Barrido de acceso: %s usuario(s) actualizados", len(ids))
+            except Exception:
+                logger.exception("Error en el barrido de estados de acceso")
+
+
+barrido = BarridoAcceso()
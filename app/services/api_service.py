@@ -0,0 +1,184 @@
+"""
+Consultas de la API de lectura /api/v1 (colegios, docentes y permisos).
+
+Cada recurso declara sus campos públicos y la columna de cada uno; con
+fields=id,nombre sólo se seleccionan esas columnas (sin cargar objetos del
+ORM). La paginación es por cursor sobre el id ascendente: cada página cuesta
+lo mismo y un consumidor puede retomar la descarga desde el último id visto.
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+from app.services.permiso_service import FiltrosPermiso, _parse_int, parse_fecha
+
+FILAS_POR_PAGINA = 100
+MAX_FILAS_POR_PAGINA = 1000
+
+
+@dataclass(frozen=True)
+class Recurso:
+    modelo: type
+    campos: dict
+    por_defecto: tuple
+    # Campos que necesitan unir otra tabla: {campo: (modelo, condición)}
+    uniones: dict = field(default_factory=dict)
+
+
+RECURSOS = {
+    "colegios": Recurso(
+        modelo=Colegio,
+        campos={"id": Colegio.id, "nombre": Colegio.nombre},
+        por_defecto=("id", "nombre"),
+    ),
+    "docentes": Recurso(
+        modelo=Docente,
+        campos={
+            "id": Docente.id,
+            "nombre": Docente.nombre,
+            "colegio_id": Docente.colegio_id,
+            "documento": Docente.documento,
+            "telefono": Docente.telefono,
+            "email": Docente.email,
+            "activo": Docente.activo,
+            "fecha_creacion": Docente.fecha_creacion,
+        },
+        por_defecto=("id", "nombre", "colegio_id", "activo"),
+    ),
+    "permisos": Recurso(
+        modelo=Permiso,
+        campos={
+            "id": Permiso.id,
+            "docente_id": Permiso.docente_id,
+            "docente": Docente.nombre,
+            "colegio_id": Permiso.colegio_id,
+            "tipo": Permiso.tipo,
+            "fecha_inicio": Permiso.fecha_inicio,
+            "fecha_fin": Permiso.fecha_fin,
+            "observacion": Permiso.observacion,
+        },
+        por_defecto=("id", "docente_id", "tipo", "fecha_inicio", "fecha_fin"),
+        uniones={"docente": (Docente, Docente.id == Permiso.docente_id)},
+    ),
+}
+
+
+class ErrorApi(ValueError):
+    """Parámetro inválido (respuesta 400)"""
+
+
+def _bool(valor):
+    if valor is None or valor == "":
+        return None
+    valor = valor.lower()
+    if valor in ("true", "1", "si", "sí"):
+        return True
+    if valor in ("false", "0", "no"):
+        return False
+    raise ErrorApi("activo debe ser true o false")
+
+
+def campos_pedidos(recurso, fields):
+    """Nombres de campos de `fields=` (id siempre incluido, lo usa el cursor)"""
+    if not fields:
+        return recurso.por_defecto
+    nombres = [n.strip() for n in fields.split(",") if n.strip()]
+    desconocidos = [n for n in nombres if n not in recurso.campos]
+    if desconocidos:
+        raise ErrorApi(
+            f"Campos desconocidos: {', '.join(desconocidos)}. "
+            f"Disponibles: {', '.join(recurso.campos)}"
+        )
+    if "id" not in nombres:
+        nombres.insert(0, "id")
+    return tuple(dict.fromkeys(nombres))
+
+
+def _condiciones(nombre, args):
+    """Filtros de la querystring según el recurso"""
+    if nombre == "docentes":
+        activo = _bool(args.get("activo"))
+        return [] if activo is None else [Docente.activo.is_(activo)]
+
+    if nombre == "permisos":
+        # En el HTML una fecha inválida se ignora; en la API es un error
+        for parametro in ("desde", "hasta"):
+            if args.get(parametro) and parse_fecha(args[parametro]) is None:
+                raise ErrorApi(f"{parametro} debe tener el formato AAAA-MM-DD")
+        return FiltrosPermiso.desde_request(args).condiciones()
+
+    return []
+
+
+def _alcance(recurso, colegio_id):
+    """Restricción al colegio del usuario (None = todos los colegios)"""
+    if colegio_id is None:
+        return []
+    if recurso.modelo is Colegio:
+        return [Colegio.id == colegio_id]
+    return [recurso.modelo.colegio_id == colegio_id]
+
+
+@dataclass
+class PaginaApi:
+    filas: List[dict]
+    siguiente_cursor: Optional[str] = None
+
+
+def listar(nombre, args, colegio_id=None):
+    """
+    Una página del recurso `nombre` según los parámetros de la querystring:
+    fields, limit, cursor y los filtros del recurso.
+    """
+    recurso = RECURSOS[nombre]
+    campos = campos_pedidos(recurso, args.get("fields"))
+
+    limite = _parse_int(args.get("limit")) or FILAS_POR_PAGINA
+    limite = max(1, min(limite, MAX_FILAS_POR_PAGINA))
+
+    cursor = args.get("cursor")
+    despues_de = _parse_int(cursor) if cursor else None
+    if cursor and despues_de is None:
+        raise ErrorApi("cursor inválido")
+
+    id_columna = recurso.campos["id"]
+    consulta = select(*(recurso.campos[c].label(c) for c in campos)).select_from(recurso.modelo)
+    for campo in campos:
+        if campo in recurso.uniones:
+            modelo, condicion = recurso.uniones[campo]
+            consulta = consulta.join(modelo, condicion)
+
+    consulta = consulta.where(
+        *_alcance(recurso, colegio_id),
+        *_condiciones(nombre, args)
+    )
+    if despues_de is not None:
+        consulta = consulta.where(id_columna > despues_de)
+
+    # Una fila extra para saber si hay otra página
+    filas = db.session.execute(consulta.order_by(id_columna).limit(limite + 1)).all()
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = str(filas[-1].id)
+
+    return PaginaApi(filas=[dict(f._mapping) for f in filas], siguiente_cursor=siguiente)
+
+
+def _serializar(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def json_compacto(datos):
+    """JSON sin espacios ni escapes de caracteres no ASCII"""
+    return json.dumps(datos, separators=(",", ":"), ensure_ascii=False, default=_serializar)
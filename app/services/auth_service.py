@@ -1,4 +1,4 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from app.services.hash_service import generar_hash, verificar_hash, necesita_rehash
 from datetime import datetime, timedelta
 from app.models.usuario import Usuario
 from app.models.colegio import Colegio
@@ -14,13 +14,18 @@ def login_usuario(email, password):
     if not usuario:
         return False, "Usuario no encontrado"
 
-    if not check_password_hash(usuario.password_hash, password):
+    if not verificar_hash(usuario.password_hash, password):
         return False, "Contraseña incorrecta"
 
     # ✅ CORREGIDO: Usar is_active en lugar de estatus
     if not usuario.is_active:
         return False, "Usuario no activo"
 
+    # 🔄 Hash con parámetros viejos: regenerarlo con los actuales
+    if necesita_rehash(usuario.password_hash):
+        usuario.password_hash = generar_hash(password)
+        db.session.commit()
+
     return True, usuario
 
 
@@ -50,7 +55,7 @@ def registrar_usuario(email, password, colegio_nombre):
     # Crear el usuario
     usuario = Usuario(
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=generar_hash(password),
         colegio_id=colegio.id,
         fecha_registro=datetime.utcnow(),
         is_superadmin=es_admin,  # ⭐ Primer usuario = superadmin
@@ -102,7 +107,7 @@ def resetear_contrasena_por_email(email, nueva_contrasena):
         return False, mensaje_error
 
     # Actualizar contraseña
-    usuario.password_hash = generate_password_hash(nueva_contrasena)
+    usuario.password_hash = generar_hash(nueva_contrasena)
     db.session.commit()
 
     return True, "Contraseña actualizada exitosamente"
@@ -0,0 +1,285 @@
+"""
+Búsqueda de docentes por nombre o documento (autocompletar).
+
+Con DOCENTES_INDICE_MEMORIA cada worker guarda un índice por colegio:
+    - las palabras normalizadas del nombre y el documento, ordenadas; un
+      prefijo se resuelve con dos búsquedas binarias (bisect)
+    - los trigramas de cada palabra distinta (como pg_trgm), para encontrar
+      nombres mal escritos cuando los prefijos no llenan la lista
+El índice lleva la versión de la nómina del colegio (versiones_service);
+cualquier alta, cambio o baja de docentes la cambia y la siguiente búsqueda
+lo reconstruye con una sola consulta.
+
+Sin el índice en memoria se consulta la base: en PostgreSQL con los índices
+ix_docentes_nombre_trgm (GIN, pg_trgm) e ix_docentes_colegio_documento; en
+SQLite con LIKE sobre el índice (colegio_id, nombre).
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.services.cache_service import CacheTTL, al_modificar_docentes
+from app.services.versiones_service import incrementar_version, obtener_version
+
+MIN_CARACTERES = 2
+RESULTADOS_POR_DEFECTO = 10
+MAX_RESULTADOS = 50
+# Similitud mínima de trigramas (el valor por defecto de pg_trgm)
+UMBRAL_SIMILITUD = 0.3
+
+_indices = CacheTTL(ttl=3600, max_entradas=256)
+_construyendo = set()
+_lock = threading.Lock()
+
+
+def clave_version(colegio_id):
+    return f"docentes:{colegio_id}"
+
+
+@al_modificar_docentes
+def nueva_version_nomina(colegio_ids):
+    for colegio_id in colegio_ids:
+        incrementar_version(clave_version(colegio_id))
+
+
+# ════════════════════════════════════════════════════════════════
+# NORMALIZACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con un solo espacio entre palabras"""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split())
+
+
+def _solo_alfanumerico(texto):
+    """Documento sin puntos, guiones ni espacios (1.234.567 -> 1234567)"""
+    return re.sub(r"[\W_]", "", texto)
+
+
+def _trigramas(palabras):
+    """Trigramas de cada palabra con el relleno de pg_trgm ("  ana " -> "  a", " an", ...)"""
+    trigramas = set()
+    for palabra in palabras:
+        relleno = f"  {palabra} "
+        trigramas.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return trigramas
+
+
+# ════════════════════════════════════════════════════════════════
+# ÍNDICE EN MEMORIA
+# ════════════════════════════════════════════════════════════════
+
+class IndiceDocentes:
+    """Docentes de un colegio en orden alfabético, con prefijos y trigramas"""
+
+    def __init__(self, filas):
+        self.docentes = [tuple(f) for f in filas]
+
+        palabras = []
+        por_palabra = defaultdict(list)
+        for posicion, (_id, nombre, documento, _activo) in enumerate(self.docentes):
+            for palabra in normalizar(nombre).split():
+                palabras.append((palabra, posicion))
+                por_palabra[palabra].append(posicion)
+            if documento:
+                palabras.append((_solo_alfanumerico(normalizar(documento)), posicion))
+
+        palabras.sort()
+        self._palabras = [p for p, _ in palabras]
+        self._posiciones = [posicion for _, posicion in palabras]
+
+        # Trigramas del vocabulario (nombres y apellidos distintos), no de
+        # cada docente: miles de palabras aunque haya decenas de miles de docentes
+        self._vocabulario = list(por_palabra)
+        self._por_palabra = por_palabra
+        self._cantidad_trigramas = []
+        self._trigramas = defaultdict(list)
+        for numero, palabra in enumerate(self._vocabulario):
+            trigramas = _trigramas([palabra])
+            for trigrama in trigramas:
+                self._trigramas[trigrama].append(numero)
+            self._cantidad_trigramas.append(len(trigramas))
+
+    def _con_prefijo(self, prefijo):
+        desde = bisect_left(self._palabras, prefijo)
+        hasta = bisect_left(self._palabras, prefijo + "\uffff", desde)
+        return set(self._posiciones[desde:hasta])
+
+    def _parecidas(self, palabra):
+        """Posiciones de los docentes con una palabra parecida (similitud de trigramas)"""
+        trigramas = _trigramas([palabra])
+        comunes = Counter()
+        for trigrama in trigramas:
+            comunes.update(self._trigramas.get(trigrama, ()))
+
+        posiciones = set()
+        for numero, en_comun in comunes.items():
+            total = len(trigramas) + self._cantidad_trigramas[numero] - en_comun
+            if en_comun / total >= UMBRAL_SIMILITUD:
+                posiciones.update(self._por_palabra[self._vocabulario[numero]])
+        return posiciones
+
+    def coincidencias(self, palabras, parecidas=False):
+        """
+        Posiciones donde cada palabra de la búsqueda es prefijo de alguna del
+        docente (o, con `parecidas`, también se parece a alguna).
+        """
+        candidatos = None
+        for palabra in sorted(palabras, key=len, reverse=True):
+            encontrados = self._con_prefijo(palabra)
+            documento = _solo_alfanumerico(palabra)
+            if documento and documento != palabra:
+                encontrados |= self._con_prefijo(documento)
+            if parecidas and len(palabra) >= 3:
+                encontrados |= self._parecidas(palabra)
+            candidatos = encontrados if candidatos is None else candidatos & encontrados
+            if not candidatos:
+                break
+        return candidatos or set()
+
+    def buscar(self, consulta, limite, solo_activos=True):
+        palabras = normalizar(consulta).split()
+        if not palabras:
+            return []
+
+        def elegibles(posiciones, excluir=()):
+            return (
+                p for p in posiciones
+                if p not in excluir and (not solo_activos or self.docentes[p][3])
+            )
+
+        # La posición es el orden alfabético: basta con las `limite` menores
+        posiciones = heapq.nsmallest(limite, elegibles(self.coincidencias(palabras)))
+
+        if len(posiciones) < limite and any(len(p) >= 3 for p in palabras):
+            parecidos = self.coincidencias(palabras, parecidas=True)
+            posiciones += heapq.nsmallest(
+                limite - len(posiciones), elegibles(parecidos, excluir=set(posiciones))
+            )
+
+        return [self.docentes[p] for p in posiciones]
+
+
+def _construir_indice(colegio_id):
+    filas = db.session.execute(
+        select(Docente.id, Docente.nombre, Docente.documento, Docente.activo)
+        .where(Docente.colegio_id == colegio_id)
+        .order_by(Docente.nombre, Docente.id)
+    ).all()
+    return IndiceDocentes(filas)
+
+
+def obtener_indice(colegio_id):
+    """
+    Índice vigente del colegio. Mientras una petición lo reconstruye, las
+    demás usan el anterior (si lo hay) en vez de consultar todas a la vez.
+    """
+    version = obtener_version(clave_version(colegio_id))
+    entrada = _indices.obtener(colegio_id)
+    if entrada is not None and entrada[0] == version:
+        return entrada[1]
+
+    with _lock:
+        turno = colegio_id not in _construyendo
+        if turno:
+            _construyendo.add(colegio_id)
+    if not turno and entrada is not None:
+        return entrada[1]
+
+    try:
+        indice = _construir_indice(colegio_id)
+        _indices.guardar(colegio_id, (version, indice))
+        return indice
+    finally:
+        if turno:
+            with _lock:
+                _construyendo.discard(colegio_id)
+
+
+# ════════════════════════════════════════════════════════════════
+# CONSULTA A LA BASE DE DATOS
+# ════════════════════════════════════════════════════════════════
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _buscar_sql(colegio_id, consulta, limite, solo_activos=True):
+    """
+    Prefijo de cualquier palabra del nombre o del documento. En PostgreSQL,
+    si no se llena la lista, completa con nombres parecidos (operador % de
+    pg_trgm, ordenados por similitud).
+    """
+    palabras = consulta.lower().split()
+    if not palabras:
+        return []
+
+    nombre = func.lower(Docente.nombre)
+    por_nombre = and_(*(
+        or_(
+            nombre.like(f"{_escapar_like(p)}%", escape="\\"),
+            nombre.like(f"% {_escapar_like(p)}%", escape="\\")
+        )
+        for p in palabras
+    ))
+    por_documento = Docente.documento.like(f"{_escapar_like(consulta.strip())}%", escape="\\")
+
+    columnas = (Docente.id, Docente.nombre, Docente.documento, Docente.activo)
+    alcance = [Docente.colegio_id == colegio_id]
+    if solo_activos:
+        alcance.append(Docente.activo.is_(True))
+
+    filas = db.session.execute(
+        select(*columnas)
+        .where(*alcance, or_(por_nombre, por_documento))
+        .order_by(Docente.nombre, Docente.id)
+        .limit(limite)
+    ).all()
+
+    texto = " ".join(palabras)
+    if len(filas) < limite and len(texto) >= 3 and db.engine.dialect.name == "postgresql":
+        ids = [f.id for f in filas]
+        filas += db.session.execute(
+            select(*columnas)
+            .where(*alcance, nombre.op("%")(texto), Docente.id.notin_(ids))
+            .order_by(func.similarity(nombre, texto).desc(), Docente.id)
+            .limit(limite - len(filas))
+        ).all()
+
+    return filas
+
+
+# ════════════════════════════════════════════════════════════════
+# API
+# ════════════════════════════════════════════════════════════════
+
+def buscar_docentes(colegio_id, consulta, limite=RESULTADOS_POR_DEFECTO, solo_activos=True):
+    """
+    Docentes del colegio cuyo nombre o documento coincide con `consulta`:
+    primero por prefijo en orden alfabético y después los parecidos.
+    Con menos de MIN_CARACTERES devuelve una lista vacía.
+    """
+    consulta = (consulta or "").strip()
+    if len(consulta) < MIN_CARACTERES:
+        return []
+    limite = max(1, min(limite or RESULTADOS_POR_DEFECTO, MAX_RESULTADOS))
+
+    if current_app.config.get("DOCENTES_INDICE_MEMORIA", True):
+        filas = obtener_indice(colegio_id).buscar(consulta, limite, solo_activos)
+    else:
+        filas = _buscar_sql(colegio_id, consulta, limite, solo_activos)
+
+    return [
+        {"id": id_, "nombre": nombre, "documento": documento, "activo": activo}
+        for id_, nombre, documento, activo in filas
+    ]
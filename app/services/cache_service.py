@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+_FALTA = object()
+
+
+class CacheTTL:
+    """
+    Caché en memoria del proceso con expiración (TTL) y tope de entradas (LRU).
+
+    Cada worker de gunicorn tiene la suya; la invalidación por eventos sólo
+    alcanza al proceso que hizo el cambio, por eso el TTL debe ser corto.
+    """
+
+    def __init__(self, ttl=60, max_entradas=1024):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, default=None):
+        with self._lock:
+            entrada = self._datos.get(clave, _FALTA)
+            if entrada is _FALTA:
+                return default
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return default
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (expira, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+# ════════════════════════════════════════════════════════════════
+# INVALIDACIÓN POR COLEGIO, USUARIO Y PERIODO (EVENTOS DE SESIÓN)
+# ════════════════════════════════════════════════════════════════
+
+_CLAVE_COLEGIOS = "colegios_modificados"
+_CLAVE_USUARIOS = "usuarios_modificados"
+_CLAVE_PERIODOS = "periodos_modificados"
+_CLAVE_DOCENTES = "docentes_modificados"
+_suscriptores = []
+_suscriptores_usuario = []
+_suscriptores_periodo = []
+_suscriptores_docentes = []
+
+
+def al_modificar_colegio(funcion):
+    """
+    Registra `funcion(colegio_ids)` para que se llame después de cada commit
+    que insertó, modificó o eliminó docentes o permisos de esos colegios.
+    """
+    _suscriptores.append(funcion)
+    return funcion
+
+
+def al_modificar_usuario(funcion):
+    """
+    Registra `funcion(usuario_ids)` para que se llame después de cada commit
+    que insertó, modificó o eliminó esos usuarios.
+    """
+    _suscriptores_usuario.append(funcion)
+    return funcion
+
+
+def al_modificar_periodo(funcion):
+    """
+    Registra `funcion(periodos)` para que se llame después de cada commit
+    que tocó permisos. `periodos` es un conjunto de tuplas
+    (colegio_id, fecha_inicio, fecha_fin) con los valores nuevos y, si
+    cambiaron, también los anteriores.
+    """
+    _suscriptores_periodo.append(funcion)
+    return funcion
+
+
+def al_modificar_docentes(funcion):
+    """
+    Registra `funcion(colegio_ids)` para que se llame después de cada commit
+    que insertó, modificó o eliminó docentes de esos colegios (sólo la
+    nómina; los permisos no cuentan).
+    """
+    _suscriptores_docentes.append(funcion)
+    return funcion
+
+
+def notificar_colegios_modificados(colegio_ids):
+    """Invalida manualmente (p. ej. tras un INSERT masivo que no pasa por el ORM)"""
+    colegio_ids = {c for c in colegio_ids if c is not None}
+    if not colegio_ids:
+        return
+    for funcion in _suscriptores:
+        funcion(colegio_ids)
+
+
+def notificar_usuarios_modificados(usuario_ids):
+    """Invalida manualmente (p. ej. tras un UPDATE masivo que no pasa por el ORM)"""
+    usuario_ids = {u for u in usuario_ids if u is not None}
+    if not usuario_ids:
+        return
+    for funcion in _suscriptores_usuario:
+        funcion(usuario_ids)
+
+
+def notificar_docentes_modificados(colegio_ids):
+    """Invalida manualmente (p. ej. tras importar docentes sin pasar por el ORM)"""
+    colegio_ids = {c for c in colegio_ids if c is not None}
+    if not colegio_ids:
+        return
+    for funcion in _suscriptores_docentes:
+        funcion(colegio_ids)
+
+
+def notificar_periodos_modificados(periodos):
+    """Invalida manualmente (p. ej. tras un DELETE masivo de permisos)"""
+    periodos = {p for p in periodos if None not in p}
+    if not periodos:
+        return
+    for funcion in _suscriptores_periodo:
+        funcion(periodos)
+
+
+def _anterior(objeto, atributo):
+    historial = getattr(inspect(objeto).attrs, atributo).history
+    return historial.deleted[0] if historial.deleted else getattr(objeto, atributo)
+
+
+def _periodos_de(permiso):
+    actual = (permiso.colegio_id, permiso.fecha_inicio, permiso.fecha_fin)
+    anterior = tuple(
+        _anterior(permiso, atributo)
+        for atributo in ("colegio_id", "fecha_inicio", "fecha_fin")
+    )
+    return {actual, anterior}
+
+
+def _colegios_de(objeto):
+    colegios = {objeto.colegio_id}
+    historial = inspect(objeto).attrs.colegio_id.history
+    colegios.update(historial.deleted or ())
+    return colegios
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios(session, flush_context):
+    from app.models.docente import Docente
+    from app.models.permiso import Permiso
+    from app.models.usuario import Usuario
+
+    colegios = session.info.setdefault(_CLAVE_COLEGIOS, set())
+    usuarios = session.info.setdefault(_CLAVE_USUARIOS, set())
+    periodos = session.info.setdefault(_CLAVE_PERIODOS, set())
+    docentes = session.info.setdefault(_CLAVE_DOCENTES, set())
+    for objeto in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(objeto, (Docente, Permiso)):
+            colegios.update(_colegios_de(objeto))
+        if isinstance(objeto, Docente):
+            docentes.update(_colegios_de(objeto))
+        if isinstance(objeto, Permiso):
+            periodos.update(_periodos_de(objeto))
+        elif isinstance(objeto, Usuario):
+            # Guardar el mismo valor (p. ej. failed_attempts = 0) no cuenta.
+            # Un alta también avisa: cambia las cifras del panel de administración
+            if objeto in session.new or objeto in session.deleted or session.is_modified(objeto):
+                usuarios.add(objeto.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session):
+    colegios = session.info.pop(_CLAVE_COLEGIOS, None)
+    usuarios = session.info.pop(_CLAVE_USUARIOS, None)
+    periodos = session.info.pop(_CLAVE_PERIODOS, None)
+    docentes = session.info.pop(_CLAVE_DOCENTES, None)
+    if colegios:
+        notificar_colegios_modificados(colegios)
+    if usuarios:
+        notificar_usuarios_modificados(usuarios)
+    if periodos:
+        notificar_periodos_modificados(periodos)
+    if docentes:
+        notificar_docentes_modificados(docentes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tras_rollback(session):
+    session.info.pop(_CLAVE_COLEGIOS, None)
+    session.info.pop(_CLAVE_USUARIOS, None)
+    session.info.pop(_CLAVE_PERIODOS, None)
+    session.info.pop(_CLAVE_DOCENTES, None)
@@ -0,0 +1,189 @@
+import calendar
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List
+
+from flask import current_app
+from sqlalchemy import func, literal_column, select
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+from app.services.cache_service import CacheTTL, al_modificar_periodo
+from app.services.versiones_service import incrementar_version, obtener_version
+
+
+@dataclass
+class DiaOcupacion:
+    fecha: date
+    docentes: List[str] = field(default_factory=list)
+
+    @property
+    def ausentes(self):
+        return len(self.docentes)
+
+    def como_dict(self):
+        return {
+            "fecha": self.fecha.isoformat(),
+            "ausentes": self.ausentes,
+            "docentes": self.docentes
+        }
+
+
+@dataclass
+class OcupacionMes:
+    colegio_id: int
+    anio: int
+    mes: int
+    dias: List[DiaOcupacion] = field(default_factory=list)
+
+    @property
+    def max_ausentes(self):
+        return max((d.ausentes for d in self.dias), default=0)
+
+    def como_dict(self):
+        return {
+            "anio": self.anio,
+            "mes": self.mes,
+            "max_ausentes": self.max_ausentes,
+            "dias": [d.como_dict() for d in self.dias]
+        }
+
+
+def limites_mes(anio, mes):
+    """Primer y último día del mes"""
+    return date(anio, mes, 1), date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+
+def meses_entre(inicio, fin):
+    """(anio, mes) de cada mes que toca el intervalo [inicio, fin]"""
+    anio, mes = inicio.year, inicio.month
+    while (anio, mes) <= (fin.year, fin.month):
+        yield anio, mes
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+# ════════════════════════════════════════════════════════════════
+# CONSULTA Y BARRIDO
+# ════════════════════════════════════════════════════════════════
+
+def _permisos_del_mes(colegio_id, inicio, fin):
+    """
+    (docente_id, nombre, fecha_inicio, fecha_fin) de los permisos del colegio
+    que se cruzan con [inicio, fin], ordenados por fecha_inicio.
+
+    PostgreSQL usa && sobre el índice GiST ix_permisos_colegio_periodo; el
+    resto de motores, el índice (colegio_id, fecha_inicio).
+    """
+    consulta = select(
+        Permiso.docente_id,
+        Docente.nombre,
+        Permiso.fecha_inicio,
+        Permiso.fecha_fin
+    ).join(
+        Docente, Docente.id == Permiso.docente_id
+    ).where(
+        Permiso.colegio_id == colegio_id
+    )
+
+    if db.engine.dialect.name == "postgresql":
+        periodo = func.daterange(Permiso.fecha_inicio, Permiso.fecha_fin, literal_column("'[]'"))
+        consulta = consulta.where(
+            periodo.op("&&")(func.daterange(inicio, fin, literal_column("'[]'")))
+        )
+    else:
+        consulta = consulta.where(
+            Permiso.fecha_inicio <= fin,
+            Permiso.fecha_fin >= inicio
+        )
+
+    return db.session.execute(consulta.order_by(Permiso.fecha_inicio)).all()
+
+
+def calcular_ocupacion(colegio_id, anio, mes):
+    """
+    Docentes ausentes en cada día del mes.
+
+    Un solo barrido sobre los permisos ordenados por inicio: cada día entran
+    los que empiezan y salen (montículo por fecha_fin) los que ya terminaron.
+    Un docente con dos permisos el mismo día cuenta una sola vez.
+    """
+    inicio, fin = limites_mes(anio, mes)
+    permisos = _permisos_del_mes(colegio_id, inicio, fin)
+
+    ocupacion = OcupacionMes(colegio_id=colegio_id, anio=anio, mes=mes)
+    activos = {}      # docente_id -> [nombre, permisos vigentes]
+    terminan = []     # montículo (fecha_fin, docente_id)
+    siguiente = 0
+
+    dia = inicio
+    while dia <= fin:
+        while siguiente < len(permisos) and permisos[siguiente].fecha_inicio <= dia:
+            p = permisos[siguiente]
+            siguiente += 1
+            if p.fecha_fin < dia:
+                continue
+            activos.setdefault(p.docente_id, [p.nombre, 0])[1] += 1
+            heapq.heappush(terminan, (p.fecha_fin, p.docente_id))
+
+        while terminan and terminan[0][0] < dia:
+            _, docente_id = heapq.heappop(terminan)
+            activos[docente_id][1] -= 1
+            if not activos[docente_id][1]:
+                del activos[docente_id]
+
+        ocupacion.dias.append(DiaOcupacion(
+            fecha=dia,
+            docentes=sorted(nombre for nombre, _ in activos.values())
+        ))
+        dia += timedelta(days=1)
+
+    return ocupacion
+
+
+# ════════════════════════════════════════════════════════════════
+# CACHÉ POR (COLEGIO, MES)
+# ════════════════════════════════════════════════════════════════
+
+_cache = CacheTTL(ttl=300, max_entradas=2048)
+
+
+def _clave_version(colegio_id, anio, mes):
+    return f"calendario:{colegio_id}:{anio}-{mes:02d}"
+
+
+def obtener_ocupacion(colegio_id, anio, mes):
+    """
+    Ocupación del mes desde la caché mientras su versión siga vigente.
+
+    La versión compartida cambia cuando se crea, edita o elimina un permiso
+    cuyo periodo toca ese mes. Un cambio de nombre de un docente se refleja
+    al vencer el TTL (CALENDARIO_CACHE_TTL).
+    """
+    clave = (colegio_id, anio, mes)
+    version = obtener_version(_clave_version(*clave))
+
+    entrada = _cache.obtener(clave)
+    if entrada is not None and entrada[0] == version:
+        return entrada[1]
+
+    ocupacion = calcular_ocupacion(colegio_id, anio, mes)
+    _cache.guardar(
+        clave,
+        (version, ocupacion),
+        ttl=current_app.config.get("CALENDARIO_CACHE_TTL")
+    )
+    return ocupacion
+
+
+@al_modificar_periodo
+def invalidar_calendario(periodos):
+    claves = set()
+    for colegio_id, fecha_inicio, fecha_fin in periodos:
+        for anio, mes in meses_entre(fecha_inicio, fecha_fin):
+            claves.add((colegio_id, anio, mes))
+
+    for clave in claves:
+        _cache.invalidar(clave)
+        incrementar_version(_clave_version(*clave))
@@ -0,0 +1,95 @@
+"""
+Nómina de docentes para listados y formularios.
+
+Un colegio puede tener miles de docentes:
+    - los listados se paginan por cursor sobre (nombre, id), que resuelve el
+      índice ix_docentes_colegio_nombre sin OFFSET
+    - los <select> de los formularios y filtros sólo llevan la lista completa
+      hasta DOCENTES_MAX_SELECT docentes; por encima la página muestra el
+      buscador (docente.buscar) y sólo el docente ya elegido
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app.models.docente import Docente
+from app.services.permiso_service import _parse_int
+
+DOCENTES_POR_PAGINA = 100
+
+
+# ════════════════════════════════════════════════════════════════
+# CURSOR (KEYSET SOBRE nombre, id)
+# ════════════════════════════════════════════════════════════════
+
+def codificar_cursor(docente):
+    return f"{docente.id}_{docente.nombre}"
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (nombre, id) o None si el cursor no es válido"""
+    if not cursor:
+        return None
+    docente_id, _, nombre = cursor.partition("_")
+    docente_id = _parse_int(docente_id)
+    if docente_id is None or not nombre:
+        return None
+    return nombre, docente_id
+
+
+@dataclass
+class PaginaDocentes:
+    docentes: List[Docente] = field(default_factory=list)
+    siguiente_cursor: Optional[str] = None
+
+    @property
+    def hay_mas(self):
+        return self.siguiente_cursor is not None
+
+
+def paginar_docentes(colegio_id, cursor=None, limite=DOCENTES_POR_PAGINA):
+    """Una página de docentes del colegio en orden alfabético"""
+    consulta = Docente.query.filter(Docente.colegio_id == colegio_id)
+
+    clave = decodificar_cursor(cursor)
+    if clave:
+        nombre, docente_id = clave
+        consulta = consulta.filter(or_(
+            Docente.nombre > nombre,
+            and_(Docente.nombre == nombre, Docente.id > docente_id)
+        ))
+
+    # Se pide una fila extra para saber si existe otra página
+    docentes = consulta.order_by(Docente.nombre, Docente.id).limit(limite + 1).all()
+
+    siguiente_cursor = None
+    if len(docentes) > limite:
+        docentes = docentes[:limite]
+        siguiente_cursor = codificar_cursor(docentes[-1])
+
+    return PaginaDocentes(docentes=docentes, siguiente_cursor=siguiente_cursor)
+
+
+# ════════════════════════════════════════════════════════════════
+# OPCIONES DE UN <select>
+# ════════════════════════════════════════════════════════════════
+
+def docentes_para_select(colegio_id, seleccionado_id=None, solo_activos=False):
+    """
+    (docentes, buscador): todos los docentes del colegio si no pasan de
+    DOCENTES_MAX_SELECT; si pasan, buscador=True y sólo `seleccionado_id`.
+    """
+    limite = current_app.config["DOCENTES_MAX_SELECT"]
+    consulta = Docente.query.filter_by(colegio_id=colegio_id)
+    if solo_activos:
+        consulta = consulta.filter_by(activo=True)
+
+    docentes = consulta.order_by(Docente.nombre).limit(limite + 1).all()
+    if len(docentes) <= limite:
+        return docentes, False
+
+    if not seleccionado_id:
+        return [], True
+    return consulta.filter_by(id=seleccionado_id).all(), True
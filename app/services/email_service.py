@@ -1,30 +1,115 @@
 # services/email_service.py
 import os
-import resend
+import smtplib
+from email.message import EmailMessage
+
 from flask import url_for  # ✅ IMPORT CORRECTO
 
-resend.api_key = os.getenv("RESEND_API_KEY")
 RESEND_FROM_EMAIL = os.getenv("RESEND_FROM_EMAIL", "onboarding@resend.dev")
 
-def send_reset_email(email, token):
-    reset_url = url_for("auth.reset_password", token=token, _external=True)
+# Resend Free sólo entrega al dueño de la cuenta; vacío = sin restricción
+RESEND_SOLO_PARA = os.getenv("RESEND_SOLO_PARA", "jorsalda@gmail.com")
 
-    print("🔐 RESET PASSWORD LINK:")
-    print(reset_url)
 
-    # SOLO enviar si es tu email (limitación Resend Free)
-    if email != "jorsalda@gmail.com":
-        print("⚠️ Resend Free: correo no enviado a", email)
-        return None
+class CorreoDescartado(Exception):
+    """El transporte decidió no enviar el correo (no es un error reintentable)"""
+
+
+# ════════════════════════════════════════════════════════════════
+# TRANSPORTES
+# ════════════════════════════════════════════════════════════════
+
+class ResendTransporte:
+    def enviar(self, destinatario, asunto, html):
+        # SOLO enviar si es tu email (limitación Resend Free)
+        if RESEND_SOLO_PARA and destinatario != RESEND_SOLO_PARA:
+            print("⚠️ Resend Free: correo no enviado a", destinatario)
+            raise CorreoDescartado(f"Resend Free no envía a {destinatario}")
+
+        import resend
+        resend.api_key = os.getenv("RESEND_API_KEY")
+
+        return resend.Emails.send({
+            "from": RESEND_FROM_EMAIL,
+            "to": [destinatario],
+            "subject": asunto,
+            "html": html
+        })
+
+
+class SmtpTransporte:
+    """SMTP con la configuración MAIL_* (sirve también contra un sumidero SMTP local)"""
+
+    def __init__(self, config):
+        self.servidor = config.get("MAIL_SERVER") or "localhost"
+        self.puerto = config.get("MAIL_PORT") or 25
+        self.usar_tls = config.get("MAIL_USE_TLS", False)
+        self.usar_ssl = config.get("MAIL_USE_SSL", False)
+        self.usuario = config.get("MAIL_USERNAME")
+        self.contrasena = config.get("MAIL_PASSWORD")
+        self.remitente = config.get("MAIL_DEFAULT_SENDER") or RESEND_FROM_EMAIL
+
+    def enviar(self, destinatario, asunto, html):
+        mensaje = EmailMessage()
+        mensaje["From"] = self.remitente
+        mensaje["To"] = destinatario
+        mensaje["Subject"] = asunto
+        mensaje.set_content(html, subtype="html")
+
+        clase = smtplib.SMTP_SSL if self.usar_ssl else smtplib.SMTP
+        with clase(self.servidor, self.puerto, timeout=30) as smtp:
+            if self.usar_tls and not self.usar_ssl:
+                smtp.starttls()
+            if self.usuario:
+                smtp.login(self.usuario, self.contrasena)
+            smtp.send_message(mensaje)
 
-    response = resend.Emails.send({
-        "from": "onboarding@resend.dev",
-        "to": ["jorsalda@gmail.com"],
-        "subject": "Recuperación de contraseña - TEST",
-        "html": f"<a href='{reset_url}'>Restablecer contraseña</a>"
-    })
 
-    return response
+class ConsolaTransporte:
+    """Imprime el correo en lugar de enviarlo (desarrollo)"""
 
+    def enviar(self, destinatario, asunto, html):
+        print(f"📧 [{destinatario}] {asunto}\n{html}")
 
 
+class MemoriaTransporte:
+    """Guarda los correos en una lista (pruebas)"""
+
+    def __init__(self):
+        self.enviados = []
+
+    def enviar(self, destinatario, asunto, html):
+        self.enviados.append((destinatario, asunto, html))
+
+
+def obtener_transporte(config):
+    """Transporte según Config.EMAIL_TRANSPORTE: resend, smtp, consola o memoria"""
+    nombre = config.get("EMAIL_TRANSPORTE", "resend")
+    if nombre == "smtp":
+        return SmtpTransporte(config)
+    if nombre == "consola":
+        return ConsolaTransporte()
+    if nombre == "memoria":
+        return MemoriaTransporte()
+    return ResendTransporte()
+
+
+# ════════════════════════════════════════════════════════════════
+# CORREOS DE LA APLICACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def send_reset_email(email, token):
+    """Encola el correo de recuperación; el envío real ocurre en segundo plano"""
+    from app.services.outbox_service import encolar_correo
+
+    reset_url = url_for("auth.reset_password", token=token, _external=True)
+
+    print("🔐 RESET PASSWORD LINK:")
+    print(reset_url)
+
+    return encolar_correo(
+        destinatario=email,
+        asunto="Recuperación de contraseña - TEST",
+        html=f"<a href='{reset_url}'>Restablecer contraseña</a>",
+        clave=f"reset:{email}:{token}"
+    )
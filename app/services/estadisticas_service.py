@@ -0,0 +1,317 @@
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import List, NamedTuple
+
+from flask import current_app
+from sqlalchemy import func, over, select, true
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+from app.services.cache_service import CacheTTL, al_modificar_colegio
+
+DIAS_AVISO_VENCIMIENTO = Usuario.DIAS_AVISO_VENCIMIENTO
+
+
+class UsuarioPorVencer(NamedTuple):
+    usuario: Usuario
+    dias: int
+
+
+@dataclass(frozen=True)
+class EstadisticasAdmin:
+    """Cifras del panel del superadministrador (mismos nombres que usa la plantilla)"""
+    total_usuarios: int
+    superadmins: int
+    usuarios_aprobados: int
+    usuarios_pendientes: int
+    usuarios_vencidos: int
+    usuarios_activos: int
+    total_colegios: int
+    total_docentes: int
+    total_permisos: int
+    nuevos_usuarios: int
+    proximos_vencer: List[UsuarioPorVencer] = field(default_factory=list)
+
+    def como_contexto(self):
+        """Variables para render_template (sin copiar los objetos Usuario)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def obtener_estadisticas_admin(ahora=None):
+    """
+    Calcula todas las cifras del dashboard de administración en una sola
+    consulta agregada y obtiene los usuarios próximos a vencer con un
+    rango sobre fecha_expiracion (resuelto por el índice, no en Python).
+    """
+    ahora = ahora or datetime.utcnow()
+    hace_7_dias = ahora - timedelta(days=7)
+
+    # 🔹 Conteos de otras tablas como subconsultas escalares
+    total_colegios = select(func.count(Colegio.id)).scalar_subquery()
+    total_docentes = select(func.count(Docente.id)).scalar_subquery()
+    total_permisos = select(func.count(Permiso.id)).scalar_subquery()
+
+    # 🔹 Un solo viaje a la base de datos: COUNT(*) FILTER (...)
+    consulta = select(
+        func.count(Usuario.id).label("total_usuarios"),
+        func.count(Usuario.id).filter(
+            Usuario.is_superadmin.is_(True)
+        ).label("superadmins"),
+        func.count(Usuario.id).filter(
+            Usuario.is_approved.is_(True)
+        ).label("usuarios_aprobados"),
+        func.count(Usuario.id).filter(
+            Usuario.is_approved.is_(False),
+            Usuario.is_superadmin.is_(False)
+        ).label("usuarios_pendientes"),
+        func.count(Usuario.id).filter(
+            Usuario.estado_acceso == Usuario.ACCESO_VENCIDO
+        ).label("usuarios_vencidos"),
+        func.count(Usuario.id).filter(
+            Usuario.is_active.is_(True)
+        ).label("usuarios_activos"),
+        func.count(Usuario.id).filter(
+            Usuario.fecha_registro >= hace_7_dias
+        ).label("nuevos_usuarios"),
+        total_colegios.label("total_colegios"),
+        total_docentes.label("total_docentes"),
+        total_permisos.label("total_permisos"),
+    ).select_from(Usuario)
+
+    fila = db.session.execute(consulta).one()
+
+    return EstadisticasAdmin(
+        total_usuarios=fila.total_usuarios,
+        superadmins=fila.superadmins,
+        usuarios_aprobados=fila.usuarios_aprobados,
+        usuarios_pendientes=fila.usuarios_pendientes,
+        usuarios_vencidos=fila.usuarios_vencidos,
+        usuarios_activos=fila.usuarios_activos,
+        total_colegios=fila.total_colegios or 0,
+        total_docentes=fila.total_docentes or 0,
+        total_permisos=fila.total_permisos or 0,
+        nuevos_usuarios=fila.nuevos_usuarios,
+        proximos_vencer=usuarios_proximos_a_vencer(ahora)
+    )
+
+
+def usuarios_proximos_a_vencer(ahora=None, dias=DIAS_AVISO_VENCIMIENTO):
+    """
+    Usuarios en prueba cuyo vencimiento cae dentro de los próximos `dias`.
+
+    (fecha_expiracion - ahora).days está entre 0 y `dias` exactamente cuando
+    fecha_expiracion está en [ahora, ahora + dias + 1), así que el filtro es
+    un rango simple sobre la columna. El estado precalculado descarta de
+    entrada aprobados, bloqueados y vencidos (índice estado_acceso +
+    fecha_expiracion); se aceptan también los que siguen en 'trial' porque
+    el barrido periódico puede no haberlos pasado aún a 'expiring'.
+    """
+    ahora = ahora or datetime.utcnow()
+    limite = ahora + timedelta(days=dias + 1)
+
+    usuarios = Usuario.query.filter(
+        Usuario.estado_acceso.in_((Usuario.ACCESO_PRUEBA, Usuario.ACCESO_POR_VENCER)),
+        Usuario.fecha_expiracion >= ahora,
+        Usuario.fecha_expiracion < limite
+    ).order_by(Usuario.fecha_expiracion).all()
+
+    return [
+        UsuarioPorVencer(usuario=u, dias=(u.fecha_expiracion - ahora).days)
+        for u in usuarios
+    ]
+
+
+# ════════════════════════════════════════════════════════════════
+# DASHBOARD DEL COLEGIO
+# ════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class EstadisticasColegio:
+    """Cifras del dashboard de un colegio (mismos nombres que usa la plantilla)"""
+    total_docentes: int
+    docentes_activos: int
+    total_permisos: int
+    permisos_activos: int
+    permisos_pendientes: int
+
+    def como_contexto(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+_cache_colegios = CacheTTL(ttl=60)
+
+
+@al_modificar_colegio
+def invalidar_estadisticas_colegio(colegio_ids):
+    for colegio_id in colegio_ids:
+        _cache_colegios.invalidar(colegio_id)
+
+
+def calcular_estadisticas_colegio(colegio_id, hoy):
+    """Los cinco conteos del dashboard en un solo viaje a la base de datos"""
+    docentes = select(
+        func.count(Docente.id).label("total"),
+        func.count(Docente.id).filter(Docente.activo.is_(True)).label("activos")
+    ).where(Docente.colegio_id == colegio_id).subquery()
+
+    permisos = select(
+        func.count(Permiso.id).label("total"),
+        func.count(Permiso.id).filter(
+            Permiso.fecha_inicio <= hoy,
+            Permiso.fecha_fin >= hoy
+        ).label("activos"),
+        func.count(Permiso.id).filter(
+            Permiso.fecha_inicio > hoy
+        ).label("pendientes")
+    ).where(Permiso.colegio_id == colegio_id).subquery()
+
+    fila = db.session.execute(
+        select(
+            docentes.c.total, docentes.c.activos,
+            permisos.c.total, permisos.c.activos, permisos.c.pendientes
+        ).select_from(docentes.join(permisos, true()))
+    ).one()
+
+    return EstadisticasColegio(
+        total_docentes=fila[0],
+        docentes_activos=fila[1],
+        total_permisos=fila[2],
+        permisos_activos=fila[3],
+        permisos_pendientes=fila[4]
+    )
+
+
+def obtener_estadisticas_colegio(colegio_id, hoy=None):
+    """
+    Estadísticas del colegio desde la caché del proceso.
+
+    La entrada se descarta al hacer commit de cualquier cambio en docentes o
+    permisos del colegio, y al cambiar el día (los conteos dependen de hoy).
+    """
+    hoy = hoy or datetime.utcnow().date()
+
+    entrada = _cache_colegios.obtener(colegio_id)
+    if entrada is not None and entrada[0] == hoy:
+        return entrada[1]
+
+    estadisticas = calcular_estadisticas_colegio(colegio_id, hoy)
+    _cache_colegios.guardar(
+        colegio_id,
+        (hoy, estadisticas),
+        ttl=current_app.config.get("ESTADISTICAS_CACHE_TTL")
+    )
+    return estadisticas
+
+
+# ════════════════════════════════════════════════════════════════
+# ESTADÍSTICAS DEL SISTEMA (SUPERADMIN)
+# ════════════════════════════════════════════════════════════════
+
+COLEGIOS_POR_PAGINA = 20
+
+
+class ColegioResumen(NamedTuple):
+    id: int
+    nombre: str
+    docentes: int
+    usuarios: int
+
+
+@dataclass(frozen=True)
+class EstadisticasSistema:
+    usuarios_activos: int
+    usuarios_bloqueados: int
+    usuarios_aprobados: int
+    usuarios_pendientes: int
+    colegios_data: List[ColegioResumen]
+    total_colegios: int
+    pagina: int
+    por_pagina: int
+
+    @property
+    def total_paginas(self):
+        return max(1, -(-self.total_colegios // self.por_pagina))
+
+    def como_contexto(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def _conteos_usuarios():
+    """Los cuatro conteos por estado como subconsultas escalares"""
+    def contar(*condiciones):
+        return select(func.count(Usuario.id)).where(*condiciones).scalar_subquery()
+
+    return (
+        contar(Usuario.is_active.is_(True)).label("usuarios_activos"),
+        contar(Usuario.is_active.is_(False)).label("usuarios_bloqueados"),
+        contar(Usuario.is_approved.is_(True)).label("usuarios_aprobados"),
+        contar(
+            Usuario.is_approved.is_(False),
+            Usuario.is_superadmin.is_(False)
+        ).label("usuarios_pendientes"),
+    )
+
+
+def obtener_estadisticas_sistema(pagina=1, por_pagina=COLEGIOS_POR_PAGINA):
+    """
+    Colegios ordenados por número de docentes (paginado en SQL) junto con
+    los conteos de usuarios por estado, en una sola consulta.
+
+    Docentes y usuarios se agregan por colegio_id antes de unirlos a
+    colegios, así el LEFT JOIN no multiplica filas.
+    """
+    pagina = max(1, pagina or 1)
+
+    docentes = select(
+        Docente.colegio_id,
+        func.count(Docente.id).label("n")
+    ).group_by(Docente.colegio_id).subquery()
+
+    usuarios = select(
+        Usuario.colegio_id,
+        func.count(Usuario.id).label("n")
+    ).group_by(Usuario.colegio_id).subquery()
+
+    n_docentes = func.coalesce(docentes.c.n, 0)
+    n_usuarios = func.coalesce(usuarios.c.n, 0)
+
+    filas = db.session.execute(
+        select(
+            Colegio.id,
+            Colegio.nombre,
+            n_docentes.label("docentes"),
+            n_usuarios.label("usuarios"),
+            over(func.count()).label("total_colegios"),
+            *_conteos_usuarios()
+        )
+        .outerjoin(docentes, docentes.c.colegio_id == Colegio.id)
+        .outerjoin(usuarios, usuarios.c.colegio_id == Colegio.id)
+        .order_by(n_docentes.desc(), Colegio.nombre, Colegio.id)
+        .limit(por_pagina)
+        .offset((pagina - 1) * por_pagina)
+    ).all()
+
+    if filas:
+        conteos = filas[0]
+        total_colegios = conteos.total_colegios
+    else:
+        # Sin colegios (o página fuera de rango): sólo los conteos de usuarios
+        conteos = db.session.execute(select(*_conteos_usuarios())).one()
+        total_colegios = db.session.scalar(select(func.count(Colegio.id)))
+
+    return EstadisticasSistema(
+        usuarios_activos=conteos.usuarios_activos,
+        usuarios_bloqueados=conteos.usuarios_bloqueados,
+        usuarios_aprobados=conteos.usuarios_aprobados,
+        usuarios_pendientes=conteos.usuarios_pendientes,
+        colegios_data=[
+            ColegioResumen(id=f.id, nombre=f.nombre, docentes=f.docentes, usuarios=f.usuarios)
+            for f in filas
+        ],
+        total_colegios=total_colegios,
+        pagina=pagina,
+        por_pagina=por_pagina
+    )
@@ -0,0 +1,136 @@
+"""
+Archivos estáticos con huella de contenido y variantes gzip.
+
+`flask estaticos compilar` (paso de build) copia cada archivo de static/ a
+static/dist/ con el hash de su contenido en el nombre (css/main.css ->
+dist/css/main.3f2a9c1b7d04.css), escribe al lado una copia .gz de los
+archivos de texto y guarda la correspondencia en dist/manifest.json.
+
+En las plantillas, url_for('static', filename='css/main.css') devuelve la
+URL con huella si hay manifiesto. Esas URLs nunca cambian de contenido:
+se sirven con Cache-Control inmutable por un año y, si el navegador acepta
+gzip, con la variante precomprimida. Sin manifiesto (desarrollo) todo se
+sirve como siempre.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import request, send_from_directory, url_for
+
+CARPETA_COMPILADOS = "dist"
+MANIFIESTO = "manifest.json"
+MAX_AGE_INMUTABLE = 365 * 24 * 3600
+
+EXTENSIONES_COMPRIMIBLES = {".css", ".js", ".svg", ".json", ".txt", ".map", ".html"}
+TAMANO_MINIMO_GZIP = 256
+IGNORAR = {"__pycache__", CARPETA_COMPILADOS}
+
+
+def _huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:12]
+
+
+def _archivos(static_dir):
+    """Rutas relativas (con /) de los estáticos, sin compilados ni módulos Python"""
+    for raiz, carpetas, nombres in os.walk(static_dir):
+        carpetas[:] = sorted(c for c in carpetas if c not in IGNORAR)
+        for nombre in sorted(nombres):
+            if nombre.endswith((".py", ".pyc")) or nombre.startswith("."):
+                continue
+            yield os.path.relpath(os.path.join(raiz, nombre), static_dir).replace(os.sep, "/")
+
+
+def compilar_estaticos(static_dir):
+    """
+    Regenera static/dist/ completo y retorna el manifiesto
+    {"archivos": {logico: con_huella}, "comprimidos": [con_huella, ...]}.
+    """
+    destino = os.path.join(static_dir, CARPETA_COMPILADOS)
+    shutil.rmtree(destino, ignore_errors=True)
+
+    archivos = {}
+    comprimidos = []
+    for logico in _archivos(static_dir):
+        with open(os.path.join(static_dir, logico), "rb") as f:
+            contenido = f.read()
+
+        base, extension = os.path.splitext(logico)
+        compilado = f"{CARPETA_COMPILADOS}/{base}.{_huella(contenido)}{extension}"
+        ruta = os.path.join(static_dir, *compilado.split("/"))
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "wb") as f:
+            f.write(contenido)
+        archivos[logico] = compilado
+
+        if extension.lower() in EXTENSIONES_COMPRIMIBLES and len(contenido) >= TAMANO_MINIMO_GZIP:
+            # mtime=0: el mismo contenido produce siempre el mismo .gz
+            reducido = gzip.compress(contenido, compresslevel=9, mtime=0)
+            if len(reducido) < len(contenido):
+                with open(ruta + ".gz", "wb") as f:
+                    f.write(reducido)
+                comprimidos.append(compilado)
+
+    manifiesto = {"archivos": archivos, "comprimidos": comprimidos}
+    os.makedirs(destino, exist_ok=True)
+    with open(os.path.join(destino, MANIFIESTO), "w") as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+    return manifiesto
+
+
+class Estaticos:
+    def __init__(self):
+        self.archivos = {}
+        self.comprimidos = frozenset()
+
+    def init_app(self, app):
+        ruta = os.path.join(app.static_folder, CARPETA_COMPILADOS, MANIFIESTO)
+        if not os.path.exists(ruta):
+            return
+
+        with open(ruta) as f:
+            manifiesto = json.load(f)
+        self.archivos = manifiesto.get("archivos", {})
+        self.comprimidos = frozenset(manifiesto.get("comprimidos", ()))
+
+        app.jinja_env.globals["url_for"] = self.url_for
+        app.view_functions["static"] = self._servidor(app)
+
+    def url_for(self, endpoint, **values):
+        """url_for de Flask; para 'static' usa el nombre con huella si existe"""
+        if endpoint == "static":
+            compilado = self.archivos.get(values.get("filename"))
+            if compilado:
+                values["filename"] = compilado
+        return url_for(endpoint, **values)
+
+    def _servidor(self, app):
+        prefijo = CARPETA_COMPILADOS + "/"
+
+        def servir_estatico(filename):
+            if not filename.startswith(prefijo):
+                return app.send_static_file(filename)
+
+            if filename in self.comprimidos and request.accept_encodings.quality("gzip") > 0:
+                respuesta = send_from_directory(
+                    app.static_folder, filename + ".gz",
+                    mimetype=mimetypes.guess_type(filename)[0],
+                    max_age=MAX_AGE_INMUTABLE
+                )
+                respuesta.headers["Content-Encoding"] = "gzip"
+            else:
+                respuesta = send_from_directory(
+                    app.static_folder, filename, max_age=MAX_AGE_INMUTABLE
+                )
+
+            respuesta.headers["Cache-Control"] = f"public, max-age={MAX_AGE_INMUTABLE}, immutable"
+            respuesta.vary.add("Accept-Encoding")
+            return respuesta
+
+        return servir_estatico
+
+
+estaticos = Estaticos()
@@ -0,0 +1,182 @@
+"""
+Caché de fragmentos de plantilla con versión por colegio.
+
+    {% cache "cifras", current_user.colegio_id, hoy %}
+        {% set e = estadisticas() %}
+        ...
+    {% endcache %}
+
+La clave es (plantilla, nombre, colegio, resto de argumentos) y cada entrada
+guarda la versión de datos del colegio con la que se generó. Las versiones
+viven en versiones_service (compartidas entre workers) y cambian al hacer
+commit de docentes, permisos o usuarios; None (o "global") es la versión de
+todo el sistema, que cambia con cualquier escritura.
+
+Las vistas pasan las consultas como funciones (estadisticas=...), así un
+acierto de caché no toca la base de datos.
+
+Stale-while-revalidate:
+    - fragmento vigente: se devuelve tal cual
+    - vencido por tiempo (FRAGMENTOS_CACHE_TTL): se devuelve el anterior y
+      una sola petición lo regenera en segundo plano
+    - versión nueva: la petición que toma el turno lo regenera en línea (quien
+      acaba de escribir ve su cambio); las demás reciben el anterior, y si la
+      base de datos falla al regenerar también se sirve el anterior
+Con FRAGMENTOS_CACHE_TTL = 0 la etiqueta sólo renderiza su contenido.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from flask import copy_current_request_context, current_app, has_request_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.services.cache_service import CacheTTL, al_modificar_colegio, al_modificar_usuario
+from app.services.versiones_service import incrementar_version, obtener_version
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = "global"
+
+
+class _Fragmento(NamedTuple):
+    version: int
+    creado: float
+    html: str
+
+
+# El TTL de la caché es el máximo tiempo que se sirve un fragmento obsoleto
+_cache = CacheTTL(ttl=3600, max_entradas=2048)
+
+_regenerando = set()
+_lock = threading.Lock()
+_pool = None
+
+
+def clave_version(colegio_id):
+    return f"fragmentos:{GLOBAL if colegio_id is None else colegio_id}"
+
+
+@al_modificar_colegio
+def nueva_version_colegios(colegio_ids):
+    """Docentes o permisos: cambia el colegio y también las cifras globales"""
+    for colegio_id in colegio_ids:
+        incrementar_version(clave_version(colegio_id))
+    incrementar_version(clave_version(None))
+
+
+@al_modificar_usuario
+def nueva_version_usuarios(usuario_ids):
+    incrementar_version(clave_version(None))
+
+
+# ════════════════════════════════════════════════════════════════
+# REGENERACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def _tomar_turno(clave):
+    with _lock:
+        if clave in _regenerando:
+            return False
+        _regenerando.add(clave)
+        return True
+
+
+def _soltar_turno(clave):
+    with _lock:
+        _regenerando.discard(clave)
+
+
+def _en_segundo_plano(funcion):
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fragmentos")
+    _pool.submit(funcion)
+
+
+def _renderizar(clave, version, caller, ttl_obsoleto):
+    html = caller()
+    _cache.guardar(clave, _Fragmento(version, time.monotonic(), html), ttl=ttl_obsoleto)
+    return html
+
+
+def fragmento(clave, colegio_id, caller):
+    """HTML del fragmento `clave` desde la caché, o generado con `caller()`"""
+    config = current_app.config
+    ttl = config.get("FRAGMENTOS_CACHE_TTL", 0)
+    if ttl <= 0:
+        return caller()
+    ttl_obsoleto = max(ttl, config.get("FRAGMENTOS_MAX_OBSOLETO", 3600))
+
+    version = obtener_version(clave_version(colegio_id))
+    entrada = _cache.obtener(clave)
+
+    if entrada is None:
+        return _renderizar(clave, version, caller, ttl_obsoleto)
+
+    vigente = entrada.version == version
+    if vigente and time.monotonic() - entrada.creado < ttl:
+        return entrada.html
+
+    # Otra petición ya lo está regenerando: el anterior mientras tanto
+    if not _tomar_turno(clave):
+        return entrada.html
+
+    if vigente and has_request_context():
+        @copy_current_request_context
+        def regenerar():
+            try:
+                _renderizar(clave, version, caller, ttl_obsoleto)
+            except Exception:
+                logger.exception("No se pudo regenerar el fragmento %s", clave)
+            finally:
+                _soltar_turno(clave)
+
+        _en_segundo_plano(regenerar)
+        return entrada.html
+
+    try:
+        return _renderizar(clave, version, caller, ttl_obsoleto)
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Base de datos no disponible; se sirve el fragmento anterior %s", clave)
+        return entrada.html
+    finally:
+        _soltar_turno(clave)
+
+
+# ════════════════════════════════════════════════════════════════
+# ETIQUETA {% cache %}
+# ════════════════════════════════════════════════════════════════
+
+class FragmentoCache(Extension):
+    """{% cache "nombre", colegio_id, otros... %} ... {% endcache %}"""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        argumentos = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            argumentos.append(parser.parse_expression())
+        if len(argumentos) < 2:
+            parser.fail("cache requiere un nombre y un colegio_id (o none)", lineno)
+
+        cuerpo = parser.parse_statements(["name:endcache"], drop_needle=True)
+        llamada = self.call_method(
+            "_cache", [nodes.Const(parser.name), nodes.List(argumentos)]
+        )
+        return nodes.CallBlock(llamada, [], [], cuerpo).set_lineno(lineno)
+
+    def _cache(self, plantilla, argumentos, caller):
+        nombre, colegio_id, *resto = argumentos
+        if colegio_id == GLOBAL:
+            colegio_id = None
+        return fragmento((plantilla, nombre, colegio_id, *resto), colegio_id, caller)
@@ -0,0 +1,89 @@
+"""
+Hash de contraseñas fuera del hilo de la petición.
+
+scrypt/pbkdf2 son costosos a propósito; en un pico de logins ocupan todos
+los workers. Aquí el trabajo va a un pool de procesos acotado por worker
+(PASSWORD_HASH_PROCESOS), de modo que como mucho esos procesos compiten
+por CPU con las peticiones baratas. Con PASSWORD_HASH_PROCESOS = 0 se
+calcula en el mismo hilo (desarrollo).
+
+El método y su costo salen de PASSWORD_HASH_METODO (formato de werkzeug,
+p. ej. "scrypt:32768:8:1" o "pbkdf2:sha256:600000"); los hashes con otros
+parámetros se regeneran solos en el siguiente login correcto.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _contexto_procesos():
+    # forkserver evita heredar locks de los hilos del worker al hacer fork
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+class ServicioHash:
+    def __init__(self, metodo="scrypt", procesos=2):
+        self.metodo = metodo
+        self.procesos = procesos
+        self._pool = None
+        self._lock = threading.Lock()
+        # Prefijo que werkzeug escribe para este método (p. ej. "scrypt:32768:8:1")
+        self.prefijo = generate_password_hash("-", method=metodo).split("$", 1)[0]
+
+    def _ejecutar(self, funcion, *args):
+        if not self.procesos:
+            return funcion(*args)
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.procesos,
+                        mp_context=_contexto_procesos()
+                    )
+        return self._pool.submit(funcion, *args).result()
+
+    def generar(self, password):
+        return self._ejecutar(generate_password_hash, password, self.metodo)
+
+    def verificar(self, password_hash, password):
+        return self._ejecutar(check_password_hash, password_hash, password)
+
+    def necesita_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.prefijo
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+_servicio = None
+_lock_servicio = threading.Lock()
+
+
+def _obtener_servicio():
+    global _servicio
+    if _servicio is None:
+        with _lock_servicio:
+            if _servicio is None:
+                _servicio = ServicioHash(
+                    metodo=current_app.config.get("PASSWORD_HASH_METODO", "scrypt"),
+                    procesos=current_app.config.get("PASSWORD_HASH_PROCESOS", 2)
+                )
+    return _servicio
+
+
+def generar_hash(password):
+    return _obtener_servicio().generar(password)
+
+
+def verificar_hash(password_hash, password):
+    return _obtener_servicio().verificar(password_hash, password)
+
+
+def necesita_rehash(password_hash):
+    return _obtener_servicio().necesita_rehash(password_hash)
@@ -0,0 +1,166 @@
+"""
+Importación masiva de docentes desde CSV.
+
+El archivo se lee fila a fila (nunca entero en memoria); los duplicados se
+detectan contra un único conjunto con los nombres ya registrados en el
+colegio y las filas válidas se insertan en lotes (executemany) dentro de
+una sola transacción, así un fallo de la base no deja el archivo a medias.
+"""
+import csv
+import io
+import itertools
+from dataclasses import dataclass, field
+
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.services.cache_service import notificar_colegios_modificados, notificar_docentes_modificados
+
+TAMANO_LOTE = 1000
+# Sólo se guardan los primeros errores; del resto se lleva la cuenta
+MAX_ERRORES_REPORTADOS = 500
+
+COLUMNAS = ("nombre", "documento", "telefono", "email")
+LONGITUDES = {"nombre": 150, "documento": 20, "telefono": 20, "email": 120}
+
+
+@dataclass
+class ResultadoImportacion:
+    filas: int = 0
+    insertados: int = 0
+    duplicados: int = 0
+    errores: list = field(default_factory=list)  # [(fila, mensaje)]
+    errores_omitidos: int = 0
+
+    @property
+    def total_errores(self):
+        return len(self.errores) + self.errores_omitidos
+
+    def agregar_error(self, fila, mensaje):
+        if len(self.errores) < MAX_ERRORES_REPORTADOS:
+            self.errores.append((fila, mensaje))
+        else:
+            self.errores_omitidos += 1
+
+
+def clave_nombre(nombre):
+    """Nombre normalizado para comparar duplicados (espacios y mayúsculas)"""
+    return " ".join(nombre.split()).casefold()
+
+
+def abrir_csv(archivo_binario):
+    """Envuelve un archivo binario (p. ej. request.files[...].stream) como texto UTF-8"""
+    return io.TextIOWrapper(archivo_binario, encoding="utf-8-sig", newline="")
+
+
+def _lector(archivo):
+    """csv.reader con el separador detectado en la cabecera (',' o ';' de Excel)"""
+    cabecera = archivo.readline()
+    separador = ";" if cabecera.count(";") > cabecera.count(",") else ","
+    return csv.reader(itertools.chain([cabecera], archivo), delimiter=separador)
+
+
+def _indices_columnas(cabecera):
+    indices = {}
+    for posicion, nombre in enumerate(cabecera):
+        nombre = nombre.strip().lower()
+        if nombre in COLUMNAS and nombre not in indices:
+            indices[nombre] = posicion
+    return indices
+
+
+def _nombres_existentes(colegio_id):
+    nombres = db.session.scalars(
+        select(Docente.nombre).where(Docente.colegio_id == colegio_id)
+    )
+    return {clave_nombre(nombre) for nombre in nombres}
+
+
+def _validar_fila(valores):
+    """Retorna (docente, None) o (None, mensaje de error)"""
+    if not valores["nombre"]:
+        return None, "El nombre es requerido"
+
+    for columna, maximo in LONGITUDES.items():
+        if len(valores[columna]) > maximo:
+            return None, f"'{columna}' supera {maximo} caracteres"
+
+    if valores["email"] and "@" not in valores["email"]:
+        return None, f"Email inválido: {valores['email']}"
+
+    return {
+        "nombre": " ".join(valores["nombre"].split()),
+        "documento": valores["documento"] or None,
+        "telefono": valores["telefono"] or None,
+        "email": valores["email"] or None,
+    }, None
+
+
+def importar_docentes(archivo, colegio_id, tamano_lote=TAMANO_LOTE):
+    """
+    Importa los docentes del CSV `archivo` (objeto de texto) al colegio.
+
+    La cabecera debe incluir 'nombre'; 'documento', 'telefono' y 'email' son
+    opcionales. Las filas con errores o repetidas se informan y se saltan.
+    Retorna un ResultadoImportacion; si la cabecera no sirve lanza ValueError.
+    """
+    resultado = ResultadoImportacion()
+    lector = _lector(archivo)
+
+    cabecera = next(lector, None)
+    indices = _indices_columnas(cabecera or [])
+    if "nombre" not in indices:
+        raise ValueError("El archivo debe tener una columna 'nombre'")
+
+    vistos = _nombres_existentes(colegio_id)
+    lote = []
+
+    try:
+        for fila in lector:
+            numero = lector.line_num
+            if not any(celda.strip() for celda in fila):
+                continue
+            resultado.filas += 1
+
+            valores = {
+                columna: (fila[indices[columna]].strip()
+                          if columna in indices and indices[columna] < len(fila) else "")
+                for columna in COLUMNAS
+            }
+            docente, error = _validar_fila(valores)
+            if error:
+                resultado.agregar_error(numero, error)
+                continue
+
+            clave = clave_nombre(docente["nombre"])
+            if clave in vistos:
+                resultado.duplicados += 1
+                resultado.agregar_error(numero, f"Docente duplicado: {docente['nombre']}")
+                continue
+            vistos.add(clave)
+
+            docente["colegio_id"] = colegio_id
+            docente["activo"] = True
+            lote.append(docente)
+
+            if len(lote) >= tamano_lote:
+                db.session.execute(insert(Docente), lote)
+                resultado.insertados += len(lote)
+                lote = []
+
+        if lote:
+            db.session.execute(insert(Docente), lote)
+            resultado.insertados += len(lote)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # El INSERT masivo no pasa por los eventos del ORM
+    if resultado.insertados:
+        notificar_colegios_modificados({colegio_id})
+        notificar_docentes_modificados({colegio_id})
+
+    return resultado
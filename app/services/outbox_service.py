@@ -0,0 +1,205 @@
+import hashlib
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.correo import CorreoSaliente
+from app.services.email_service import CorreoDescartado, obtener_transporte
+
+logger = logging.getLogger(__name__)
+
+# Un correo "enviando" cuyo worker murió se vuelve a reclamar tras este tiempo
+TIEMPO_RECLAMO = timedelta(minutes=5)
+BACKOFF_BASE_SEGUNDOS = 30
+BACKOFF_MAX_SEGUNDOS = 6 * 3600
+
+
+def _clave_dedup(clave):
+    return hashlib.sha256(clave.encode("utf-8")).hexdigest()
+
+
+def encolar_correo(destinatario, asunto, html, clave):
+    """
+    Guarda el correo en la bandeja de salida y despierta al despachador.
+
+    `clave` identifica el correo lógico (p. ej. "reset:<email>:<token>"): si
+    ya estaba encolado no se duplica. Retorna el CorreoSaliente.
+    """
+    clave_dedup = _clave_dedup(clave)
+
+    existente = CorreoSaliente.query.filter_by(clave_dedup=clave_dedup).first()
+    if existente:
+        return existente
+
+    correo = CorreoSaliente(
+        destinatario=destinatario,
+        asunto=asunto,
+        html=html,
+        clave_dedup=clave_dedup
+    )
+    db.session.add(correo)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Otra petición lo encoló al mismo tiempo
+        db.session.rollback()
+        return CorreoSaliente.query.filter_by(clave_dedup=clave_dedup).first()
+
+    despachador.despertar()
+    return correo
+
+
+def calcular_backoff(intentos):
+    """Espera exponencial con jitter: 30s, 60s, 120s... hasta 6 horas"""
+    espera = min(BACKOFF_BASE_SEGUNDOS * (2 ** (intentos - 1)), BACKOFF_MAX_SEGUNDOS)
+    return timedelta(seconds=espera * random.uniform(0.8, 1.2))
+
+
+# ════════════════════════════════════════════════════════════════
+# RECLAMO Y ENVÍO
+# ════════════════════════════════════════════════════════════════
+
+def _reclamar_lote(tamano):
+    """
+    Marca como 'enviando' hasta `tamano` correos listos y devuelve sus ids.
+
+    El UPDATE ... RETURNING vuelve a comprobar el estado, así dos workers
+    nunca reclaman el mismo correo; en PostgreSQL además SKIP LOCKED evita
+    que se esperen entre sí.
+    """
+    ahora = datetime.utcnow()
+    listo = or_(
+        and_(
+            CorreoSaliente.estado == CorreoSaliente.PENDIENTE,
+            CorreoSaliente.proximo_intento <= ahora
+        ),
+        and_(
+            CorreoSaliente.estado == CorreoSaliente.ENVIANDO,
+            CorreoSaliente.reclamado_en < ahora - TIEMPO_RECLAMO
+        )
+    )
+
+    candidatos = select(CorreoSaliente.id).where(listo).order_by(
+        CorreoSaliente.proximo_intento
+    ).limit(tamano)
+    if db.engine.dialect.name == "postgresql":
+        candidatos = candidatos.with_for_update(skip_locked=True)
+
+    ids = db.session.scalars(
+        update(CorreoSaliente)
+        .where(CorreoSaliente.id.in_(candidatos), listo)
+        .values(estado=CorreoSaliente.ENVIANDO, reclamado_en=ahora)
+        .returning(CorreoSaliente.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return ids
+
+
+def _enviar_uno(app, correo_id, transporte, max_intentos):
+    with app.app_context():
+        correo = db.session.get(CorreoSaliente, correo_id)
+        if correo is None or correo.estado != CorreoSaliente.ENVIANDO:
+            return
+
+        try:
+            transporte.enviar(correo.destinatario, correo.asunto, correo.html)
+            correo.estado = CorreoSaliente.ENVIADO
+            correo.enviado_en = datetime.utcnow()
+            correo.ultimo_error = None
+        except CorreoDescartado as e:
+            correo.estado = CorreoSaliente.DESCARTADO
+            correo.ultimo_error = str(e)
+        except Exception as e:
+            correo.intentos += 1
+            correo.ultimo_error = str(e)[:1000]
+            if correo.intentos >= max_intentos:
+                correo.estado = CorreoSaliente.FALLIDO
+                logger.error("Correo %s descartado tras %s intentos: %s", correo.id, correo.intentos, e)
+            else:
+                correo.estado = CorreoSaliente.PENDIENTE
+                correo.proximo_intento = datetime.utcnow() + calcular_backoff(correo.intentos)
+
+        db.session.commit()
+
+
+def drenar_bandeja(app, pool, transporte):
+    """Envía lotes hasta vaciar los correos listos. Retorna cuántos procesó."""
+    tamano = app.config.get("EMAIL_OUTBOX_LOTE", 20)
+    max_intentos = app.config.get("EMAIL_OUTBOX_MAX_INTENTOS", 6)
+    procesados = 0
+
+    while True:
+        with app.app_context():
+            ids = _reclamar_lote(tamano)
+        if not ids:
+            return procesados
+
+        futuros = [
+            pool.submit(_enviar_uno, app, correo_id, transporte, max_intentos)
+            for correo_id in ids
+        ]
+        wait(futuros)
+        for futuro in futuros:
+            if futuro.exception():
+                logger.error("Error enviando correo", exc_info=futuro.exception())
+        procesados += len(ids)
+
+
+# ════════════════════════════════════════════════════════════════
+# DESPACHADOR EN SEGUNDO PLANO
+# ════════════════════════════════════════════════════════════════
+
+class DespachadorCorreos:
+    """
+    Hilo por worker que drena la bandeja de salida con un pool acotado.
+    Se despierta al encolar un correo y, además, cada EMAIL_OUTBOX_INTERVALO
+    segundos para los reintentos.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._hilo = None
+        self._pool = None
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+        self.transporte = None
+
+    def iniciar(self, app):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._app = app
+            self.transporte = obtener_transporte(app.config)
+            self._pool = ThreadPoolExecutor(
+                max_workers=app.config.get("EMAIL_OUTBOX_HILOS", 4),
+                thread_name_prefix="correo"
+            )
+            self._hilo = threading.Thread(
+                target=self._bucle, name="outbox-correos", daemon=True
+            )
+            self._hilo.start()
+
+    def despertar(self):
+        self._evento.set()
+
+    def _bucle(self):
+        intervalo = self._app.config.get("EMAIL_OUTBOX_INTERVALO", 10)
+        while True:
+            self._evento.wait(intervalo)
+            self._evento.clear()
+            try:
+                drenar_bandeja(self._app, self._pool, self.transporte)
+            except Exception:
+                logger.exception("Error drenando la bandeja de salida")
+
+
+despachador = DespachadorCorreos()
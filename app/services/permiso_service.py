@@ -0,0 +1,240 @@
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+
+PERMISOS_POR_PAGINA = 50
+MAX_PERMISOS_POR_PAGINA = 200
+FILAS_POR_BLOQUE_EXPORTACION = 1000
+
+
+def parse_fecha(valor):
+    """Convierte 'YYYY-MM-DD' en date; devuelve None si está vacío o es inválido"""
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _parse_int(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+# ════════════════════════════════════════════════════════════════
+# FILTROS
+# ════════════════════════════════════════════════════════════════
+
+@dataclass
+class FiltrosPermiso:
+    """Filtros del listado: rango de fechas (intersección), tipo y docente"""
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    tipo: Optional[str] = None
+    docente_id: Optional[int] = None
+
+    @classmethod
+    def desde_request(cls, args):
+        tipo = (args.get("tipo") or "").strip()
+        return cls(
+            desde=parse_fecha(args.get("desde")),
+            hasta=parse_fecha(args.get("hasta")),
+            tipo=tipo or None,
+            docente_id=_parse_int(args.get("docente_id"))
+        )
+
+    def como_args(self):
+        """Parámetros de querystring para reconstruir los enlaces de paginación"""
+        args = {}
+        if self.desde:
+            args["desde"] = self.desde.isoformat()
+        if self.hasta:
+            args["hasta"] = self.hasta.isoformat()
+        if self.tipo:
+            args["tipo"] = self.tipo
+        if self.docente_id:
+            args["docente_id"] = self.docente_id
+        return args
+
+    def condiciones(self):
+        condiciones = []
+        if self.desde:
+            condiciones.append(Permiso.fecha_fin >= self.desde)
+        if self.hasta:
+            condiciones.append(Permiso.fecha_inicio <= self.hasta)
+        if self.tipo:
+            condiciones.append(Permiso.tipo == self.tipo)
+        if self.docente_id:
+            condiciones.append(Permiso.docente_id == self.docente_id)
+        return condiciones
+
+
+# ════════════════════════════════════════════════════════════════
+# CURSOR (KEYSET SOBRE fecha_inicio, id)
+# ════════════════════════════════════════════════════════════════
+
+def codificar_cursor(permiso):
+    return f"{permiso.fecha_inicio.isoformat()}_{permiso.id}"
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha_inicio, id) o None si el cursor no es válido"""
+    if not cursor:
+        return None
+    fecha, _, permiso_id = cursor.partition("_")
+    fecha = parse_fecha(fecha)
+    permiso_id = _parse_int(permiso_id)
+    if fecha is None or permiso_id is None:
+        return None
+    return fecha, permiso_id
+
+
+@dataclass
+class PaginaPermisos:
+    permisos: List[Permiso] = field(default_factory=list)
+    siguiente_cursor: Optional[str] = None
+
+    @property
+    def hay_mas(self):
+        return self.siguiente_cursor is not None
+
+
+def paginar_permisos(colegio_id, filtros=None, cursor=None, limite=PERMISOS_POR_PAGINA):
+    """
+    Una página de permisos del colegio, ordenada por (fecha_inicio, id) desc.
+
+    Usa paginación por cursor: la página N cuesta lo mismo que la primera
+    porque se filtra por la última clave vista en lugar de usar OFFSET.
+    El docente se carga con joinedload, así que la plantilla puede leer
+    permiso.docente.nombre sin disparar una consulta por fila.
+    """
+    filtros = filtros or FiltrosPermiso()
+    limite = max(1, min(limite or PERMISOS_POR_PAGINA, MAX_PERMISOS_POR_PAGINA))
+
+    consulta = Permiso.query.options(
+        joinedload(Permiso.docente)
+    ).filter(
+        Permiso.colegio_id == colegio_id,
+        *filtros.condiciones()
+    )
+
+    clave = decodificar_cursor(cursor)
+    if clave:
+        fecha_inicio, permiso_id = clave
+        consulta = consulta.filter(or_(
+            Permiso.fecha_inicio < fecha_inicio,
+            and_(Permiso.fecha_inicio == fecha_inicio, Permiso.id < permiso_id)
+        ))
+
+    # Se pide una fila extra para saber si existe otra página
+    permisos = consulta.order_by(
+        Permiso.fecha_inicio.desc(),
+        Permiso.id.desc()
+    ).limit(limite + 1).all()
+
+    siguiente_cursor = None
+    if len(permisos) > limite:
+        permisos = permisos[:limite]
+        siguiente_cursor = codificar_cursor(permisos[-1])
+
+    return PaginaPermisos(permisos=permisos, siguiente_cursor=siguiente_cursor)
+
+
+def contar_permisos(colegio_id, filtros=None, hoy=None):
+    """Total de permisos y permisos vigentes (fecha_fin >= hoy) en una consulta"""
+    filtros = filtros or FiltrosPermiso()
+    hoy = hoy or datetime.utcnow().date()
+
+    fila = db.session.execute(
+        select(
+            func.count(Permiso.id).label("total"),
+            func.count(Permiso.id).filter(Permiso.fecha_fin >= hoy).label("activos")
+        ).where(
+            Permiso.colegio_id == colegio_id,
+            *filtros.condiciones()
+        )
+    ).one()
+
+    return fila.total, fila.activos
+
+
+# ════════════════════════════════════════════════════════════════
+# EXPORTACIÓN CSV
+# ════════════════════════════════════════════════════════════════
+
+COLUMNAS_EXPORTACION = (
+    "id", "docente", "tipo", "fecha_inicio", "fecha_fin", "observacion"
+)
+
+
+# Excel y LibreOffice ejecutan como fórmula una celda que empieza así
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _celda_segura(valor):
+    """Texto escrito por usuarios: un apóstrofo delante evita que sea fórmula"""
+    if isinstance(valor, str) and valor.startswith(_INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def exportar_permisos_csv(colegio_id, filtros=None, filas_por_bloque=FILAS_POR_BLOQUE_EXPORTACION):
+    """
+    Generador con el CSV de los permisos del colegio, un bloque de texto
+    por cada `filas_por_bloque` filas.
+
+    Sólo se proyectan las columnas exportadas (sin instanciar modelos) y
+    yield_per usa un cursor del lado del servidor, así la memoria del worker
+    no crece con el número de filas. Nombre, tipo y observación los escriben
+    usuarios: se neutralizan los que empiezan como una fórmula.
+    """
+    filtros = filtros or FiltrosPermiso()
+
+    consulta = select(
+        Permiso.id,
+        Docente.nombre,
+        Permiso.tipo,
+        Permiso.fecha_inicio,
+        Permiso.fecha_fin,
+        Permiso.observacion
+    ).join(
+        Docente, Docente.id == Permiso.docente_id
+    ).where(
+        Permiso.colegio_id == colegio_id,
+        *filtros.condiciones()
+    ).order_by(
+        Permiso.fecha_inicio.desc(),
+        Permiso.id.desc()
+    ).execution_options(yield_per=filas_por_bloque)
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    # BOM para que Excel reconozca el UTF-8
+    buffer.write("\ufeff")
+    escritor.writerow(COLUMNAS_EXPORTACION)
+    yield buffer.getvalue()
+
+    resultado = db.session.execute(consulta)
+    try:
+        for bloque in resultado.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows(
+                [_celda_segura(valor) for valor in fila] for fila in bloque
+            )
+            yield buffer.getvalue()
+    finally:
+        resultado.close()
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.services.cache_service import CacheTTL, al_modificar_usuario
+from app.services.versiones_service import incrementar_version, obtener_version
+
+
+class Principal:
+    """
+    Copia de sólo lectura de los datos del usuario que necesitan la
+    autorización y las plantillas. Cumple la interfaz de Flask-Login.
+    """
+
+    __slots__ = (
+        "id", "email", "nombre", "colegio_id", "_colegio",
+        "is_superadmin", "_is_active", "is_approved",
+        "fecha_registro", "fecha_aprobacion", "dias_prueba", "fecha_expiracion",
+        "estado_acceso", "version",
+    )
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, usuario, version):
+        self.id = usuario.id
+        self.email = usuario.email
+        self.nombre = usuario.nombre
+        self.colegio_id = usuario.colegio_id
+        self._colegio = (
+            SimpleNamespace(id=usuario.colegio.id, nombre=usuario.colegio.nombre)
+            if usuario.colegio else None
+        )
+        self.is_superadmin = bool(usuario.is_superadmin)
+        self._is_active = bool(usuario.is_active)
+        self.is_approved = bool(usuario.is_approved)
+        self.fecha_registro = usuario.fecha_registro
+        self.fecha_aprobacion = usuario.fecha_aprobacion
+        self.dias_prueba = usuario.dias_prueba
+        self.fecha_expiracion = usuario.fecha_expiracion
+        self.estado_acceso = usuario.estado_acceso
+        self.version = version
+
+    @property
+    def is_active(self):
+        return self._is_active
+
+    @property
+    def colegio(self):
+        return self._colegio
+
+    def get_id(self):
+        return str(self.id)
+
+    # La lógica de acceso es la misma del modelo (sólo lee estos atributos)
+    ACCESO_PRUEBA = Usuario.ACCESO_PRUEBA
+    ACCESO_POR_VENCER = Usuario.ACCESO_POR_VENCER
+    ACCESO_VENCIDO = Usuario.ACCESO_VENCIDO
+    ACCESO_APROBADO = Usuario.ACCESO_APROBADO
+    ACCESO_BLOQUEADO = Usuario.ACCESO_BLOQUEADO
+    DIAS_AVISO_VENCIMIENTO = Usuario.DIAS_AVISO_VENCIMIENTO
+
+    vencimiento = Usuario.vencimiento
+    calcular_estado_acceso = Usuario.calcular_estado_acceso
+    estado_vigente = Usuario.estado_vigente
+    dias_restantes = Usuario.dias_restantes
+    puede_acceder = Usuario.puede_acceder
+    estado_detallado = Usuario.estado_detallado
+
+    def __eq__(self, otro):
+        return isinstance(otro, (Principal, Usuario)) and self.id == otro.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<Principal {self.email}>'
+
+
+# ════════════════════════════════════════════════════════════════
+# CACHÉ POR PROCESO
+# ════════════════════════════════════════════════════════════════
+
+_cache = CacheTTL(ttl=300, max_entradas=4096)
+
+
+def _clave_version(usuario_id):
+    return f"usuario:{usuario_id}"
+
+
+def cargar_principal(usuario_id):
+    """
+    Principal del usuario, desde la caché si su versión sigue vigente.
+    En el caso común no hace ninguna consulta a la base de datos.
+    """
+    version = obtener_version(_clave_version(usuario_id))
+
+    principal = _cache.obtener(usuario_id)
+    if principal is not None and principal.version == version:
+        return principal
+
+    usuario = db.session.get(
+        Usuario, usuario_id, options=[joinedload(Usuario.colegio)]
+    )
+    if usuario is None:
+        _cache.invalidar(usuario_id)
+        return None
+
+    principal = Principal(usuario, version)
+    _cache.guardar(
+        usuario_id,
+        principal,
+        ttl=current_app.config.get("PRINCIPAL_CACHE_TTL")
+    )
+    return principal
+
+
+@al_modificar_usuario
+def invalidar_principales(usuario_ids):
+    """Aprobación, bloqueo, activación o cambio de contraseña: nueva versión"""
+    for usuario_id in usuario_ids:
+        _cache.invalidar(usuario_id)
+        incrementar_version(_clave_version(usuario_id))
@@ -0,0 +1,238 @@
+"""
+Datos sintéticos para dimensionar el despliegue (`flask seed`).
+
+El conjunto es determinista para una misma semilla y fecha de referencia
+(FECHA_REFERENCIA salvo que se indique otra). Los permisos siguen una
+distribución parecida a la real: enfermedad y permisos personales cortos
+son la mayoría, las licencias son pocas pero largas, casi todos empiezan
+en día hábil y los de un mismo docente no se cruzan.
+
+La carga no pasa por el ORM: COPY en PostgreSQL y executemany por lotes en
+los demás motores.
+"""
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from app.extensions import db
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+from app.models.usuario import Usuario
+
+TAMANO_LOTE = 50000
+DOMINIO_CORREO = "seed.sistpro"
+# Fin de la historia sembrada: fija para que las fechas (y con ellas los
+# cruces y los planes de consulta) no cambien según el día de la carga
+FECHA_REFERENCIA = date(2026, 1, 1)
+
+# (tipo, peso, duración mínima, duración máxima) en días
+TIPOS_PERMISO = (
+    ("Enfermedad", 35, 1, 5),
+    ("Permiso Personal", 20, 1, 2),
+    ("Capacitación", 12, 1, 5),
+    ("Cumpleaños", 8, 1, 1),
+    ("Tiquetera de la felicidad", 8, 1, 1),
+    ("Jurado de votación", 4, 1, 2),
+    ("Vacaciones", 8, 5, 15),
+    ("Licencia", 5, 30, 90),
+)
+
+NOMBRES = (
+    "Ana", "Carlos", "Luisa", "Jorge", "María", "Andrés", "Paula", "Diego",
+    "Camila", "Felipe", "Laura", "Santiago", "Valentina", "Julián", "Sofía", "Miguel",
+)
+APELLIDOS = (
+    "Gómez", "Rodríguez", "Martínez", "López", "García", "Pérez", "Sánchez", "Ramírez",
+    "Torres", "Díaz", "Vargas", "Castro", "Rojas", "Moreno", "Herrera", "Ortiz",
+)
+
+
+@dataclass
+class ResumenSemilla:
+    colegios: int = 0
+    docentes: int = 0
+    permisos: int = 0
+    usuarios: int = 0
+
+
+def correo_colegio(numero):
+    """Usuario aprobado del colegio número `numero` (0, 1, 2...)"""
+    return f"colegio{numero}@{DOMINIO_CORREO}"
+
+
+def correo_admin():
+    return f"admin@{DOMINIO_CORREO}"
+
+
+# ════════════════════════════════════════════════════════════════
+# CARGA MASIVA
+# ════════════════════════════════════════════════════════════════
+
+def _es_postgres():
+    return db.engine.dialect.name == "postgresql"
+
+
+def _copiar(tabla, columnas, filas):
+    """COPY ... FROM STDIN en bloques de TAMANO_LOTE filas (PostgreSQL)"""
+    cursor = db.session.connection().connection.cursor()
+    sentencia = f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)"
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    pendientes = 0
+    total = 0
+
+    def enviar():
+        buffer.seek(0)
+        cursor.copy_expert(sentencia, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for fila in filas:
+        escritor.writerow(fila)
+        pendientes += 1
+        if pendientes >= TAMANO_LOTE:
+            enviar()
+            total += pendientes
+            pendientes = 0
+    if pendientes:
+        enviar()
+        total += pendientes
+
+    cursor.close()
+    return total
+
+
+def _insertar(modelo, columnas, filas):
+    """executemany en lotes de TAMANO_LOTE filas"""
+    lote = []
+    total = 0
+    for fila in filas:
+        lote.append(dict(zip(columnas, fila)))
+        if len(lote) >= TAMANO_LOTE:
+            db.session.execute(insert(modelo), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(modelo), lote)
+        total += len(lote)
+    return total
+
+
+def cargar(modelo, columnas, filas):
+    """Inserta `filas` (tuplas en el orden de `columnas`) con el método más rápido"""
+    if _es_postgres():
+        return _copiar(modelo.__tablename__, columnas, filas)
+    return _insertar(modelo, columnas, filas)
+
+
+# ════════════════════════════════════════════════════════════════
+# GENERADORES
+# ════════════════════════════════════════════════════════════════
+
+def _filas_docentes(rnd, colegio_ids, docentes_por_colegio, ahora):
+    for colegio_id in colegio_ids:
+        # Colegios de distinto tamaño alrededor del promedio pedido
+        cantidad = max(1, int(rnd.gauss(docentes_por_colegio, docentes_por_colegio / 4)))
+        for i in range(cantidad):
+            nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)} {i}"
+            yield (nombre, colegio_id, str(rnd.randint(10**7, 10**10)), rnd.random() > 0.05, ahora)
+
+
+def _dia_habil(rnd, dia):
+    # Nueve de cada diez permisos empiezan de lunes a viernes
+    if dia.weekday() >= 5 and rnd.random() < 0.9:
+        dia += timedelta(days=7 - dia.weekday())
+    return dia
+
+
+def _filas_permisos(rnd, docentes, permisos_por_docente, hoy, anios):
+    tipos = [t[0] for t in TIPOS_PERMISO]
+    pesos = [t[1] for t in TIPOS_PERMISO]
+    duraciones = {t[0]: (t[2], t[3]) for t in TIPOS_PERMISO}
+    dias_historia = anios * 365
+
+    for docente_id, colegio_id in docentes:
+        cantidad = rnd.randint(permisos_por_docente // 2, permisos_por_docente * 3 // 2)
+        if not cantidad:
+            continue
+        # Huecos medios para repartir los permisos en la historia sin cruces
+        hueco = max(1, dias_historia // cantidad)
+        dia = hoy - timedelta(days=dias_historia)
+        for _ in range(cantidad):
+            dia = _dia_habil(rnd, dia + timedelta(days=rnd.randint(1, 2 * hueco)))
+            tipo = rnd.choices(tipos, weights=pesos)[0]
+            minimo, maximo = duraciones[tipo]
+            fin = dia + timedelta(days=rnd.randint(minimo, maximo) - 1)
+            yield (docente_id, colegio_id, dia, fin, tipo)
+            dia = fin
+
+
+def sembrar(colegios, docentes_por_colegio, permisos_por_docente, password_hash,
+            semilla=42, anios=3, fecha=FECHA_REFERENCIA):
+    """
+    Carga el conjunto completo en una transacción y retorna un ResumenSemilla.
+    Falla con ValueError si ya hay colegios: la semilla es para bases vacías.
+    La historia de permisos termina en `fecha`.
+    """
+    if db.session.scalar(select(Colegio.id).limit(1)) is not None:
+        raise ValueError("La base ya tiene colegios; usa una base vacía")
+
+    rnd = random.Random(semilla)
+    hoy = fecha
+    ahora = datetime.combine(fecha, datetime.min.time())
+    resumen = ResumenSemilla()
+
+    try:
+        resumen.colegios = cargar(Colegio, ("nombre",), (
+            (f"Colegio Semilla {i:05d}",) for i in range(colegios)
+        ))
+        colegio_ids = db.session.scalars(select(Colegio.id).order_by(Colegio.id)).all()
+
+        resumen.docentes = cargar(
+            Docente,
+            ("nombre", "colegio_id", "documento", "activo", "fecha_creacion"),
+            _filas_docentes(rnd, colegio_ids, docentes_por_colegio, ahora)
+        )
+        docentes = db.session.execute(
+            select(Docente.id, Docente.colegio_id).order_by(Docente.id)
+        ).all()
+
+        resumen.permisos = cargar(
+            Permiso,
+            ("docente_id", "colegio_id", "fecha_inicio", "fecha_fin", "tipo"),
+            _filas_permisos(rnd, docentes, permisos_por_docente, hoy, anios)
+        )
+
+        # Mismo hash para todos: el load test inicia sesión con una clave conocida
+        usuarios = [(correo_admin(), password_hash, None, True, True, True, ahora, ahora, 15, 0,
+                      Usuario.ACCESO_APROBADO)]
+        usuarios += [
+            (correo_colegio(n), password_hash, colegio_id, False, True, True, ahora, ahora, 15, 0,
+             Usuario.ACCESO_APROBADO)
+            for n, colegio_id in enumerate(colegio_ids)
+        ]
+        resumen.usuarios = cargar(
+            Usuario,
+            ("email", "password_hash", "colegio_id", "is_superadmin", "is_active", "is_approved",
+             "fecha_registro", "fecha_aprobacion", "dias_prueba", "failed_attempts", "estado_acceso"),
+            usuarios
+        )
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if _es_postgres():
+        # Estadísticas frescas para el planificador tras la carga
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+            conexion.execute(text("ANALYZE"))
+
+    return resumen
+
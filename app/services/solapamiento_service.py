@@ -0,0 +1,198 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import and_, func, literal_column, select
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.models.permiso import Permiso
+
+
+@dataclass(frozen=True)
+class Intervalo:
+    """Permiso reducido a lo necesario para detectar cruces de fechas"""
+    id: Optional[int]
+    docente_id: int
+    fecha_inicio: date
+    fecha_fin: date
+    tipo: Optional[str] = None
+
+    def se_cruza_con(self, otro):
+        # Intervalos cerrados [inicio, fin]: el último día también cuenta
+        return self.fecha_inicio <= otro.fecha_fin and otro.fecha_inicio <= self.fecha_fin
+
+
+@dataclass
+class ResultadoValidacion:
+    candidato: Intervalo
+    conflictos: List[Intervalo] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def valido(self):
+        return self.error is None and not self.conflictos
+
+
+def _es_postgres():
+    return db.engine.dialect.name == "postgresql"
+
+
+def _daterange(inicio, fin):
+    # Debe coincidir con la expresión del índice GiST ix_permisos_docente_periodo
+    return func.daterange(inicio, fin, literal_column("'[]'"))
+
+
+def _columnas():
+    return (
+        Permiso.id, Permiso.docente_id,
+        Permiso.fecha_inicio, Permiso.fecha_fin, Permiso.tipo
+    )
+
+
+def _a_intervalos(filas):
+    return [
+        Intervalo(id=f.id, docente_id=f.docente_id, fecha_inicio=f.fecha_inicio,
+                  fecha_fin=f.fecha_fin, tipo=f.tipo)
+        for f in filas
+    ]
+
+
+def _intervalos_en_ventana(docente_id, inicio, fin, excluir_ids=()):
+    """
+    Permisos del docente que se cruzan con [inicio, fin], ordenados por inicio.
+
+    PostgreSQL: operador && sobre daterange, resuelto por el índice GiST.
+    Otros motores: la condición de cruce sobre el índice (docente_id,
+    fecha_inicio); no supone que el historial esté libre de cruces (datos
+    anteriores, importaciones o `flask seed` pueden tenerlos).
+    """
+    filtros = [Permiso.docente_id == docente_id]
+    if excluir_ids:
+        filtros.append(Permiso.id.notin_(list(excluir_ids)))
+
+    if _es_postgres():
+        cruce = _daterange(Permiso.fecha_inicio, Permiso.fecha_fin).op("&&")(
+            _daterange(inicio, fin)
+        )
+    else:
+        cruce = and_(Permiso.fecha_inicio <= fin, Permiso.fecha_fin >= inicio)
+
+    filas = db.session.execute(
+        select(*_columnas()).where(*filtros, cruce).order_by(Permiso.fecha_inicio)
+    ).all()
+    return _a_intervalos(filas)
+
+
+def _bloquear_docentes(docente_ids):
+    """
+    SELECT ... FOR UPDATE sobre los docentes: dos altas simultáneas del mismo
+    docente se validan una después de la otra. El bloqueo dura hasta el
+    commit (o rollback) de la petición, que es quien inserta el permiso.
+    En SQLite FOR UPDATE no existe y la consulta no bloquea nada.
+    """
+    if not docente_ids or not _es_postgres():
+        return
+    db.session.execute(
+        select(Docente.id)
+        .where(Docente.id.in_(sorted(docente_ids)))
+        .order_by(Docente.id)
+        .with_for_update()
+    )
+
+
+def _cruces_ordenados(intervalos, candidato, inicios):
+    """Cruces de `candidato` dentro de `intervalos` (ordenados por fecha_inicio)"""
+    # Sólo pueden cruzarse los que empiezan antes de que termine el candidato
+    limite = bisect_right(inicios, candidato.fecha_fin)
+    return [i for i in intervalos[:limite] if i.fecha_fin >= candidato.fecha_inicio]
+
+
+# ════════════════════════════════════════════════════════════════
+# API PÚBLICA
+# ════════════════════════════════════════════════════════════════
+
+def buscar_solapamientos(docente_id, fecha_inicio, fecha_fin, excluir_id=None):
+    """Permisos existentes del docente que se cruzan con [fecha_inicio, fecha_fin]"""
+    excluir = (excluir_id,) if excluir_id else ()
+    return _intervalos_en_ventana(docente_id, fecha_inicio, fecha_fin, excluir)
+
+
+def validar_lote(candidatos):
+    """
+    Valida varios permisos candidatos a la vez.
+
+    `candidatos` es una lista de Intervalo (id=None para nuevos, o el id del
+    permiso que se está editando). Se hace una sola consulta por docente
+    sobre la ventana que cubren sus candidatos, y luego cada candidato se
+    resuelve con búsqueda binaria sobre la lista ordenada. Los candidatos
+    del mismo docente también se comparan entre sí. En PostgreSQL los
+    docentes quedan bloqueados hasta el commit que guarda los permisos.
+
+    Devuelve una lista de ResultadoValidacion en el mismo orden.
+    """
+    resultados = [ResultadoValidacion(candidato=c) for c in candidatos]
+
+    por_docente = defaultdict(list)
+    for resultado in resultados:
+        c = resultado.candidato
+        if c.fecha_inicio is None or c.fecha_fin is None:
+            resultado.error = "Las fechas de inicio y fin son obligatorias"
+        elif c.fecha_fin < c.fecha_inicio:
+            resultado.error = "La fecha de fin no puede ser anterior a la fecha de inicio"
+        else:
+            por_docente[c.docente_id].append(resultado)
+
+    _bloquear_docentes(por_docente.keys())
+
+    for docente_id, grupo in por_docente.items():
+        inicio = min(r.candidato.fecha_inicio for r in grupo)
+        fin = max(r.candidato.fecha_fin for r in grupo)
+        excluir = {r.candidato.id for r in grupo if r.candidato.id}
+
+        existentes = _intervalos_en_ventana(docente_id, inicio, fin, excluir)
+        inicios = [i.fecha_inicio for i in existentes]
+
+        for resultado in grupo:
+            resultado.conflictos.extend(
+                _cruces_ordenados(existentes, resultado.candidato, inicios)
+            )
+
+        # Cruces entre candidatos del mismo lote (barrido sobre la lista ordenada)
+        grupo_ordenado = sorted(grupo, key=lambda r: r.candidato.fecha_inicio)
+        activos = []
+        for resultado in grupo_ordenado:
+            c = resultado.candidato
+            activos = [a for a in activos if a.candidato.fecha_fin >= c.fecha_inicio]
+            for otro in activos:
+                resultado.conflictos.append(otro.candidato)
+                otro.conflictos.append(c)
+            activos.append(resultado)
+
+    return resultados
+
+
+def validar_permiso(docente_id, fecha_inicio, fecha_fin, permiso_id=None):
+    """
+    Valida un único permiso.
+    Retorna: (bool, mensaje)
+    """
+    resultado = validar_lote([
+        Intervalo(id=permiso_id, docente_id=docente_id,
+                  fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+    ])[0]
+
+    if resultado.error:
+        return False, resultado.error
+
+    if resultado.conflictos:
+        detalle = ", ".join(
+            f"{c.tipo or 'permiso'} del {c.fecha_inicio.strftime('%d/%m/%Y')} "
+            f"al {c.fecha_fin.strftime('%d/%m/%Y')}"
+            for c in resultado.conflictos
+        )
+        return False, f"⚠️ El docente ya tiene permisos en esas fechas: {detalle}"
+
+    return True, "OK"
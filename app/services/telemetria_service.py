@@ -0,0 +1,443 @@
+"""
+Telemetría de rendimiento por ruta: latencia, número y tiempo de consultas
+SQL y tiempo de render de plantillas.
+
+Cada worker acumula histogramas en memoria (unos pocos microsegundos por
+petición) y cada TELEMETRIA_INTERVALO segundos vuelca una copia a
+TELEMETRIA_DIR/<pid>.json. Las vistas de /admin/perf suman los archivos
+de todos los workers vivos del host: el archivo de un proceso que ya no
+existe se borra, uno sin volcar en VOLCADOS_VIGENTES intervalos se ignora
+(pid reutilizado por otro programa) y cada worker borra el suyo al salir.
+
+TELEMETRIA_MUESTREO indica la fracción de peticiones que se mide
+(1.0 = todas, 0 = desactivada, sin ningún hook registrado).
+"""
+import atexit
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+from flask import before_render_template, request, request_finished, request_started, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites superiores de las cubetas; la última cubeta es +Inf
+LIMITES_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LIMITES_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+DIR_POR_DEFECTO = os.path.join(tempfile.gettempdir(), "sistpro-telemetria")
+VOLCADOS_VIGENTES = 6
+
+
+class Histograma:
+    __slots__ = ("limites", "cubetas", "suma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = len(self.limites)
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                indice = i
+                break
+        self.cubetas[indice] += 1
+        self.suma += valor
+        self.total += 1
+
+    def fusionar(self, datos):
+        for i, cantidad in enumerate(datos["cubetas"]):
+            self.cubetas[i] += cantidad
+        self.suma += datos["suma"]
+        self.total += datos["total"]
+
+    def como_dict(self):
+        return {"cubetas": list(self.cubetas), "suma": self.suma, "total": self.total}
+
+    @property
+    def promedio(self):
+        return self.suma / self.total if self.total else 0.0
+
+    def cuantil(self, q):
+        """Estimación por interpolación lineal dentro de la cubeta"""
+        if not self.total:
+            return 0.0
+        objetivo = q * self.total
+        acumulado = 0
+        inferior = 0.0
+        for i, cantidad in enumerate(self.cubetas):
+            if acumulado + cantidad >= objetivo and cantidad:
+                if i == len(self.limites):
+                    return float(self.limites[-1])
+                superior = self.limites[i]
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cantidad
+            acumulado += cantidad
+            if i < len(self.limites):
+                inferior = self.limites[i]
+        return float(self.limites[-1])
+
+
+class MetricasRuta:
+    __slots__ = ("latencia_ms", "consultas", "sql_ms", "plantilla_ms", "errores")
+
+    def __init__(self):
+        self.latencia_ms = Histograma(LIMITES_MS)
+        self.consultas = Histograma(LIMITES_CONSULTAS)
+        self.sql_ms = Histograma(LIMITES_MS)
+        self.plantilla_ms = Histograma(LIMITES_MS)
+        self.errores = 0
+
+    def histogramas(self):
+        return {
+            "latencia_ms": self.latencia_ms,
+            "consultas": self.consultas,
+            "sql_ms": self.sql_ms,
+            "plantilla_ms": self.plantilla_ms,
+        }
+
+    def fusionar(self, datos):
+        for nombre, histograma in self.histogramas().items():
+            histograma.fusionar(datos[nombre])
+        self.errores += datos.get("errores", 0)
+
+    def como_dict(self):
+        datos = {nombre: h.como_dict() for nombre, h in self.histogramas().items()}
+        datos["errores"] = self.errores
+        return datos
+
+
+class MetricasCompresion:
+    """Contadores del middleware de compresión (app.middleware.compresion)"""
+    __slots__ = ("nivel", "comprimidas", "omitidas", "bytes_entrada", "bytes_salida")
+
+    def __init__(self, nivel=0):
+        self.nivel = nivel
+        self.comprimidas = 0
+        self.omitidas = 0
+        self.bytes_entrada = 0
+        self.bytes_salida = 0
+
+    @property
+    def ratio(self):
+        """Bytes enviados / bytes originales (0.25 = cuatro veces más pequeño)"""
+        return self.bytes_salida / self.bytes_entrada if self.bytes_entrada else 1.0
+
+    def fusionar(self, datos):
+        self.nivel = max(self.nivel, datos.get("nivel", 0))
+        self.comprimidas += datos.get("comprimidas", 0)
+        self.omitidas += datos.get("omitidas", 0)
+        self.bytes_entrada += datos.get("bytes_entrada", 0)
+        self.bytes_salida += datos.get("bytes_salida", 0)
+
+    def como_dict(self):
+        return {nombre: getattr(self, nombre) for nombre in self.__slots__}
+
+
+class Agregado(NamedTuple):
+    rutas: dict
+    compresion: MetricasCompresion
+
+
+class _Medicion:
+    """Acumulador de una petición (vive en un thread-local)"""
+    __slots__ = ("inicio", "consultas", "sql_s", "plantilla_s", "plantillas_abiertas")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.sql_s = 0.0
+        self.plantilla_s = 0.0
+        self.plantillas_abiertas = []
+
+
+# ════════════════════════════════════════════════════════════════
+# REGISTRO DEL PROCESO Y VOLCADO A DISCO
+# ════════════════════════════════════════════════════════════════
+
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, pero es de otro usuario
+    return True
+
+
+class Telemetria:
+    def __init__(self):
+        self.muestreo = 0.0
+        self.directorio = DIR_POR_DEFECTO
+        self.intervalo = 10
+        self._rutas = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ultimo_volcado = 0.0
+        self._hooks_sql = False
+        self._compresion = MetricasCompresion()
+
+    @property
+    def activa(self):
+        return self.muestreo > 0
+
+    def init_app(self, app):
+        self.muestreo = app.config.get("TELEMETRIA_MUESTREO", 1.0)
+        self.directorio = app.config.get("TELEMETRIA_DIR") or DIR_POR_DEFECTO
+        self.intervalo = app.config.get("TELEMETRIA_INTERVALO", 10)
+        if not self.activa:
+            return
+
+        os.makedirs(self.directorio, exist_ok=True)
+        atexit.register(self.borrar_archivo)
+
+        request_started.connect(self._al_iniciar, app, weak=False)
+        request_finished.connect(self._al_terminar, app, weak=False)
+        before_render_template.connect(self._antes_de_plantilla, app, weak=False)
+        template_rendered.connect(self._despues_de_plantilla, app, weak=False)
+
+        if not self._hooks_sql:
+            event.listen(Engine, "before_cursor_execute", self._antes_de_sql)
+            event.listen(Engine, "after_cursor_execute", self._despues_de_sql)
+            self._hooks_sql = True
+
+    # ─── Señales de Flask ─────────────────────────────────────────
+
+    def _al_iniciar(self, sender, **extra):
+        self._local.medicion = _Medicion() if random.random() < self.muestreo else None
+
+    def _al_terminar(self, sender, response, **extra):
+        medicion = getattr(self._local, "medicion", None)
+        if medicion is None:
+            return
+        self._local.medicion = None
+
+        latencia_ms = (time.perf_counter() - medicion.inicio) * 1000
+        ruta = request.endpoint or "sin_ruta"
+
+        with self._lock:
+            metricas = self._rutas.get(ruta)
+            if metricas is None:
+                metricas = self._rutas[ruta] = MetricasRuta()
+            metricas.latencia_ms.observar(latencia_ms)
+            metricas.consultas.observar(medicion.consultas)
+            metricas.sql_ms.observar(medicion.sql_s * 1000)
+            metricas.plantilla_ms.observar(medicion.plantilla_s * 1000)
+            if response.status_code >= 500:
+                metricas.errores += 1
+
+        self.volcar_si_toca()
+
+    def _antes_de_plantilla(self, sender, template, context, **extra):
+        medicion = getattr(self._local, "medicion", None)
+        if medicion is not None:
+            medicion.plantillas_abiertas.append(time.perf_counter())
+
+    def _despues_de_plantilla(self, sender, template, context, **extra):
+        medicion = getattr(self._local, "medicion", None)
+        if medicion is not None and medicion.plantillas_abiertas:
+            inicio = medicion.plantillas_abiertas.pop()
+            # Sólo se suma el render más externo (los anidados ya están dentro)
+            if not medicion.plantillas_abiertas:
+                medicion.plantilla_s += time.perf_counter() - inicio
+
+    # ─── Eventos de SQLAlchemy ────────────────────────────────────
+
+    def _antes_de_sql(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, "medicion", None) is not None:
+            conn.info.setdefault("telemetria_inicio", []).append(time.perf_counter())
+
+    def _despues_de_sql(self, conn, cursor, statement, parameters, context, executemany):
+        medicion = getattr(self._local, "medicion", None)
+        inicios = conn.info.get("telemetria_inicio")
+        if medicion is None or not inicios:
+            return
+        medicion.consultas += 1
+        medicion.sql_s += time.perf_counter() - inicios.pop()
+
+    # ─── Compresión (la registra el middleware WSGI) ──────────────
+
+    def configurar_compresion(self, nivel):
+        self._compresion.nivel = nivel
+
+    def registrar_compresion(self, bytes_entrada, bytes_salida):
+        with self._lock:
+            self._compresion.comprimidas += 1
+            self._compresion.bytes_entrada += bytes_entrada
+            self._compresion.bytes_salida += bytes_salida
+
+    def registrar_sin_compresion(self):
+        with self._lock:
+            self._compresion.omitidas += 1
+
+    # ─── Instantáneas ─────────────────────────────────────────────
+
+    def instantanea_local(self):
+        with self._lock:
+            return {
+                "rutas": {ruta: m.como_dict() for ruta, m in self._rutas.items()},
+                "compresion": self._compresion.como_dict(),
+            }
+
+    def _archivo(self, pid=None):
+        return os.path.join(self.directorio, f"{pid or os.getpid()}.json")
+
+    def volcar(self):
+        """Escribe la instantánea de este worker (reemplazo atómico)"""
+        datos = json.dumps(self.instantanea_local())
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as f:
+            f.write(datos)
+        os.replace(temporal, self._archivo())
+
+    def borrar_archivo(self):
+        """Al salir el worker: sus métricas ya no deben sumarse"""
+        try:
+            os.remove(self._archivo())
+        except OSError:
+            pass
+
+    def volcar_si_toca(self):
+        ahora = time.monotonic()
+        if ahora - self._ultimo_volcado < self.intervalo:
+            return
+        self._ultimo_volcado = ahora
+        try:
+            self.volcar()
+        except OSError:
+            pass  # la telemetría nunca debe romper una petición
+
+    def agregado(self):
+        """
+        MetricasRuta por ruta y contadores de compresión, sumando este worker
+        (en vivo) y los demás (disco)
+        """
+        rutas = {}
+        compresion = MetricasCompresion()
+
+        def sumar(instantanea):
+            for ruta, datos in instantanea.get("rutas", {}).items():
+                rutas.setdefault(ruta, MetricasRuta()).fusionar(datos)
+            compresion.fusionar(instantanea.get("compresion", {}))
+
+        sumar(self.instantanea_local())
+        propio = os.path.basename(self._archivo())
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            nombres = []
+        vigente_desde = time.time() - VOLCADOS_VIGENTES * max(self.intervalo, 1)
+        for nombre in nombres:
+            if not nombre.endswith(".json") or nombre == propio:
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                if not _proceso_vivo(int(nombre[:-len(".json")])):
+                    os.remove(ruta)
+                    continue
+                if os.path.getmtime(ruta) < vigente_desde:
+                    continue
+                with open(ruta) as f:
+                    sumar(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+        return Agregado(rutas=rutas, compresion=compresion)
+
+
+telemetria = Telemetria()
+
+
+class ResumenRuta(NamedTuple):
+    ruta: str
+    peticiones: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    tiempo_total_s: float
+    consultas_promedio: float
+    consultas_p95: float
+    sql_promedio_ms: float
+    plantilla_promedio_ms: float
+    errores: int
+
+
+def resumen_por_ruta(rutas):
+    """Filas para /admin/perf, las rutas que más tiempo consumen primero"""
+    filas = [
+        ResumenRuta(
+            ruta=ruta,
+            peticiones=m.latencia_ms.total,
+            p50_ms=m.latencia_ms.cuantil(0.50),
+            p95_ms=m.latencia_ms.cuantil(0.95),
+            p99_ms=m.latencia_ms.cuantil(0.99),
+            tiempo_total_s=m.latencia_ms.suma / 1000,
+            consultas_promedio=m.consultas.promedio,
+            consultas_p95=m.consultas.cuantil(0.95),
+            sql_promedio_ms=m.sql_ms.promedio,
+            plantilla_promedio_ms=m.plantilla_ms.promedio,
+            errores=m.errores
+        )
+        for ruta, m in rutas.items()
+    ]
+    return sorted(filas, key=lambda f: f.tiempo_total_s, reverse=True)
+
+
+# ════════════════════════════════════════════════════════════════
+# FORMATO PROMETHEUS
+# ════════════════════════════════════════════════════════════════
+
+_FAMILIAS = (
+    ("latencia_ms", "sistpro_request_duration_seconds", "Latencia de las peticiones", 1000),
+    ("consultas", "sistpro_sql_queries_per_request", "Consultas SQL por petición", 1),
+    ("sql_ms", "sistpro_sql_duration_seconds", "Tiempo en SQL por petición", 1000),
+    ("plantilla_ms", "sistpro_template_duration_seconds", "Tiempo de render de plantillas por petición", 1000),
+)
+
+
+def _etiqueta(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formato_prometheus(rutas, compresion=None):
+    """Texto de exposición de Prometheus (histogramas acumulados por ruta)"""
+    lineas = []
+    for atributo, nombre, ayuda, divisor in _FAMILIAS:
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} histogram")
+        for ruta in sorted(rutas):
+            histograma = getattr(rutas[ruta], atributo)
+            etiqueta = _etiqueta(ruta)
+            acumulado = 0
+            for limite, cantidad in zip(histograma.limites, histograma.cubetas):
+                acumulado += cantidad
+                lineas.append(f'{nombre}_bucket{{ruta="{etiqueta}",le="{limite / divisor:g}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{ruta="{etiqueta}",le="+Inf"}} {histograma.total}')
+            lineas.append(f'{nombre}_sum{{ruta="{etiqueta}"}} {histograma.suma / divisor:.6f}')
+            lineas.append(f'{nombre}_count{{ruta="{etiqueta}"}} {histograma.total}')
+
+    lineas.append("# HELP sistpro_request_errors_total Respuestas 5xx")
+    lineas.append("# TYPE sistpro_request_errors_total counter")
+    for ruta in sorted(rutas):
+        lineas.append(f'sistpro_request_errors_total{{ruta="{_etiqueta(ruta)}"}} {rutas[ruta].errores}')
+
+    if compresion is not None:
+        for nombre, tipo, ayuda, valor in (
+            ("sistpro_compression_level", "gauge", "Nivel de gzip del middleware", compresion.nivel),
+            ("sistpro_compressed_responses_total", "counter", "Respuestas comprimidas", compresion.comprimidas),
+            ("sistpro_uncompressed_responses_total", "counter",
+             "Respuestas que aceptaban gzip pero no se comprimieron", compresion.omitidas),
+            ("sistpro_compression_input_bytes_total", "counter", "Bytes antes de comprimir", compresion.bytes_entrada),
+            ("sistpro_compression_output_bytes_total", "counter", "Bytes enviados comprimidos", compresion.bytes_salida),
+        ):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.append(f"{nombre} {valor}")
+
+    return "\n".join(lineas) + "\n"
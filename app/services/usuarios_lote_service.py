@@ -0,0 +1,255 @@
+"""
+Operaciones masivas del superadministrador sobre usuarios.
+
+Aprobar, bloquear, activar o extender la prueba de muchos usuarios a la vez
+(una lista de ids o un filtro como "pruebas que vencen esta semana"). Cada
+operación es una lectura de los usuarios afectados y un único UPDATE sobre
+todos ellos, en la misma transacción. El resultado indica qué pasó con cada
+id, con las mismas protecciones que las rutas de un solo usuario.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import DateTime, bindparam, false, func, null, select, true, update
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.services.acceso_service import expresion_estado_acceso, expresion_vencimiento_prueba
+from app.services.cache_service import notificar_usuarios_modificados
+
+MAX_USUARIOS_LOTE = 5000
+MAX_DIAS_EXTENSION = 365
+
+# Resultado por id
+RESULTADO_OK = "ok"
+RESULTADO_NO_EXISTE = "no_existe"
+RESULTADO_SUPERADMIN = "superadmin"
+RESULTADO_APROBADO = "aprobado"
+
+ACCIONES = ("aprobar", "bloquear", "activar", "extender")
+
+FILTROS = {
+    "por_vencer_semana": "Pruebas que vencen en los próximos 7 días",
+    "en_prueba": "Todas las pruebas vigentes",
+    "vencidos": "Pruebas vencidas",
+}
+
+
+@dataclass
+class ResultadoLote:
+    accion: str
+    resultados: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def aplicados(self):
+        return sum(1 for r in self.resultados.values() if r == RESULTADO_OK)
+
+    @property
+    def omitidos(self):
+        return len(self.resultados) - self.aplicados
+
+    def como_dict(self):
+        return {
+            "accion": self.accion,
+            "aplicados": self.aplicados,
+            "omitidos": self.omitidos,
+            "resultados": {str(i): r for i, r in self.resultados.items()},
+        }
+
+
+# ════════════════════════════════════════════════════════════════
+# SELECCIÓN DE USUARIOS
+# ════════════════════════════════════════════════════════════════
+
+_COLUMNAS = (
+    Usuario.id, Usuario.is_superadmin, Usuario.is_approved,
+    Usuario.fecha_registro, Usuario.dias_prueba, Usuario.fecha_expiracion,
+)
+
+
+def condicion_filtro(filtro, ahora):
+    """Condición SQL de un filtro de FILTROS (resuelta por el índice de estado_acceso)"""
+    en_prueba = Usuario.estado_acceso.in_((Usuario.ACCESO_PRUEBA, Usuario.ACCESO_POR_VENCER))
+    if filtro == "por_vencer_semana":
+        return (
+            en_prueba,
+            Usuario.fecha_expiracion >= ahora,
+            Usuario.fecha_expiracion < ahora + timedelta(days=7),
+        )
+    if filtro == "en_prueba":
+        return (en_prueba,)
+    if filtro == "vencidos":
+        return (Usuario.estado_acceso == Usuario.ACCESO_VENCIDO,)
+    raise ValueError(f"Filtro desconocido: {filtro}")
+
+
+def _seleccionar(ids, filtro, ahora):
+    """
+    Filas de los usuarios pedidos y los ids que no existen.
+    Con ids y filtro a la vez, se aplican ambos.
+    """
+    if not ids and not filtro:
+        raise ValueError("Selecciona al menos un usuario o un filtro")
+
+    consulta = select(*_COLUMNAS).order_by(Usuario.id).limit(MAX_USUARIOS_LOTE + 1)
+    if ids:
+        ids = sorted(set(ids))
+        if len(ids) > MAX_USUARIOS_LOTE:
+            raise ValueError(f"Máximo {MAX_USUARIOS_LOTE} usuarios por operación")
+        consulta = consulta.where(Usuario.id.in_(ids))
+    if filtro:
+        consulta = consulta.where(*condicion_filtro(filtro, ahora))
+
+    filas = db.session.execute(consulta).all()
+    if len(filas) > MAX_USUARIOS_LOTE:
+        raise ValueError(f"El filtro devuelve más de {MAX_USUARIOS_LOTE} usuarios")
+
+    encontrados = {f.id for f in filas}
+    # Con filtro, un id pedido que no lo cumple también cuenta como no encontrado
+    faltantes = [i for i in ids or () if i not in encontrados]
+    return filas, faltantes
+
+
+# ════════════════════════════════════════════════════════════════
+# OPERACIONES
+# ════════════════════════════════════════════════════════════════
+
+def _sentencia(accion, ahora):
+    """UPDATE de la acción, con estado_acceso calculado sobre los valores nuevos"""
+    if accion == "aprobar":
+        valores = dict(
+            is_approved=True,
+            fecha_aprobacion=ahora,
+            fecha_expiracion=None,
+            estado_acceso=expresion_estado_acceso(ahora, aprobado=true(), vence=null()),
+        )
+    elif accion == "bloquear":
+        # Deja de estar aprobado: como el evento before_update del ORM, fija
+        # el vencimiento para que al reactivarlo la prueba no quede abierta
+        valores = dict(
+            is_active=False,
+            is_approved=False,
+            fecha_expiracion=func.coalesce(
+                Usuario.fecha_expiracion, expresion_vencimiento_prueba(ahora), type_=DateTime
+            ),
+            estado_acceso=Usuario.ACCESO_BLOQUEADO,
+        )
+    elif accion == "activar":
+        valores = dict(is_active=True, estado_acceso=expresion_estado_acceso(ahora, activo=true()))
+    else:
+        raise ValueError(f"Acción desconocida: {accion}")
+    return update(Usuario).values(**valores)
+
+
+def aplicar_lote(accion, ids=None, filtro=None, dias=None, ahora=None):
+    """
+    Ejecuta `accion` (ver ACCIONES) sobre los usuarios de `ids` y/o `filtro`
+    en una sola transacción y retorna un ResultadoLote.
+    Lanza ValueError si la petición no es válida.
+    """
+    if accion not in ACCIONES:
+        raise ValueError(f"Acción desconocida: {accion}")
+    ahora = ahora or datetime.utcnow()
+
+    if accion == "extender":
+        if dias is None or not 1 <= dias <= MAX_DIAS_EXTENSION:
+            raise ValueError(f"Los días deben estar entre 1 y {MAX_DIAS_EXTENSION}")
+
+    filas, faltantes = _seleccionar(ids, filtro, ahora)
+    resultado = ResultadoLote(accion=accion)
+    resultado.resultados.update((i, RESULTADO_NO_EXISTE) for i in faltantes)
+
+    objetivo = []
+    for fila in filas:
+        # Activar no tiene restricción, igual que la ruta individual
+        if fila.is_superadmin and accion != "activar":
+            resultado.resultados[fila.id] = RESULTADO_SUPERADMIN
+        elif accion == "extender" and fila.is_approved:
+            resultado.resultados[fila.id] = RESULTADO_APROBADO
+        else:
+            objetivo.append(fila)
+
+    if not objetivo:
+        return resultado
+
+    try:
+        rechazados = {}
+        if accion == "extender":
+            modificados, rechazados = _extender(objetivo, dias, ahora)
+        else:
+            sentencia = _sentencia(accion, ahora).where(Usuario.id.in_([f.id for f in objetivo]))
+            if accion != "activar":
+                # Por si alguien pasó a superadmin entre la lectura y el UPDATE
+                sentencia = sentencia.where(Usuario.is_superadmin.is_(False))
+            modificados = set(db.session.scalars(
+                sentencia.returning(Usuario.id).execution_options(synchronize_session=False)
+            ).all())
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for fila in objetivo:
+        resultado.resultados[fila.id] = (
+            RESULTADO_OK if fila.id in modificados
+            else rechazados.get(fila.id, RESULTADO_SUPERADMIN)
+        )
+
+    # El UPDATE masivo no pasa por los eventos del ORM
+    notificar_usuarios_modificados(sorted(modificados))
+    return resultado
+
+
+def _extender(filas, dias, ahora):
+    """
+    Suma `dias` al vencimiento de cada prueba (o a hoy, si ya venció).
+    Cada usuario tiene su propia fecha: es una sola sentencia UPDATE
+    ejecutada con executemany.
+
+    Retorna (ids modificados, {id: resultado} de los que el UPDATE omitió).
+    """
+    tabla = Usuario.__table__
+    vence = bindparam("b_vence", type_=DateTime)
+    sentencia = (
+        update(tabla)
+        .where(tabla.c.id == bindparam("b_id"))
+        .where(tabla.c.is_superadmin.is_(False), tabla.c.is_approved.is_(False))
+        .values(
+            fecha_expiracion=vence,
+            dias_prueba=bindparam("b_dias"),
+            estado_acceso=expresion_estado_acceso(ahora, aprobado=false(), vence=vence),
+        )
+    )
+
+    parametros = []
+    for fila in filas:
+        registro = fila.fecha_registro or ahora
+        actual = fila.fecha_expiracion or registro + timedelta(days=fila.dias_prueba or 0)
+        nueva = max(actual, ahora) + timedelta(days=dias)
+        parametros.append({
+            "b_id": fila.id,
+            "b_vence": nueva,
+            # Mismo criterio que modificar_dias_prueba: registro + días = vencimiento
+            "b_dias": (nueva - registro).days,
+        })
+
+    db.session.execute(sentencia, parametros)
+
+    # executemany no admite RETURNING: se relee en la misma transacción. Las
+    # filas que cambió el UPDATE quedan bloqueadas hasta el commit, así que
+    # su estado es el que vio el UPDATE (aprobar o promover no las toca)
+    ids = [p["b_id"] for p in parametros]
+    estados = db.session.execute(
+        select(Usuario.id, Usuario.is_superadmin, Usuario.is_approved)
+        .where(Usuario.id.in_(ids))
+    ).all()
+
+    modificados = {e.id for e in estados if not e.is_superadmin and not e.is_approved}
+    rechazados = {
+        e.id: RESULTADO_SUPERADMIN if e.is_superadmin else RESULTADO_APROBADO
+        for e in estados if e.id not in modificados
+    }
+    # Eliminados entre la lectura y el UPDATE
+    rechazados.update((i, RESULTADO_NO_EXISTE) for i in set(ids) - {e.id for e in estados})
+    return modificados, rechazados
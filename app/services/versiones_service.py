@@ -0,0 +1,63 @@
+"""
+Contadores de versión compartidos entre los workers del mismo host.
+
+Una caché local guarda junto a cada entrada la versión con la que se
+construyó; si al leerla la versión compartida cambió, la entrada se descarta.
+Así un cambio hecho en un worker invalida las cachés de todos los demás
+sin consultar la base de datos.
+
+Backend según Config.VERSIONES_STORAGE_URI:
+    memory://             sólo este proceso (desarrollo)
+    mmap:///ruta/archivo  archivo mapeado compartido (producción)
+"""
+import random
+import threading
+
+from flask import current_app
+
+# Las claves de versión no deben vencer
+_EXPIRACION = 10 * 365 * 24 * 3600
+
+_backend = None
+_lock = threading.Lock()
+
+
+class _VersionesMemoria:
+    def __init__(self):
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        return self._datos.get(clave, 0)
+
+    def incr(self, clave, expiry, amount=1):
+        with self._lock:
+            self._datos[clave] = self._datos.get(clave, 0) + amount
+            return self._datos[clave]
+
+
+def _obtener_backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                uri = current_app.config.get("VERSIONES_STORAGE_URI", "memory://")
+                if uri.startswith("mmap://"):
+                    from app.utils.ratelimit_storage import MmapStorage
+                    _backend = MmapStorage(uri)
+                else:
+                    _backend = _VersionesMemoria()
+    return _backend
+
+
+def obtener_version(clave):
+    return _obtener_backend().get(clave)
+
+
+def incrementar_version(clave):
+    """
+    Cambia la versión de `clave`. El salto es aleatorio: si la tabla
+    compartida llegara a desalojar la clave, volver a 0 y subir de nuevo
+    no repetirá una versión que alguna caché tenga guardada.
+    """
+    return _obtener_backend().incr(clave, _EXPIRACION, amount=random.randint(1, 2 ** 31))
@@ -0,0 +1,183 @@
+"""
+Almacenamiento compartido para flask-limiter entre los workers de gunicorn.
+
+Los contadores viven en un archivo mapeado en memoria (mmap) que abren todos
+los procesos del mismo host, así el límite configurado es global y no se
+multiplica por el número de workers ni se pierde al reiniciar uno de ellos.
+
+Uso (Config.RATELIMIT_STORAGE_URI):
+    mmap:///tmp/sistpro-ratelimit.bin
+
+Cada operación toma un lock de hilo más un flock sobre el archivo y toca un
+puñado de bytes, por lo que el costo por petición es de microsegundos.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from limits.storage import Storage
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo hay un proceso en desarrollo
+    fcntl = None
+
+_MAGIC = b"SISTRL01"
+_CABECERA = struct.Struct("<8sI")
+# hash de la clave, expiración (epoch), contador
+_SLOT = struct.Struct("<Qdq")
+
+RUTA_POR_DEFECTO = os.path.join(tempfile.gettempdir(), "sistpro-ratelimit.bin")
+
+
+def _hash_clave(clave):
+    valor = int.from_bytes(
+        hashlib.blake2b(clave.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+    return valor or 1  # 0 marca un slot nunca usado
+
+
+class MmapStorage(Storage):
+    """
+    Tabla hash de tamaño fijo con sondeo lineal dentro de un archivo mmap.
+
+    Las entradas vencidas se reutilizan; si la ventana de sondeo está llena
+    se desaloja la entrada que vence antes. Sólo soporta la estrategia
+    fixed-window (la que usa la aplicación).
+    """
+
+    STORAGE_SCHEME = ["mmap"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, slots=65536, max_sondeo=32, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        partes = urlparse(uri or "")
+        self.ruta = (partes.netloc + partes.path) or RUTA_POR_DEFECTO
+        self.max_sondeo = max_sondeo
+
+        self._lock = threading.Lock()
+        self._fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o600)
+
+        tamano = _CABECERA.size + slots * _SLOT.size
+        with self._bloqueo():
+            actual = os.fstat(self._fd).st_size
+            if actual < _CABECERA.size:
+                os.ftruncate(self._fd, tamano)
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, _CABECERA.pack(_MAGIC, slots))
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                magic, slots_archivo = _CABECERA.unpack(os.read(self._fd, _CABECERA.size))
+                if magic != _MAGIC:
+                    raise ValueError(f"{self.ruta} no es un archivo de rate limit válido")
+                # Otro worker ya lo creó: se respeta su tamaño
+                slots = slots_archivo
+                tamano = _CABECERA.size + slots * _SLOT.size
+
+        self.slots = slots
+        self._mm = mmap.mmap(self._fd, tamano)
+
+    @property
+    def base_exceptions(self):
+        return (OSError, ValueError)
+
+    @contextmanager
+    def _bloqueo(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _buscar(self, h, ahora, crear):
+        """
+        Devuelve (offset, expira, contador) del slot de `h`.
+        Si no existe y `crear` es True, devuelve un slot libre con contador 0.
+        """
+        base = h % self.slots
+        libre = None
+        mas_antiguo = None
+
+        for i in range(self.max_sondeo):
+            offset = _CABECERA.size + ((base + i) % self.slots) * _SLOT.size
+            h_slot, expira, contador = _SLOT.unpack_from(self._mm, offset)
+
+            if h_slot == h:
+                if expira > ahora:
+                    return offset, expira, contador
+                return offset, 0.0, 0
+
+            if h_slot == 0:
+                # Fin de la cadena: la clave no está más adelante
+                if libre is None:
+                    libre = offset
+                break
+
+            if expira <= ahora:
+                if libre is None:
+                    libre = offset
+            elif mas_antiguo is None or expira < mas_antiguo[1]:
+                mas_antiguo = (offset, expira)
+
+        if not crear:
+            return None
+        if libre is None:
+            libre = mas_antiguo[0]
+        return libre, 0.0, 0
+
+    # ════════════════════════════════════════════════════════════════
+    # INTERFAZ DE limits.storage.Storage
+    # ════════════════════════════════════════════════════════════════
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        h = _hash_clave(key)
+        ahora = time.time()
+        with self._bloqueo():
+            offset, expira, contador = self._buscar(h, ahora, crear=True)
+            if expira <= ahora or elastic_expiry:
+                expira = ahora + expiry
+            contador += amount
+            _SLOT.pack_into(self._mm, offset, h, expira, contador)
+        return contador
+
+    def get(self, key):
+        h = _hash_clave(key)
+        with self._bloqueo():
+            encontrado = self._buscar(h, time.time(), crear=False)
+        return encontrado[2] if encontrado else 0
+
+    def get_expiry(self, key):
+        h = _hash_clave(key)
+        ahora = time.time()
+        with self._bloqueo():
+            encontrado = self._buscar(h, ahora, crear=False)
+        if encontrado and encontrado[1]:
+            return int(encontrado[1])
+        return int(ahora)
+
+    def clear(self, key):
+        h = _hash_clave(key)
+        with self._bloqueo():
+            encontrado = self._buscar(h, time.time(), crear=False)
+            if encontrado:
+                # Se conserva el hash para no cortar la cadena de sondeo
+                _SLOT.pack_into(self._mm, encontrado[0], h, 0.0, 0)
+
+    def reset(self):
+        with self._bloqueo():
+            vacio = bytes(self.slots * _SLOT.size)
+            self._mm[_CABECERA.size:] = vacio
+        return None
+
+    def check(self):
+        return not self._mm.closed
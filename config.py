@@ -27,9 +27,94 @@ class Config:
     MAIL_PASSWORD = os.environ.get("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER", MAIL_USERNAME)
 
+    # Bandeja de salida: resend, smtp, consola o memoria
+    EMAIL_TRANSPORTE = os.environ.get("EMAIL_TRANSPORTE", "resend")
+    EMAIL_OUTBOX_ACTIVO = os.environ.get("EMAIL_OUTBOX_ACTIVO", "true").lower() == "true"
+    EMAIL_OUTBOX_HILOS = int(os.environ.get("EMAIL_OUTBOX_HILOS", 4))
+    EMAIL_OUTBOX_LOTE = int(os.environ.get("EMAIL_OUTBOX_LOTE", 20))
+    EMAIL_OUTBOX_INTERVALO = int(os.environ.get("EMAIL_OUTBOX_INTERVALO", 10))
+    EMAIL_OUTBOX_MAX_INTENTOS = int(os.environ.get("EMAIL_OUTBOX_MAX_INTENTOS", 6))
+
     FLASK_ENV = os.environ.get("FLASK_ENV", "development")
     DEBUG = FLASK_ENV == "development"
 
+    # Arranque rápido: en producción el esquema lo crea `flask db upgrade`
+    # en el despliegue, no cada worker al iniciar
+    CREAR_TABLAS_AL_INICIAR = os.environ.get(
+        "CREAR_TABLAS_AL_INICIAR", "false" if FLASK_ENV == "production" else "true"
+    ).lower() == "true"
+
+    # Caché de bytecode de Jinja (vacío = desactivada); `flask plantillas
+    # compilar` la llena durante el build
+    JINJA_CACHE_DIR = os.environ.get(
+        "JINJA_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jinja-cache")
+        if FLASK_ENV == "production" else ""
+    )
+
     SESSION_COOKIE_SECURE = FLASK_ENV == "production"
     SESSION_COOKIE_HTTPONLY = True
-    SESSION_COOKIE_SAMESITE = "Lax"
\ No newline at end of file
+    SESSION_COOKIE_SAMESITE = "Lax"
+
+    # Rate limit: "memory://" es por proceso; "mmap://<ruta>" lo comparten
+    # todos los workers de gunicorn del mismo host
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        "RATELIMIT_STORAGE_URI",
+        "mmap:///tmp/sistpro-ratelimit.bin" if FLASK_ENV == "production" else "memory://"
+    )
+
+    # Hash de contraseñas: método/costo de werkzeug y procesos por worker
+    PASSWORD_HASH_METODO = os.environ.get("PASSWORD_HASH_METODO", "scrypt:32768:8:1")
+    PASSWORD_HASH_PROCESOS = int(os.environ.get("PASSWORD_HASH_PROCESOS", 2))
+
+    # Versiones compartidas entre workers para invalidar cachés locales
+    VERSIONES_STORAGE_URI = os.environ.get(
+        "VERSIONES_STORAGE_URI",
+        "mmap:///tmp/sistpro-versiones.bin" if FLASK_ENV == "production" else "memory://"
+    )
+
+    # Segundos que se reutiliza el usuario autenticado sin releerlo de la base
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 300))
+
+    # Segundos que se reutilizan las estadísticas del dashboard de cada colegio
+    ESTADISTICAS_CACHE_TTL = int(os.environ.get("ESTADISTICAS_CACHE_TTL", 60))
+
+    # Segundos que se reutiliza el calendario mensual de ausencias de un colegio
+    CALENDARIO_CACHE_TTL = int(os.environ.get("CALENDARIO_CACHE_TTL", 300))
+
+    # Telemetría de rendimiento (/admin/perf): fracción de peticiones medidas
+    # (0 = apagada), carpeta compartida por los workers y volcado en segundos
+    TELEMETRIA_MUESTREO = float(os.environ.get("TELEMETRIA_MUESTREO", 1.0))
+    TELEMETRIA_DIR = os.environ.get("TELEMETRIA_DIR", "")
+    TELEMETRIA_INTERVALO = int(os.environ.get("TELEMETRIA_INTERVALO", 10))
+    # Token Bearer para que Prometheus lea /admin/perf/metrics sin sesión
+    TELEMETRIA_TOKEN = os.environ.get("TELEMETRIA_TOKEN", "")
+
+    # Sólo para pruebas de carga: RATELIMIT_ENABLED=false desactiva los límites
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "true").lower() == "true"
+
+    # Segundos entre barridos de vencimientos de prueba (0 = sólo `flask usuarios barrer`)
+    ACCESO_BARRIDO_INTERVALO = int(os.environ.get("ACCESO_BARRIDO_INTERVALO", 300))
+
+    # Compresión gzip de respuestas: nivel 1-9 y bytes mínimos para comprimir
+    COMPRESION_ACTIVA = os.environ.get("COMPRESION_ACTIVA", "true").lower() == "true"
+    COMPRESION_NIVEL = int(os.environ.get("COMPRESION_NIVEL", 6))
+    COMPRESION_TAMANO_MINIMO = int(os.environ.get("COMPRESION_TAMANO_MINIMO", 1024))
+
+    # Fragmentos {% cache %}: segundos vigentes (0 = desactivado) y máximo
+    # tiempo que se sirve uno obsoleto mientras se regenera
+    FRAGMENTOS_CACHE_TTL = int(os.environ.get("FRAGMENTOS_CACHE_TTL", 300))
+    FRAGMENTOS_MAX_OBSOLETO = int(os.environ.get("FRAGMENTOS_MAX_OBSOLETO", 3600))
+
+    # API de lectura /api/v1: token Bearer de integraciones (vacío = sólo
+    # sesión) y límite de peticiones por IP
+    API_TOKEN = os.environ.get("API_TOKEN", "")
+    API_RATELIMIT = os.environ.get("API_RATELIMIT", "3000 per hour")
+
+    # Búsqueda de docentes: índice por colegio en memoria de cada worker
+    # (false = consultar la base), docentes a partir de los cuales el
+    # formulario de permisos usa el buscador en lugar de la lista completa,
+    # y límite de peticiones del autocompletar
+    DOCENTES_INDICE_MEMORIA = os.environ.get("DOCENTES_INDICE_MEMORIA", "true").lower() == "true"
+    DOCENTES_MAX_SELECT = int(os.environ.get("DOCENTES_MAX_SELECT", 300))
+    DOCENTES_BUSQUEDA_RATELIMIT = os.environ.get("DOCENTES_BUSQUEDA_RATELIMIT", "2000 per hour")
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""estado de acceso materializado en usuarios
+
+Revision ID: 3a7c5e9b1d24
+Revises: 9d3b6f1a2c47
+Create Date: 2026-10-18 18:05:31.402917
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c5e9b1d24'
+down_revision = '9d3b6f1a2c47'
+branch_labels = None
+depends_on = None
+
+DIAS_AVISO_VENCIMIENTO = 3
+
+usuarios = sa.table(
+    "usuarios",
+    sa.column("id", sa.Integer),
+    sa.column("is_active", sa.Boolean),
+    sa.column("is_superadmin", sa.Boolean),
+    sa.column("is_approved", sa.Boolean),
+    sa.column("fecha_registro", sa.DateTime),
+    sa.column("dias_prueba", sa.Integer),
+    sa.column("fecha_expiracion", sa.DateTime),
+    sa.column("estado_acceso", sa.String),
+)
+
+
+def _es_postgres():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    op.add_column(
+        "usuarios",
+        sa.Column("estado_acceso", sa.String(length=10), nullable=False, server_default="trial")
+    )
+
+    conexion = op.get_bind()
+
+    # ✅ El barrido sólo mira fecha_expiracion: se completa la de las pruebas
+    # antiguas que usaban fecha_registro + dias_prueba
+    sin_fecha = conexion.execute(
+        sa.select(usuarios.c.id, usuarios.c.fecha_registro, usuarios.c.dias_prueba).where(
+            usuarios.c.fecha_expiracion.is_(None),
+            usuarios.c.is_approved.is_(False),
+            usuarios.c.is_superadmin.is_(False)
+        )
+    ).all()
+    if sin_fecha:
+        conexion.execute(
+            usuarios.update()
+            .where(usuarios.c.id == sa.bindparam("b_id"))
+            .values(fecha_expiracion=sa.bindparam("b_fecha")),
+            [
+                {
+                    "b_id": u.id,
+                    "b_fecha": (u.fecha_registro or datetime.utcnow()) + timedelta(days=u.dias_prueba or 0),
+                }
+                for u in sin_fecha
+            ]
+        )
+
+    # Estado inicial: mismo CASE que acceso_service.expresion_estado_acceso
+    ahora = datetime.utcnow()
+    conexion.execute(
+        usuarios.update().values(estado_acceso=sa.case(
+            (usuarios.c.is_active.is_(False), "blocked"),
+            (sa.or_(usuarios.c.is_superadmin.is_(True), usuarios.c.is_approved.is_(True)), "approved"),
+            (usuarios.c.fecha_expiracion.is_(None), "trial"),
+            (usuarios.c.fecha_expiracion < ahora, "expired"),
+            (usuarios.c.fecha_expiracion < ahora + timedelta(days=DIAS_AVISO_VENCIMIENTO + 1), "expiring"),
+            else_="trial"
+        ))
+    )
+
+    if _es_postgres():
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_usuarios_estado_acceso_fecha_expiracion", "usuarios",
+                ["estado_acceso", "fecha_expiracion"],
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+        return
+
+    op.create_index(
+        "ix_usuarios_estado_acceso_fecha_expiracion", "usuarios",
+        ["estado_acceso", "fecha_expiracion"],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    if _es_postgres():
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                "ix_usuarios_estado_acceso_fecha_expiracion", table_name="usuarios",
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+    else:
+        op.drop_index("ix_usuarios_estado_acceso_fecha_expiracion", table_name="usuarios", if_exists=True)
+
+    with op.batch_alter_table("usuarios") as batch_op:
+        batch_op.drop_column("estado_acceso")
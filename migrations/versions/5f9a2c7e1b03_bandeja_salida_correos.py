@@ -0,0 +1,48 @@
+"""bandeja de salida de correos
+
+Revision ID: 5f9a2c7e1b03
+Revises: c41e8a0d9f36
+Create Date: 2026-10-18 12:26:09.331560
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f9a2c7e1b03'
+down_revision = 'c41e8a0d9f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'correos_salientes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('destinatario', sa.String(length=120), nullable=False),
+        sa.Column('asunto', sa.String(length=200), nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('clave_dedup', sa.String(length=64), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('intentos', sa.Integer(), nullable=False),
+        sa.Column('proximo_intento', sa.DateTime(), nullable=False),
+        sa.Column('reclamado_en', sa.DateTime(), nullable=True),
+        sa.Column('enviado_en', sa.DateTime(), nullable=True),
+        sa.Column('ultimo_error', sa.Text(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('clave_dedup'),
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_correos_salientes_estado_proximo',
+        'correos_salientes',
+        ['estado', 'proximo_intento'],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_correos_salientes_estado_proximo', table_name='correos_salientes', if_exists=True)
+    op.drop_table('correos_salientes', if_exists=True)
@@ -0,0 +1,61 @@
+"""indices compuestos para las consultas frecuentes
+
+Revision ID: 7b2d4e91c5a8
+Revises: e0c507f76333
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2d4e91c5a8'
+down_revision = 'e0c507f76333'
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    ("ix_permisos_colegio_fecha_inicio", "permisos", ["colegio_id", "fecha_inicio"]),
+    ("ix_permisos_docente_fecha_inicio", "permisos", ["docente_id", "fecha_inicio"]),
+    ("ix_docentes_colegio_nombre", "docentes", ["colegio_id", "nombre"]),
+    ("ix_docentes_colegio_activo", "docentes", ["colegio_id", "activo"]),
+    ("ix_usuarios_is_approved_fecha_expiracion", "usuarios", ["is_approved", "fecha_expiracion"]),
+]
+
+
+def _es_postgres():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    if _es_postgres():
+        # ✅ CREATE INDEX CONCURRENTLY no bloquea escrituras, pero no puede
+        # ejecutarse dentro de una transacción
+        with op.get_context().autocommit_block():
+            for nombre, tabla, columnas in INDICES:
+                op.create_index(
+                    nombre, tabla, columnas,
+                    postgresql_concurrently=True,
+                    if_not_exists=True
+                )
+        return
+
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, if_not_exists=True)
+
+
+def downgrade():
+    if _es_postgres():
+        with op.get_context().autocommit_block():
+            for nombre, tabla, _ in reversed(INDICES):
+                op.drop_index(
+                    nombre, table_name=tabla,
+                    postgresql_concurrently=True,
+                    if_exists=True
+                )
+        return
+
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
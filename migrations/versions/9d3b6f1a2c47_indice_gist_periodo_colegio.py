@@ -0,0 +1,39 @@
+"""indice GiST sobre el periodo de los permisos de cada colegio
+
+Revision ID: 9d3b6f1a2c47
+Revises: 5f9a2c7e1b03
+Create Date: 2026-10-18 15:22:09.318244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b6f1a2c47'
+down_revision = '5f9a2c7e1b03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Sólo PostgreSQL: en SQLite el calendario usa (colegio_id, fecha_inicio)
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # Calendario mensual: permisos del colegio cuyo periodo cruza el mes
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_permisos_colegio_periodo
+            ON permisos USING gist (colegio_id, daterange(fecha_inicio, fecha_fin, '[]'))
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_permisos_colegio_periodo")
@@ -0,0 +1,45 @@
+"""indices de busqueda de docentes por nombre (trigramas) y documento
+
+Revision ID: b8e4d2a6f519
+Revises: 3a7c5e9b1d24
+Create Date: 2026-10-18 19:41:53.602718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4d2a6f519'
+down_revision = '3a7c5e9b1d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Sólo PostgreSQL: en SQLite la búsqueda usa (colegio_id, nombre)
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        # Autocompletar: LIKE '%...%' y similitud (%) sobre el nombre
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_docentes_nombre_trgm
+            ON docentes USING gin (lower(nombre) gin_trgm_ops)
+        """)
+        # Autocompletar: prefijo del documento dentro del colegio
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_docentes_colegio_documento
+            ON docentes (colegio_id, documento text_pattern_ops)
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_docentes_colegio_documento")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_docentes_nombre_trgm")
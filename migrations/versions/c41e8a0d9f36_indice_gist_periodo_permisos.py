@@ -0,0 +1,40 @@
+"""indice GiST sobre el periodo de cada permiso
+
+Revision ID: c41e8a0d9f36
+Revises: 7b2d4e91c5a8
+Create Date: 2026-10-18 11:03:52.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8a0d9f36'
+down_revision = '7b2d4e91c5a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Sólo PostgreSQL: en SQLite la detección de cruces usa el índice
+    # (docente_id, fecha_inicio) creado en la revisión anterior
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # btree_gist permite combinar docente_id (=) con el rango (&&) en un índice
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_permisos_docente_periodo
+            ON permisos USING gist (docente_id, daterange(fecha_inicio, fecha_fin, '[]'))
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_permisos_docente_periodo")
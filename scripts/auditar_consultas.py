@@ -0,0 +1,360 @@
+"""
+Auditoría de consultas SQL por ruta (regresión de N+1).
+
+Levanta la aplicación contra una base SQLite temporal (o la que indique
+--database-url), siembra colegios, docentes, permisos y usuarios en dos
+tamaños y llama a cada ruta GET de los blueprints auth, admin, colegio,
+docente, permiso y api con el cliente de pruebas. Para cada ruta verifica que:
+
+    - el número de sentencias SQL es el mismo con pocos y con muchos datos
+      (un patrón lineal, como acceder a permiso.docente en un bucle, falla)
+    - no supera el presupuesto declarado en PRESUPUESTOS
+    - la respuesta no es un error 5xx
+
+Las rutas se miden con el limitador de peticiones desactivado; después se
+activa y se comprueba que docente.buscar tiene su propio límite
+(DOCENTES_BUSQUEDA_RATELIMIT, reducido a LIMITE_BUSQUEDA peticiones).
+
+Una excepción en una ruta se registra como HTTP 500 y la auditoría sigue.
+Las rutas de ROTAS_CONOCIDAS se informan pero no cuentan como fallo.
+Termina con código 1 si alguna otra ruta falla; el workflow
+.github/workflows/auditoria-consultas.yml la ejecuta en cada push y PR.
+
+Uso:
+    python scripts/auditar_consultas.py
+    python scripts/auditar_consultas.py --database-url postgresql://.../sistpro_ci --recrear
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Sentencias máximas por ruta; las demás usan PRESUPUESTO_POR_DEFECTO
+PRESUPUESTOS = {
+    "admin.dashboard": 5,
+    "admin.estadisticas": 6,
+    "admin.lista_usuarios": 3,
+    "colegio.dashboard": 5,
+    "colegio.lista_permisos": 6,
+    "colegio.permisos_docente": 6,
+    "permiso.listado": 6,
+    "permiso.calendario_mensual": 4,
+}
+PRESUPUESTO_POR_DEFECTO = 10
+
+# Rutas que ya respondían 500 antes de la auditoría: {endpoint: motivo}.
+# Al corregir una, hay que quitarla de aquí (la auditoría lo avisa)
+ROTAS_CONOCIDAS = {
+    "auth.estado_cuenta": "no existe la plantilla auth/estado_cuenta.html",
+    "auth.test": "no existe la plantilla test.html",
+    "docente.ver": "docentes/detalle.html llama a url_for('permiso.formulario'), que no existe",
+}
+
+BLUEPRINTS = ("auth", "admin", "colegio", "docente", "permiso", "api")
+
+# (colegios, docentes por colegio, permisos por docente, usuarios extra)
+TAMANOS = {
+    "pequeño": (2, 3, 2, 3),
+    "grande": (6, 30, 8, 20),
+}
+
+# Querystring de las rutas que sin parámetros no consultan nada
+PARAMETROS = {
+    "docente.buscar": {"q": "do"},
+}
+
+# Límite del autocompletar durante la auditoría; la petición siguiente debe dar 429
+LIMITE_BUSQUEDA = 3
+
+TIPOS = ["Vacaciones", "Enfermedad", "Capacitación", "Permiso Personal", "Licencia"]
+
+
+def _preparar_entorno(database_url):
+    """Variables que Config lee al importarse: sin cachés ni hilos de fondo"""
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "CREAR_TABLAS_AL_INICIAR": "true",
+        "EMAIL_OUTBOX_ACTIVO": "false",
+        "TELEMETRIA_MUESTREO": "0",
+        "JINJA_CACHE_DIR": "",
+        "RATELIMIT_STORAGE_URI": "memory://",
+        "VERSIONES_STORAGE_URI": "memory://",
+        "PASSWORD_HASH_PROCESOS": "0",
+        # TTL 0: cada petición recorre el camino sin caché
+        "PRINCIPAL_CACHE_TTL": "0",
+        "ESTADISTICAS_CACHE_TTL": "0",
+        "CALENDARIO_CACHE_TTL": "0",
+        "FRAGMENTOS_CACHE_TTL": "0",
+        "ACCESO_BARRIDO_INTERVALO": "0",
+        # Búsqueda de docentes contra la base, no contra el índice en memoria
+        "DOCENTES_INDICE_MEMORIA": "false",
+        "DOCENTES_BUSQUEDA_RATELIMIT": f"{LIMITE_BUSQUEDA} per minute",
+    })
+
+
+# ════════════════════════════════════════════════════════════════
+# DATOS
+# ════════════════════════════════════════════════════════════════
+
+def sembrar(colegios, docentes_por_colegio, permisos_por_docente, usuarios_extra):
+    """Inserta un conjunto determinista y devuelve los ids que usan las rutas"""
+    from sqlalchemy import insert, select
+
+    from app.extensions import db
+    from app.models.colegio import Colegio
+    from app.models.docente import Docente
+    from app.models.permiso import Permiso
+    from app.models.usuario import Usuario
+
+    hoy = date.today()
+    ahora = datetime.utcnow()
+
+    db.session.execute(insert(Colegio), [
+        {"nombre": f"Colegio {i}"} for i in range(colegios)
+    ])
+    colegio_ids = db.session.scalars(select(Colegio.id).order_by(Colegio.id)).all()
+
+    db.session.execute(insert(Docente), [
+        {"nombre": f"Docente {c}-{i:03d}", "colegio_id": c, "activo": i % 5 != 0}
+        for c in colegio_ids
+        for i in range(docentes_por_colegio)
+    ])
+    docentes = db.session.execute(
+        select(Docente.id, Docente.colegio_id).order_by(Docente.id)
+    ).all()
+
+    db.session.execute(insert(Permiso), [
+        {
+            "docente_id": docente_id,
+            "colegio_id": colegio_id,
+            # Sin cruces: cada permiso del docente empieza 15 días después
+            "fecha_inicio": hoy - timedelta(days=15 * n),
+            "fecha_fin": hoy - timedelta(days=15 * n) + timedelta(days=n % 4),
+            "tipo": TIPOS[n % len(TIPOS)],
+        }
+        for docente_id, colegio_id in docentes
+        for n in range(permisos_por_docente)
+    ])
+
+    def usuario(email, colegio_id, **campos):
+        return {
+            "email": email,
+            "password_hash": "-",
+            "colegio_id": colegio_id,
+            "is_superadmin": False,
+            "is_active": True,
+            "is_approved": True,
+            "fecha_registro": ahora,
+            "fecha_expiracion": ahora + timedelta(days=15),
+            "failed_attempts": 0,
+            **campos,
+        }
+
+    db.session.execute(insert(Usuario), [
+        usuario("admin@example.com", None, is_superadmin=True),
+        usuario("colegio@example.com", colegio_ids[0]),
+        *[
+            usuario(f"usuario{i}@example.com", colegio_ids[i % len(colegio_ids)],
+                    is_approved=i % 2 == 0, fecha_expiracion=ahora + timedelta(days=i % 5))
+            for i in range(usuarios_extra)
+        ],
+    ])
+    db.session.commit()
+
+    # El INSERT masivo no pasa por el ORM: estado_acceso lo calcula el barrido
+    from app.services.acceso_service import barrer_estados_acceso
+    barrer_estados_acceso()
+
+    def id_de(email):
+        return db.session.scalar(select(Usuario.id).where(Usuario.email == email))
+
+    return {
+        "admin": id_de("admin@example.com"),
+        "colegio": id_de("colegio@example.com"),
+        "docente": db.session.scalar(
+            select(Docente.id).where(Docente.colegio_id == colegio_ids[0]).order_by(Docente.id)
+        ),
+        "permiso": db.session.scalar(
+            select(Permiso.id).where(Permiso.colegio_id == colegio_ids[0]).order_by(Permiso.id)
+        ),
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+# RUTAS
+# ════════════════════════════════════════════════════════════════
+
+def argumentos(regla, ids):
+    """Valores para los parámetros de la URL según su nombre"""
+    hoy = date.today()
+    valores = {}
+    for nombre in regla.arguments:
+        if nombre == "usuario_id":
+            valores[nombre] = ids["colegio"]
+        elif nombre == "docente_id":
+            valores[nombre] = ids["docente"]
+        elif nombre == "id":
+            es_docente = "docente" in regla.endpoint
+            valores[nombre] = ids["docente"] if es_docente else ids["permiso"]
+        elif nombre == "anio":
+            valores[nombre] = hoy.year
+        elif nombre == "mes":
+            valores[nombre] = hoy.month
+        elif nombre == "token":
+            valores[nombre] = "token-invalido"
+        else:
+            raise ValueError(f"{regla.endpoint}: no sé qué valor usar para <{nombre}>")
+    return valores
+
+
+def rutas_get(app):
+    for regla in sorted(app.url_map.iter_rules(), key=lambda r: r.endpoint):
+        if regla.endpoint.split(".")[0] in BLUEPRINTS and "GET" in regla.methods:
+            yield regla
+
+
+def medir(app, ids, contador):
+    """{endpoint: (sentencias, status)} llamando cada ruta con un cliente nuevo"""
+    resultados = {}
+    with app.test_request_context():
+        from flask import url_for
+        urls = {
+            regla.endpoint: url_for(
+                regla.endpoint,
+                **argumentos(regla, ids),
+                **PARAMETROS.get(regla.endpoint, {})
+            )
+            for regla in rutas_get(app)
+        }
+
+    for endpoint, url in urls.items():
+        usuario_id = ids["admin"] if endpoint.startswith("admin.") else ids["colegio"]
+        cliente = app.test_client()
+        with cliente.session_transaction() as sesion:
+            sesion["_user_id"] = str(usuario_id)
+            sesion["_fresh"] = True
+
+        contador["activo"] = True
+        contador["sentencias"] = 0
+        try:
+            respuesta = cliente.get(url)
+            respuesta.get_data()  # consume respuestas en streaming
+            status = respuesta.status_code
+        except Exception as e:
+            # Un error a mitad de una respuesta en streaming llega hasta aquí
+            print(f"{endpoint}: {type(e).__name__}: {e}", file=sys.stderr)
+            status = 500
+        finally:
+            contador["activo"] = False
+        resultados[endpoint] = (contador["sentencias"], status)
+
+    return resultados
+
+
+def limita_busqueda(app, ids):
+    """True si docente.buscar responde 429 al pasar de LIMITE_BUSQUEDA peticiones"""
+    with app.test_request_context():
+        from flask import url_for
+        url = url_for("docente.buscar", **PARAMETROS["docente.buscar"])
+
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion["_user_id"] = str(ids["colegio"])
+        sesion["_fresh"] = True
+
+    app.limiter.enabled = True
+    try:
+        estados = [cliente.get(url).status_code for _ in range(LIMITE_BUSQUEDA + 1)]
+    finally:
+        app.limiter.enabled = False
+    return estados[:-1] == [200] * LIMITE_BUSQUEDA and estados[-1] == 429
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoría de consultas SQL por ruta")
+    parser.add_argument("--database-url", help="por defecto, SQLite en un directorio temporal")
+    parser.add_argument("--recrear", action="store_true",
+                        help="permite borrar las tablas de una base que no es temporal")
+    args = parser.parse_args()
+
+    temporal = None
+    if not args.database_url:
+        temporal = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temporal.name, 'auditoria.db')}"
+    elif not args.recrear:
+        parser.error("con --database-url hay que indicar --recrear (se borran todas las tablas)")
+
+    _preparar_entorno(args.database_url)
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    # Sin propagar excepciones: una ruta rota responde 500 y se informa
+    app.config.update(TESTING=True, PROPAGATE_EXCEPTIONS=False, WTF_CSRF_ENABLED=False)
+    app.limiter.enabled = False
+
+    contador = {"activo": False, "sentencias": 0}
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if contador["activo"]:
+            contador["sentencias"] += 1
+
+    por_tamano = {}
+    for nombre, tamano in TAMANOS.items():
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            ids = sembrar(*tamano)
+        por_tamano[nombre] = medir(app, ids, contador)
+
+    pequeno, grande = por_tamano["pequeño"], por_tamano["grande"]
+    fallos = 0
+    conocidas = 0
+    print(f"{'ruta':<36} {'pequeño':>8} {'grande':>7} {'máx':>4}  estado")
+    for endpoint in sorted(grande):
+        (n_pequeno, _), (n_grande, status) = pequeno[endpoint], grande[endpoint]
+        presupuesto = PRESUPUESTOS.get(endpoint, PRESUPUESTO_POR_DEFECTO)
+
+        problemas = []
+        if status >= 500:
+            problemas.append(f"HTTP {status}")
+        if n_grande != n_pequeno:
+            problemas.append("crece con los datos")
+        if n_grande > presupuesto:
+            problemas.append("supera el presupuesto")
+
+        if endpoint in ROTAS_CONOCIDAS:
+            if problemas:
+                conocidas += 1
+                estado = f"⚠️ conocida: {ROTAS_CONOCIDAS[endpoint]}"
+            else:
+                estado = "✅ (ya funciona: quitarla de ROTAS_CONOCIDAS)"
+        else:
+            fallos += bool(problemas)
+            estado = "❌ " + ", ".join(problemas) if problemas else "✅"
+        print(f"{endpoint:<36} {n_pequeno:>8} {n_grande:>7} {presupuesto:>4}  {estado}")
+
+    if limita_busqueda(app, ids):
+        print(f"{'docente.buscar (límite propio)':<36} ✅")
+    else:
+        fallos += 1
+        print(f"{'docente.buscar (límite propio)':<36} ❌ no aplica DOCENTES_BUSQUEDA_RATELIMIT")
+
+    if temporal:
+        temporal.cleanup()
+
+    print(f"\n{len(grande)} rutas, {fallos} con problemas, {conocidas} rotas conocidas")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Tiempo de arranque en frío: desde el import de la aplicación hasta la
+primera petición servida.
+
+Cada medición corre en un proceso nuevo (como un worker recién creado por
+gunicorn) y compara dos modos:
+
+    clasico  db.create_all() al iniciar y plantillas sin caché
+    rapido   sin create_all y con la caché de bytecode de Jinja ya llena
+             (lo que deja `flask plantillas compilar` en el build)
+
+Uso:
+    python scripts/benchmark_arranque.py --ruta /login --repeticiones 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en el proceso hijo; imprime los tiempos en JSON
+MEDICION = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+respuesta = app.test_client().get({ruta!r})
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import": t1 - t0,
+    "create_app": t2 - t1,
+    "primera_peticion": t3 - t2,
+    "total": t3 - t0,
+    "status": respuesta.status_code
+}}))
+"""
+
+
+def medir(entorno, ruta):
+    codigo = MEDICION.format(raiz=RAIZ, ruta=ruta)
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        env={**os.environ, **entorno},
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def precompilar(entorno):
+    subprocess.run(
+        [sys.executable, "-m", "flask", "plantillas", "compilar"],
+        env={**os.environ, **entorno},
+        cwd=RAIZ,
+        check=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frío")
+    parser.add_argument("--ruta", default="/login", help="ruta de la primera petición")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        modos = {
+            "clasico": {"CREAR_TABLAS_AL_INICIAR": "true", "JINJA_CACHE_DIR": ""},
+            "rapido": {"CREAR_TABLAS_AL_INICIAR": "false", "JINJA_CACHE_DIR": cache_dir},
+        }
+        precompilar(modos["rapido"])
+
+        print(f"Ruta: {args.ruta} · {args.repeticiones} arranques por modo (mediana, ms)\n")
+        print(f"{'modo':>8}  {'import':>8}  {'create_app':>10}  {'1ª petición':>11}  {'total':>8}")
+        for nombre, entorno in modos.items():
+            tiempos = [medir(entorno, args.ruta) for _ in range(args.repeticiones)]
+            mediana = {
+                clave: statistics.median(t[clave] for t in tiempos) * 1000
+                for clave in ("import", "create_app", "primera_peticion", "total")
+            }
+            print(
+                f"{nombre:>8}  {mediana['import']:>8.1f}  {mediana['create_app']:>10.1f}  "
+                f"{mediana['primera_peticion']:>11.1f}  {mediana['total']:>8.1f}"
+                f"   (HTTP {tiempos[-1]['status']})"
+            )
+
+
+if __name__ == "__main__":
+    main()
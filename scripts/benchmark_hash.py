@@ -0,0 +1,54 @@
+"""
+Logins por segundo según el tamaño del pool de hash.
+
+Simula un worker con varios hilos (gunicorn gthread) verificando
+contraseñas a la vez, para cada tamaño de pool indicado. Tamaño 0 es el
+comportamiento anterior: el hash se calcula en el hilo de la petición.
+
+Uso:
+    python scripts/benchmark_hash.py --metodo scrypt:32768:8:1 --pools 0 1 2 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.hash_service import ServicioHash  # noqa: E402
+
+
+def medir(metodo, procesos, hilos, logins):
+    servicio = ServicioHash(metodo=metodo, procesos=procesos)
+    password_hash = servicio.generar("Clave#Segura123")  # también calienta el pool
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        resultados = list(ejecutor.map(
+            lambda _: servicio.verificar(password_hash, "Clave#Segura123"),
+            range(logins)
+        ))
+    segundos = time.perf_counter() - inicio
+    servicio.cerrar()
+
+    assert all(resultados)
+    return logins / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pool de hash de contraseñas")
+    parser.add_argument("--metodo", default="scrypt:32768:8:1")
+    parser.add_argument("--pools", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--hilos", type=int, default=8, help="peticiones concurrentes")
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"Método: {args.metodo} · {args.hilos} hilos · {args.logins} logins\n")
+    print(f"{'procesos':>8}  {'logins/s':>10}")
+    for procesos in args.pools:
+        print(f"{procesos:>8}  {medir(args.metodo, procesos, args.hilos, args.logins):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
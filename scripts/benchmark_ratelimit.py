@@ -0,0 +1,76 @@
+"""
+Prueba de carga multiproceso del almacenamiento compartido de rate limit.
+
+Lanza N procesos que incrementan contadores sobre el mismo archivo mmap y
+verifica que ningún incremento se pierda (el total debe ser exacto), luego
+informa el rendimiento agregado y el costo por operación.
+
+Uso:
+    python scripts/benchmark_ratelimit.py --procesos 4 --operaciones 50000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.ratelimit_storage import MmapStorage  # noqa: E402
+
+
+def _trabajador(ruta, operaciones, claves, barrera, resultados):
+    storage = MmapStorage(f"mmap://{ruta}")
+    barrera.wait()
+    inicio = time.perf_counter()
+    for i in range(operaciones):
+        storage.incr(f"LIMITER/127.0.0.{i % claves}/login", 3600)
+    resultados.put(time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del rate limit compartido")
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--operaciones", type=int, default=50000, help="por proceso")
+    parser.add_argument("--claves", type=int, default=100, help="claves distintas")
+    args = parser.parse_args()
+
+    ruta = os.path.join(tempfile.mkdtemp(), "ratelimit.bin")
+    # El primer storage crea el archivo antes de lanzar los procesos
+    storage = MmapStorage(f"mmap://{ruta}")
+
+    barrera = multiprocessing.Barrier(args.procesos)
+    resultados = multiprocessing.Queue()
+    procesos = [
+        multiprocessing.Process(
+            target=_trabajador,
+            args=(ruta, args.operaciones, args.claves, barrera, resultados)
+        )
+        for _ in range(args.procesos)
+    ]
+
+    inicio = time.perf_counter()
+    for p in procesos:
+        p.start()
+    for p in procesos:
+        p.join()
+    total_segundos = time.perf_counter() - inicio
+    tiempos = [resultados.get() for _ in procesos]
+
+    esperado = args.procesos * args.operaciones
+    contado = sum(
+        storage.get(f"LIMITER/127.0.0.{i}/login") for i in range(args.claves)
+    )
+
+    print(f"Procesos:            {args.procesos}")
+    print(f"Incrementos:         {esperado}")
+    print(f"Contados:            {contado} {'✅' if contado == esperado else '❌'}")
+    print(f"Rendimiento total:   {esperado / total_segundos:,.0f} ops/s")
+    print(f"Costo medio por op:  {max(tiempos) / args.operaciones * 1e6:.1f} µs")
+
+    return 0 if contado == esperado else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Prueba de carga contra un gunicorn en marcha.
+
+Cada usuario virtual inicia sesión con una cuenta sembrada por `flask seed`
+(colegio<N>@seed.sistpro) y repite una mezcla ponderada de operaciones:
+volver a iniciar sesión, ver el dashboard, ver el listado de permisos y
+registrar un permiso. Al final informa el throughput y la latencia p50,
+p95 y p99 de cada ruta.
+
+Sólo usa la biblioteca estándar. El servidor debe arrancarse con
+RATELIMIT_ENABLED=false, o los límites por IP cortan la prueba.
+
+Uso:
+    FLASK_ENV=production RATELIMIT_ENABLED=false gunicorn -w 4 -k gthread --threads 4 wsgi:app
+    python scripts/carga.py --url http://127.0.0.1:8000 --usuarios 32 --duracion 60 --colegios 1000
+"""
+import argparse
+import http.cookiejar
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+
+CSRF = re.compile(r'name="csrf_token"\s+value="([^"]+)"')
+OPCION_DOCENTE = re.compile(r'<option value="(\d+)"')
+TIPOS = ("Enfermedad", "Permiso Personal", "Capacitación", "Cumpleaños", "Vacaciones")
+
+MEZCLA_POR_DEFECTO = "login=1,dashboard=6,listado=3,insertar=2"
+
+
+class _SinRedireccion(urllib.request.HTTPRedirectHandler):
+    """Cada petición se mide sola: las redirecciones no se siguen"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Metricas:
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def registrar(self, ruta, segundos, ok):
+        with self._lock:
+            self.latencias[ruta].append(segundos)
+            if not ok:
+                self.errores[ruta] += 1
+
+
+def percentil(valores_ordenados, q):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, max(0, int(round(q * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+
+class UsuarioVirtual:
+    def __init__(self, base, email, password, metricas, rnd):
+        self.base = base.rstrip("/")
+        self.email = email
+        self.password = password
+        self.metricas = metricas
+        self.rnd = rnd
+        self.docentes = []
+        self.cliente = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _SinRedireccion()
+        )
+
+    def _pedir(self, ruta, metodo, camino, datos=None, esperado=(200,)):
+        cuerpo = urllib.parse.urlencode(datos).encode() if datos is not None else None
+        peticion = urllib.request.Request(self.base + camino, data=cuerpo, method=metodo)
+        inicio = time.perf_counter()
+        try:
+            with self.cliente.open(peticion, timeout=30) as respuesta:
+                status, html = respuesta.status, respuesta.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as e:
+            status, html = e.code, ""
+        except OSError:
+            status, html = 0, ""
+        self.metricas.registrar(ruta, time.perf_counter() - inicio, status in esperado)
+        return status, html
+
+    def _csrf(self, html):
+        encontrado = CSRF.search(html)
+        return encontrado.group(1) if encontrado else ""
+
+    # ─── Operaciones ──────────────────────────────────────────────
+
+    def login(self):
+        _, html = self._pedir("GET /login", "GET", "/login")
+        self._pedir("POST /login", "POST", "/login", {
+            "csrf_token": self._csrf(html),
+            "email": self.email,
+            "password": self.password,
+        }, esperado=(302,))
+
+    def dashboard(self):
+        self._pedir("GET /dashboard/", "GET", "/dashboard/")
+
+    def listado(self):
+        self._pedir("GET /dashboard/permisos/", "GET", "/dashboard/permisos/")
+
+    def insertar(self):
+        _, html = self._pedir("GET /dashboard/permisos/nuevo", "GET", "/dashboard/permisos/nuevo")
+        if not self.docentes:
+            self.docentes = OPCION_DOCENTE.findall(html)
+        if not self.docentes:
+            return
+
+        # Fechas futuras dispersas para que casi nunca haya cruces
+        inicio = date.today() + timedelta(days=self.rnd.randint(30, 3650))
+        fin = inicio + timedelta(days=self.rnd.randint(0, 3))
+        self._pedir("POST /dashboard/permisos/nuevo", "POST", "/dashboard/permisos/nuevo", {
+            "csrf_token": self._csrf(html),
+            "docente_id": self.rnd.choice(self.docentes),
+            "tipo": self.rnd.choice(TIPOS),
+            "fecha_inicio": inicio.isoformat(),
+            "fecha_fin": fin.isoformat(),
+            "observacion": "carga",
+        }, esperado=(302,))
+
+
+def _parsear_mezcla(texto):
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        mezcla[nombre.strip()] = float(peso or 1)
+    return mezcla
+
+
+def correr_usuario(numero, args, mezcla, metricas, fin):
+    rnd = random.Random(args.semilla + numero)
+    email = f"colegio{rnd.randrange(args.colegios)}@seed.sistpro"
+    usuario = UsuarioVirtual(args.url, email, args.password, metricas, rnd)
+    usuario.login()
+
+    operaciones = list(mezcla)
+    pesos = [mezcla[o] for o in operaciones]
+    while time.monotonic() < fin:
+        getattr(usuario, rnd.choices(operaciones, weights=pesos)[0])()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga contra un servidor en marcha")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--usuarios", type=int, default=16, help="usuarios virtuales concurrentes")
+    parser.add_argument("--duracion", type=int, default=60, help="segundos")
+    parser.add_argument("--colegios", type=int, default=1000, help="colegios sembrados por flask seed")
+    parser.add_argument("--password", default="Semilla#2026")
+    parser.add_argument("--mezcla", default=MEZCLA_POR_DEFECTO,
+                        help="pesos de login, dashboard, listado e insertar")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    mezcla = _parsear_mezcla(args.mezcla)
+    desconocidas = set(mezcla) - {"login", "dashboard", "listado", "insertar"}
+    if desconocidas:
+        parser.error(f"operaciones desconocidas: {', '.join(sorted(desconocidas))}")
+
+    metricas = Metricas()
+    inicio = time.monotonic()
+    fin = inicio + args.duracion
+    hilos = [
+        threading.Thread(target=correr_usuario, args=(n, args, mezcla, metricas, fin), daemon=True)
+        for n in range(args.usuarios)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.monotonic() - inicio
+
+    total = sum(len(v) for v in metricas.latencias.values())
+    print(f"{args.usuarios} usuarios · {segundos:.1f}s · {total} peticiones · {total / segundos:.1f} req/s\n")
+    print(f"{'ruta':<34} {'n':>7} {'err':>5} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for ruta in sorted(metricas.latencias):
+        valores = sorted(metricas.latencias[ruta])
+        print(
+            f"{ruta:<34} {len(valores):>7} {metricas.errores[ruta]:>5} {len(valores) / segundos:>7.1f} "
+            f"{percentil(valores, 0.50) * 1000:>8.1f} {percentil(valores, 0.95) * 1000:>8.1f} "
+            f"{percentil(valores, 0.99) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Ejecuta EXPLAIN ANALYZE (PostgreSQL) o EXPLAIN QUERY PLAN (SQLite) sobre las
+consultas de cada ruta y verifica que todas usen un índice.
+
+Uso:
+    DATABASE_URL=postgresql://... python scripts/explain_consultas.py --seed
+
+--seed carga un conjunto de datos sintético si la base está vacía, para que
+el planificador tenga estadísticas realistas. El script termina con código 1
+si alguna consulta recorre una tabla completa.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, func, insert, or_, select, text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.colegio import Colegio  # noqa: E402
+from app.models.docente import Docente  # noqa: E402
+from app.models.permiso import Permiso  # noqa: E402
+from app.models.usuario import Usuario  # noqa: E402
+
+TIPOS = ["Vacaciones", "Enfermedad", "Capacitación", "Permiso Personal", "Licencia"]
+
+# Fragmentos del plan que indican acceso por índice en cada motor
+MARCAS_INDICE = {
+    "postgresql": ("Index Scan", "Index Only Scan", "Bitmap Index Scan"),
+    "sqlite": ("USING INDEX", "USING COVERING INDEX", "USING INTEGER PRIMARY KEY"),
+}
+MARCAS_RECORRIDO = {
+    "postgresql": ("Seq Scan",),
+    "sqlite": ("SCAN ",),
+}
+
+
+# ════════════════════════════════════════════════════════════════
+# DATOS DE PRUEBA
+# ════════════════════════════════════════════════════════════════
+
+def sembrar(colegios, docentes_por_colegio, permisos_por_docente, semilla=42):
+    """Inserta datos sintéticos con executemany (sólo si no hay colegios)"""
+    if db.session.query(Colegio.id).first():
+        print("ℹ️ La base ya tiene datos, no se siembra")
+        return
+
+    rnd = random.Random(semilla)
+    hoy = date.today()
+
+    db.session.execute(insert(Colegio), [
+        {"nombre": f"Colegio {i}"} for i in range(colegios)
+    ])
+    colegio_ids = db.session.scalars(select(Colegio.id)).all()
+
+    db.session.execute(insert(Docente), [
+        {"nombre": f"Docente {c}-{i}", "colegio_id": c, "activo": rnd.random() > 0.1}
+        for c in colegio_ids
+        for i in range(docentes_por_colegio)
+    ])
+    docentes = db.session.execute(select(Docente.id, Docente.colegio_id)).all()
+
+    filas = []
+    for docente_id, colegio_id in docentes:
+        for _ in range(permisos_por_docente):
+            inicio = hoy - timedelta(days=rnd.randint(-60, 5 * 365))
+            filas.append({
+                "docente_id": docente_id,
+                "colegio_id": colegio_id,
+                "fecha_inicio": inicio,
+                "fecha_fin": inicio + timedelta(days=rnd.randint(0, 10)),
+                "tipo": rnd.choice(TIPOS),
+            })
+        if len(filas) >= 10000:
+            db.session.execute(insert(Permiso), filas)
+            filas = []
+    if filas:
+        db.session.execute(insert(Permiso), filas)
+
+    ahora = datetime.utcnow()
+    db.session.execute(insert(Usuario), [
+        {
+            "email": f"usuario{i}@example.com",
+            "password_hash": "-",
+            "colegio_id": rnd.choice(colegio_ids),
+            "is_superadmin": False,
+            "is_active": True,
+            "is_approved": rnd.random() < 0.3,
+            "fecha_registro": ahora - timedelta(days=rnd.randint(0, 60)),
+            "fecha_expiracion": ahora + timedelta(days=rnd.randint(-45, 15)),
+            "failed_attempts": 0,
+        }
+        for i in range(colegios * 2)
+    ])
+    db.session.commit()
+    print(f"✅ Sembrados {colegios} colegios, {len(docentes)} docentes")
+
+
+# ════════════════════════════════════════════════════════════════
+# CONSULTAS DE CADA RUTA
+# ════════════════════════════════════════════════════════════════
+
+def consultas_por_ruta(colegio_id, docente_id, docente_nombre):
+    hoy = date.today()
+    ahora = datetime.utcnow()
+
+    return [
+        ("colegio.dashboard · permisos activos hoy", select(func.count(Permiso.id)).where(
+            Permiso.colegio_id == colegio_id,
+            Permiso.fecha_inicio <= hoy,
+            Permiso.fecha_fin >= hoy
+        )),
+        ("colegio.dashboard · permisos pendientes", select(func.count(Permiso.id)).where(
+            Permiso.colegio_id == colegio_id,
+            Permiso.fecha_inicio > hoy
+        )),
+        ("colegio.dashboard · docentes activos", select(func.count(Docente.id)).where(
+            Docente.colegio_id == colegio_id,
+            Docente.activo.is_(True)
+        )),
+        ("permiso.listado · primera página", select(Permiso).where(
+            Permiso.colegio_id == colegio_id
+        ).order_by(Permiso.fecha_inicio.desc(), Permiso.id.desc()).limit(51)),
+        ("permiso.listado · página siguiente", select(Permiso).where(
+            Permiso.colegio_id == colegio_id,
+            or_(
+                Permiso.fecha_inicio < hoy,
+                and_(Permiso.fecha_inicio == hoy, Permiso.id < 1000)
+            )
+        ).order_by(Permiso.fecha_inicio.desc(), Permiso.id.desc()).limit(51)),
+        ("colegio.permisos_docente", select(Permiso).where(
+            Permiso.docente_id == docente_id,
+            Permiso.colegio_id == colegio_id
+        ).order_by(Permiso.fecha_inicio.desc(), Permiso.id.desc()).limit(51)),
+        ("docente.listar", select(Docente).where(
+            Docente.colegio_id == colegio_id
+        ).order_by(Docente.nombre)),
+        ("docente.nuevo · duplicado", select(Docente.id).where(
+            Docente.colegio_id == colegio_id,
+            Docente.nombre == docente_nombre
+        )),
+        ("admin.dashboard · próximos a vencer", select(Usuario).where(
+            Usuario.is_approved.is_(False),
+            Usuario.is_superadmin.is_(False),
+            Usuario.fecha_expiracion >= ahora,
+            Usuario.fecha_expiracion < ahora + timedelta(days=4)
+        ).order_by(Usuario.fecha_expiracion)),
+        ("auth.login", select(Usuario).where(Usuario.email == "usuario1@example.com")),
+    ]
+
+
+def explicar(conexion, consulta):
+    dialecto = conexion.dialect
+    compilada = consulta.compile(dialect=dialecto)
+    sql = str(compilada)
+
+    if compilada.positional:
+        parametros = tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+    else:
+        parametros = compilada.params
+
+    if dialecto.name == "postgresql":
+        prefijo = "EXPLAIN (ANALYZE, BUFFERS) "
+        filas = conexion.exec_driver_sql(prefijo + sql, parametros).all()
+        return "\n".join(fila[0] for fila in filas)
+
+    filas = conexion.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parametros).all()
+    return "\n".join(str(fila[-1]) for fila in filas)
+
+
+def usa_indice(plan, motor):
+    marcas = MARCAS_INDICE.get(motor, ())
+    recorridos = MARCAS_RECORRIDO.get(motor, ())
+    if any(marca in plan for marca in recorridos):
+        # En SQLite "SCAN t USING INDEX ix" también es acceso por índice
+        lineas = [linea for linea in plan.splitlines() if any(r in linea for r in recorridos)]
+        return all(any(marca in linea for marca in marcas) for linea in lineas)
+    return any(marca in plan for marca in marcas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", action="store_true", help="sembrar datos si la base está vacía")
+    parser.add_argument("--colegios", type=int, default=20)
+    parser.add_argument("--docentes", type=int, default=50, help="docentes por colegio")
+    parser.add_argument("--permisos", type=int, default=40, help="permisos por docente")
+    parser.add_argument("--verbose", "-v", action="store_true", help="imprimir el plan completo")
+    args = parser.parse_args()
+
+    app = create_app()
+    fallidas = 0
+
+    with app.app_context():
+        if args.seed:
+            sembrar(args.colegios, args.docentes, args.permisos)
+
+        motor = db.engine.dialect.name
+        with db.engine.connect() as conexion:
+            conexion.execute(text("ANALYZE"))
+            conexion.commit()
+
+        docente = db.session.execute(
+            select(Docente.id, Docente.colegio_id, Docente.nombre).limit(1)
+        ).first()
+        if docente is None:
+            print("❌ No hay datos. Ejecuta con --seed")
+            return 1
+
+        with db.engine.connect() as conexion:
+            for nombre, consulta in consultas_por_ruta(docente.colegio_id, docente.id, docente.nombre):
+                plan = explicar(conexion, consulta)
+                ok = usa_indice(plan, motor)
+                fallidas += 0 if ok else 1
+                print(f"{'✅' if ok else '❌'} {nombre}")
+                if args.verbose or not ok:
+                    print("    " + plan.replace("\n", "\n    "))
+
+    print(f"\n{fallidas} consulta(s) sin índice")
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Verifica que el estado de acceso guardado por SQL coincide con el de Python.
+
+Levanta la aplicación contra una base SQLite temporal (o la que indique
+--database-url), prepara usuarios por caminos que no pasan por los eventos
+del ORM (INSERT y UPDATE masivos; un escenario puede fallar antes con
+AssertionError) y, para cada escenario, comprueba que:
+
+    - tras el barrido, estado_acceso es el esperado y el mismo que
+      Usuario.calcular_estado_acceso()
+    - un segundo barrido no modifica ninguna fila
+
+Termina con código 1 si algún escenario falla; el workflow
+.github/workflows/auditoria-consultas.yml lo ejecuta en cada push y PR.
+
+Uso:
+    python scripts/verificar_estados_acceso.py
+    python scripts/verificar_estados_acceso.py --database-url postgresql://.../sistpro_ci --recrear
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ESCENARIOS = []
+
+
+def escenario(funcion):
+    ESCENARIOS.append(funcion)
+    return funcion
+
+
+def _preparar_entorno(database_url):
+    """Variables que Config lee al importarse: sin cachés ni hilos de fondo"""
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "CREAR_TABLAS_AL_INICIAR": "true",
+        "EMAIL_OUTBOX_ACTIVO": "false",
+        "TELEMETRIA_MUESTREO": "0",
+        "RATELIMIT_STORAGE_URI": "memory://",
+        "VERSIONES_STORAGE_URI": "memory://",
+        "PASSWORD_HASH_PROCESOS": "0",
+        "ACCESO_BARRIDO_INTERVALO": "0",
+    })
+
+
+def _insertar_sin_orm(email, dias_desde_registro, dias_prueba=15):
+    """Usuario en prueba sin fecha_expiracion, como lo deja un INSERT directo"""
+    from sqlalchemy import insert
+
+    from app.extensions import db
+    from app.models.usuario import Usuario
+
+    usuario_id = db.session.scalar(
+        insert(Usuario).values(
+            email=email,
+            password_hash="x",
+            is_active=True,
+            is_approved=False,
+            fecha_registro=datetime.utcnow() - timedelta(days=dias_desde_registro),
+            dias_prueba=dias_prueba,
+            fecha_expiracion=None,
+            estado_acceso=Usuario.ACCESO_PRUEBA,
+        ).returning(Usuario.id)
+    )
+    db.session.commit()
+    return usuario_id
+
+
+# ════════════════════════════════════════════════════════════════
+# ESCENARIOS: (descripción, usuario_id, estado esperado)
+# ════════════════════════════════════════════════════════════════
+
+@escenario
+def prueba_vencida_sin_fecha_expiracion():
+    from app.models.usuario import Usuario
+
+    usuario_id = _insertar_sin_orm("vencida@verificacion.test", dias_desde_registro=100)
+    return "prueba vencida sin fecha_expiracion", usuario_id, Usuario.ACCESO_VENCIDO
+
+
+@escenario
+def prueba_por_vencer_sin_fecha_expiracion():
+    from app.models.usuario import Usuario
+
+    usuario_id = _insertar_sin_orm("por_vencer@verificacion.test", dias_desde_registro=13)
+    return "prueba por vencer sin fecha_expiracion", usuario_id, Usuario.ACCESO_POR_VENCER
+
+
+@escenario
+def aprobado_bloqueado_y_reactivado_en_lote():
+    """Bloquear en lote a un aprobado reabre su prueba, ya vencida"""
+    from sqlalchemy import select
+
+    from app.extensions import db
+    from app.models.usuario import Usuario
+    from app.services.usuarios_lote_service import aplicar_lote, condicion_filtro
+
+    usuario = Usuario(
+        email="reactivado@verificacion.test",
+        password_hash="x",
+        fecha_registro=datetime.utcnow() - timedelta(days=100),
+        dias_prueba=15,
+    )
+    db.session.add(usuario)
+    db.session.commit()
+    usuario_id = usuario.id
+
+    for accion in ("aprobar", "bloquear", "activar"):
+        resultado = aplicar_lote(accion, ids=[usuario_id])
+        assert resultado.aplicados == 1, f"{accion}: {resultado.como_dict()}"
+
+    db.session.expire_all()
+    assert db.session.get(Usuario, usuario_id).fecha_expiracion is not None, \
+        "bloquear no fijó fecha_expiracion"
+    vencidos = db.session.scalars(
+        select(Usuario.id).where(*condicion_filtro("vencidos", datetime.utcnow()))
+    ).all()
+    assert usuario_id in vencidos, "el filtro de vencidos no lo selecciona"
+
+    return "aprobado, bloqueado y reactivado en lote", usuario_id, Usuario.ACCESO_VENCIDO
+
+
+# ════════════════════════════════════════════════════════════════
+# EJECUCIÓN
+# ════════════════════════════════════════════════════════════════
+
+def verificar(usuario_id, esperado):
+    """Lista de problemas del usuario tras el barrido"""
+    from app.extensions import db
+    from app.models.usuario import Usuario
+
+    db.session.expire_all()
+    usuario = db.session.get(Usuario, usuario_id)
+    problemas = []
+    if usuario.estado_acceso != esperado:
+        problemas.append(f"estado_acceso={usuario.estado_acceso}, se esperaba {esperado}")
+    calculado = usuario.calcular_estado_acceso()
+    if usuario.estado_acceso != calculado:
+        problemas.append(f"Python calcula {calculado}")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estado de acceso en SQL frente a Python")
+    parser.add_argument("--database-url", help="por defecto, SQLite en un directorio temporal")
+    parser.add_argument("--recrear", action="store_true",
+                        help="permite borrar las tablas de una base que no es temporal")
+    args = parser.parse_args()
+
+    temporal = None
+    if not args.database_url:
+        temporal = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temporal.name, 'estados.db')}"
+    elif not args.recrear:
+        parser.error("con --database-url hay que indicar --recrear (se borran todas las tablas)")
+
+    _preparar_entorno(args.database_url)
+
+    from app import create_app
+    from app.extensions import db
+    from app.services.acceso_service import barrer_estados_acceso
+
+    app = create_app()
+    fallos = 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        casos = []
+        for preparar in ESCENARIOS:
+            try:
+                casos.append(preparar())
+            except AssertionError as error:
+                fallos += 1
+                print(f"{preparar.__name__:<52} ❌ {error}")
+        barrer_estados_acceso()
+
+        for descripcion, usuario_id, esperado in casos:
+            problemas = verificar(usuario_id, esperado)
+            fallos += bool(problemas)
+            estado = "❌ " + "; ".join(problemas) if problemas else "✅"
+            print(f"{descripcion:<52} {estado}")
+
+        repetidos = barrer_estados_acceso()
+        if repetidos:
+            fallos += 1
+            print(f"❌ el segundo barrido volvió a modificar los usuarios {repetidos}")
+
+    if temporal:
+        temporal.cleanup()
+
+    print(f"\n{len(ESCENARIOS)} escenarios, {fallos} con problemas")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+// ============================================
+// BUSCADOR DE DOCENTES (COLEGIOS CON MUCHOS DOCENTES)
+// ============================================
+//
+// <input data-buscar-docentes data-select="id del <select>" data-url="..."
+//        data-activos="1|0"> llena el <select> con los resultados de
+// docente.buscar en lugar de cargar toda la nómina en la página.
+
+class BuscadorDocentes {
+    constructor(input) {
+        this.input = input;
+        this.selectDocente = document.getElementById(input.dataset.select);
+        this.temporizador = null;
+        this.peticion = null; // AbortController de la búsqueda en curso
+
+        if (this.selectDocente) {
+            // "Seleccione..." / "Todos": se conserva al reemplazar las opciones
+            this.opcionVacia = this.selectDocente.querySelector('option[value=""]');
+            this.init();
+        }
+    }
+
+    init() {
+        // Esperar a que el usuario deje de escribir antes de consultar
+        this.input.addEventListener('input', () => {
+            clearTimeout(this.temporizador);
+            this.temporizador = setTimeout(() => this.buscar(this.input.value.trim()), 250);
+        });
+    }
+
+    async buscar(texto) {
+        if (texto.length < 2) return;
+
+        if (this.peticion) this.peticion.abort();
+        this.peticion = new AbortController();
+
+        try {
+            const activos = this.input.dataset.activos || '1';
+            const url = `${this.input.dataset.url}?q=${encodeURIComponent(texto)}&limit=20&activos=${activos}`;
+            const response = await fetch(url, { signal: this.peticion.signal });
+
+            if (!response.ok) {
+                throw new Error(`Error HTTP: ${response.status}`);
+            }
+
+            const data = await response.json();
+            if (data.success) {
+                this.mostrarResultados(data.docentes);
+            }
+
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Error buscando docentes:', error);
+            }
+        }
+    }
+
+    mostrarResultados(docentes) {
+        this.selectDocente.innerHTML = '';
+        if (this.opcionVacia) {
+            this.selectDocente.appendChild(this.opcionVacia);
+        }
+
+        if (!docentes.length) {
+            const vacia = document.createElement('option');
+            vacia.disabled = true;
+            vacia.textContent = 'Sin resultados';
+            this.selectDocente.appendChild(vacia);
+        }
+
+        docentes.forEach(docente => {
+            const opcion = document.createElement('option');
+            opcion.value = docente.id;
+            opcion.textContent = docente.documento
+                ? `${docente.nombre} (${docente.documento})`
+                : docente.nombre;
+            this.selectDocente.appendChild(opcion);
+        });
+
+        // Un único resultado: seleccionarlo (y avisar, p. ej. para cargar su historial)
+        if (docentes.length === 1) {
+            this.selectDocente.value = docentes[0].id;
+            this.selectDocente.dispatchEvent(new Event('change'));
+        }
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-buscar-docentes]').forEach(input => new BuscadorDocentes(input));
+});